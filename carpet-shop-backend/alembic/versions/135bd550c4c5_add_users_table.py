@@ -4,6 +4,9 @@ Revision ID: 135bd550c4c5
 Revises: 
 Create Date: 2025-10-10 08:33:03.288485
 
+جداول پایه (users، carpets، carpet_operations، invoices، invoice_items، checks)
+به همان شکلی که قبلاً با create_all ساخته می‌شدند. دیتابیس‌هایی که قبلاً با
+create_all ساخته شده‌اند جدول‌های موجودشان دوباره ساخته نمی‌شود.
 """
 from alembic import op
 import sqlalchemy as sa
@@ -15,14 +18,156 @@ down_revision = None
 branch_labels = None
 depends_on = None
 
+USER_ROLE = sa.Enum('ADMIN', 'USER', name='userrole')
+CARPET_SIZE = sa.Enum(
+    'KOOCHIK', 'POSHTI', 'ZARCHAHAROK', 'ZARNIM', 'QAALICHE', 'PARDEEI',
+    'SHESH_METRI', 'NOH_METRI', 'DAVAZDAH_METRI', 'BOZORGTAR',
+    name='carpetsize'
+)
+PAYMENT_METHOD = sa.Enum('CASH', 'CHECK', 'INSTALLMENT', 'MIXED', name='paymentmethod')
+CHECK_STATUS = sa.Enum('NOT_REGISTERED', 'REGISTERED', 'CONFIRMED', 'PASSED', 'BOUNCED', name='checkstatus')
+CHECK_TYPE = sa.Enum('INCOMING', 'OUTGOING', name='checktype')
+
+
+def _timestamps():
+    return [
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ]
+
 
 def upgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=100), nullable=False),
+            sa.Column('email', sa.String(length=200), nullable=False),
+            sa.Column('hashed_password', sa.String(length=200), nullable=False),
+            sa.Column('full_name', sa.String(length=200), nullable=True),
+            sa.Column('role', USER_ROLE, nullable=False),
+            sa.Column('is_active', sa.Boolean(), nullable=True),
+            *_timestamps(),
+            sa.Column('last_login', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_users_id', 'users', ['id'])
+        op.create_index('ix_users_username', 'users', ['username'], unique=True)
+        op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    
+    if 'carpets' not in existing:
+        op.create_table(
+            'carpets',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('pattern', sa.String(length=200), nullable=False, comment='نقشه'),
+            sa.Column('brand', sa.String(length=100), nullable=False, comment='برند'),
+            sa.Column('purchase_price', sa.Float(), nullable=False, comment='قیمت خرید'),
+            sa.Column('sale_price', sa.Float(), nullable=True, comment='قیمت فروش'),
+            sa.Column('material', sa.String(length=100), nullable=False, comment='جنس'),
+            sa.Column('size', CARPET_SIZE, nullable=False, comment='اندازه'),
+            sa.Column('description', sa.Text(), nullable=True, comment='توضیحات'),
+            sa.Column('purchase_date', sa.DateTime(), nullable=False, comment='تاریخ خرید'),
+            sa.Column('image_path', sa.String(length=500), nullable=True, comment='مسیر عکس'),
+            sa.Column('quantity', sa.Integer(), nullable=True, comment='تعداد'),
+            sa.Column('seller_name', sa.String(length=200), nullable=True, comment='نام فروشنده'),
+            sa.Column('is_consignment', sa.Boolean(), nullable=True, comment='آیا امانتی است'),
+            sa.Column('consignment_owner', sa.String(length=200), nullable=True, comment='نام صاحب امانت'),
+            sa.Column('owner_declared_price', sa.Float(), nullable=True, comment='قیمت اعلامی مالک'),
+            sa.Column('consignment_date', sa.DateTime(), nullable=True, comment='تاریخ امانت'),
+            sa.Column('has_pair', sa.Boolean(), nullable=True, comment='آیا جفت دارد'),
+            sa.Column('payment_method', PAYMENT_METHOD, nullable=False, comment='نحوه پرداخت'),
+            *_timestamps(),
+            sa.Column('last_edited_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_carpets_id', 'carpets', ['id'])
+    
+    if 'carpet_operations' not in existing:
+        op.create_table(
+            'carpet_operations',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('carpet_id', sa.Integer(), nullable=False),
+            sa.Column('operation_name', sa.String(length=200), nullable=False, comment='نام عملیات'),
+            sa.Column('price', sa.Float(), nullable=False, comment='قیمت عملیات'),
+            sa.Column('description', sa.Text(), nullable=True, comment='توضیحات'),
+            sa.Column('operation_date', sa.DateTime(), nullable=True, comment='تاریخ عملیات'),
+            *_timestamps(),
+            sa.ForeignKeyConstraint(['carpet_id'], ['carpets.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_carpet_operations_id', 'carpet_operations', ['id'])
+    
+    if 'invoices' not in existing:
+        op.create_table(
+            'invoices',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('invoice_number', sa.String(length=50), nullable=False, comment='شماره فاکتور'),
+            sa.Column('customer_name', sa.String(length=200), nullable=False, comment='نام خریدار'),
+            sa.Column('invoice_date', sa.DateTime(), nullable=True, comment='تاریخ فاکتور'),
+            sa.Column('payment_method', sa.String(length=50), nullable=False, comment='نوع پرداخت'),
+            sa.Column('total_amount', sa.Float(), nullable=False, comment='مبلغ کل'),
+            sa.Column('description', sa.Text(), nullable=True, comment='توضیحات'),
+            sa.Column('signature_path', sa.String(length=500), nullable=True, comment='مسیر امضا'),
+            sa.Column('is_signed', sa.Boolean(), nullable=True, comment='امضا شده'),
+            *_timestamps(),
+            sa.Column('last_edited_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_invoices_id', 'invoices', ['id'])
+        op.create_index('ix_invoices_invoice_number', 'invoices', ['invoice_number'], unique=True)
+    
+    if 'invoice_items' not in existing:
+        op.create_table(
+            'invoice_items',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('invoice_id', sa.Integer(), nullable=False),
+            sa.Column('carpet_id', sa.Integer(), nullable=False),
+            sa.Column('title', sa.String(length=200), nullable=False, comment='عنوان'),
+            sa.Column('size', sa.String(length=50), nullable=False, comment='سایز'),
+            sa.Column('brand', sa.String(length=100), nullable=False, comment='برند'),
+            sa.Column('quantity', sa.Integer(), nullable=False, comment='تعداد'),
+            sa.Column('unit_price', sa.Float(), nullable=False, comment='قیمت فی'),
+            sa.Column('total_price', sa.Float(), nullable=False, comment='قیمت کل'),
+            sa.Column('description', sa.Text(), nullable=True, comment='توضیحات'),
+            *_timestamps(),
+            sa.ForeignKeyConstraint(['carpet_id'], ['carpets.id']),
+            sa.ForeignKeyConstraint(['invoice_id'], ['invoices.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_invoice_items_id', 'invoice_items', ['id'])
+    
+    if 'checks' not in existing:
+        op.create_table(
+            'checks',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('check_number', sa.String(length=100), nullable=False, comment='شماره چک'),
+            sa.Column('amount', sa.Float(), nullable=False, comment='مبلغ'),
+            sa.Column('payee', sa.String(length=200), nullable=False, comment='در وجه'),
+            sa.Column('check_date', sa.DateTime(), nullable=False, comment='تاریخ چک'),
+            sa.Column('status', CHECK_STATUS, nullable=True, comment='وضعیت چک'),
+            sa.Column('check_type', CHECK_TYPE, nullable=False, comment='نوع چک'),
+            sa.Column('invoice_id', sa.Integer(), nullable=True),
+            sa.Column('carpet_id', sa.Integer(), nullable=True),
+            sa.Column('notification_sent', sa.DateTime(), nullable=True, comment='زمان ارسال نوتیفیکیشن'),
+            sa.Column('description', sa.String(length=500), nullable=True, comment='توضیحات'),
+            *_timestamps(),
+            sa.Column('last_edited_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['carpet_id'], ['carpets.id']),
+            sa.ForeignKeyConstraint(['invoice_id'], ['invoices.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_checks_id', 'checks', ['id'])
+        op.create_index('ix_checks_check_number', 'checks', ['check_number'])
 
 
 def downgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
\ No newline at end of file
+    op.drop_table('checks')
+    op.drop_table('invoice_items')
+    op.drop_table('invoices')
+    op.drop_table('carpet_operations')
+    op.drop_table('carpets')
+    op.drop_table('users')
+    for enum_type in (CHECK_TYPE, CHECK_STATUS, PAYMENT_METHOD, CARPET_SIZE, USER_ROLE):
+        enum_type.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,45 @@
+"""Add calendar_days table
+
+Revision ID: 4f2a9c7e1b3d
+Revises: 9d32e6c0e83b
+Create Date: 2026-10-19 09:12:40.518233
+
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+from app.utils.jalali import build_calendar_rows
+
+
+# revision identifiers, used by Alembic.
+revision = '4f2a9c7e1b3d'
+down_revision = '9d32e6c0e83b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    calendar_days = op.create_table(
+        'calendar_days',
+        sa.Column('date', sa.Date(), nullable=False, comment='تاریخ میلادی'),
+        sa.Column('jalali_year', sa.Integer(), nullable=False, comment='سال شمسی'),
+        sa.Column('jalali_month', sa.Integer(), nullable=False, comment='ماه شمسی'),
+        sa.Column('jalali_day', sa.Integer(), nullable=False, comment='روز شمسی'),
+        sa.Column('jalali_week', sa.Integer(), nullable=False, comment='هفته سال شمسی (شروع از شنبه)'),
+        sa.Column('weekday', sa.Integer(), nullable=False, comment='روز هفته (شنبه = 0)'),
+        sa.Column('fiscal_quarter', sa.Integer(), nullable=False, comment='فصل مالی'),
+        sa.Column('day_start_utc', sa.DateTime(), nullable=False, comment='شروع روز تهران به UTC'),
+        sa.Column('day_end_utc', sa.DateTime(), nullable=False, comment='پایان روز تهران به UTC'),
+        sa.PrimaryKeyConstraint('date')
+    )
+    op.create_index('ix_calendar_days_jalali', 'calendar_days', ['jalali_year', 'jalali_month', 'jalali_day'])
+    op.create_index('ix_calendar_days_day_start_utc', 'calendar_days', ['day_start_utc'])
+    
+    # پر کردن جدول از 1390 تا حدود 1420 شمسی
+    op.bulk_insert(calendar_days, build_calendar_rows(date(2011, 3, 21), date(2041, 3, 20)))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_calendar_days_day_start_utc', table_name='calendar_days')
+    op.drop_index('ix_calendar_days_jalali', table_name='calendar_days')
+    op.drop_table('calendar_days')
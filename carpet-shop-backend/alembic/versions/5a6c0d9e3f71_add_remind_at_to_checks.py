@@ -0,0 +1,57 @@
+"""Add remind_at to checks
+
+Revision ID: 5a6c0d9e3f71
+Revises: e91a4b6f2d15
+Create Date: 2026-10-19 16:48:13.905627
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = '5a6c0d9e3f71'
+down_revision = 'e91a4b6f2d15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('checks', sa.Column('remind_at', sa.DateTime(), nullable=True, comment='زمان یادآوری'))
+    
+    # فقط چک‌هایی که هنوز سررسید نشده‌اند؛ چک‌های قدیمی بعد از استقرار یادآوری نمی‌گیرند.
+    # فاصله یادآوری همان تنظیمات compute_remind_at است تا چک‌های موجود و جدید یکسان باشند
+    lead_days = {
+        "incoming": settings.reminder_lead_days_incoming,
+        "outgoing": settings.reminder_lead_days_outgoing,
+    }
+    if op.get_bind().dialect.name == "sqlite":
+        remind_at = (
+            "datetime(check_date, '-' || CASE WHEN check_type = 'INCOMING' "
+            "THEN :incoming ELSE :outgoing END || ' days')"
+        )
+        now = "CURRENT_TIMESTAMP"
+    else:
+        remind_at = (
+            "check_date - CASE WHEN check_type = 'INCOMING' "
+            "THEN :incoming ELSE :outgoing END * interval '1 day'"
+        )
+        now = "timezone('utc', now())"
+    op.execute(sa.text(
+        f"UPDATE checks SET remind_at = {remind_at} "
+        f"WHERE check_date >= {now} AND notification_sent IS NULL"
+    ).bindparams(**lead_days))
+    
+    op.create_index(
+        'ix_checks_remind_at_pending', 'checks', ['remind_at', 'id'],
+        postgresql_where=sa.text(
+            "notification_sent IS NULL AND remind_at IS NOT NULL "
+            "AND status IN ('REGISTERED', 'CONFIRMED')"
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_checks_remind_at_pending', table_name='checks')
+    op.drop_column('checks', 'remind_at')
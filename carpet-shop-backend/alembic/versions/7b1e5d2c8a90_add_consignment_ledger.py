@@ -0,0 +1,70 @@
+"""Add consignment ledger, balances and payouts
+
+Revision ID: 7b1e5d2c8a90
+Revises: 4f2a9c7e1b3d
+Create Date: 2026-10-19 11:03:27.144902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b1e5d2c8a90'
+down_revision = '4f2a9c7e1b3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'consignment_payouts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('total_amount', sa.Float(), nullable=False, comment='جمع پرداخت'),
+        sa.Column('owner_count', sa.Integer(), nullable=False, comment='تعداد صاحبان'),
+        sa.Column('description', sa.String(length=500), nullable=True, comment='توضیحات'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_consignment_payouts_id'), 'consignment_payouts', ['id'], unique=False)
+    op.create_table(
+        'consignment_balances',
+        sa.Column('owner', sa.String(length=200), nullable=False, comment='صاحب امانت'),
+        sa.Column('total_owed', sa.Float(), nullable=False, comment='جمع بدهی'),
+        sa.Column('total_paid', sa.Float(), nullable=False, comment='جمع پرداختی'),
+        sa.Column('balance', sa.Float(), nullable=False, comment='مانده'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('owner')
+    )
+    op.create_table(
+        'consignment_ledger',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('owner', sa.String(length=200), nullable=False, comment='صاحب امانت'),
+        sa.Column('entry_type', sa.Enum('SALE', 'REVERSAL', 'PAYOUT', name='ledgerentrytype'), nullable=False, comment='نوع ردیف'),
+        sa.Column('amount', sa.Float(), nullable=False, comment='مبلغ (مثبت = بدهی ما، منفی = پرداخت)'),
+        sa.Column('carpet_id', sa.Integer(), nullable=True),
+        sa.Column('invoice_id', sa.Integer(), nullable=True),
+        sa.Column('invoice_item_id', sa.Integer(), nullable=True),
+        sa.Column('payout_id', sa.Integer(), nullable=True),
+        sa.Column('description', sa.String(length=500), nullable=True, comment='توضیحات'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['carpet_id'], ['carpets.id']),
+        sa.ForeignKeyConstraint(['invoice_id'], ['invoices.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['invoice_item_id'], ['invoice_items.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['payout_id'], ['consignment_payouts.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_consignment_ledger_id'), 'consignment_ledger', ['id'], unique=False)
+    op.create_index(op.f('ix_consignment_ledger_owner'), 'consignment_ledger', ['owner'], unique=False)
+    op.create_index(op.f('ix_consignment_ledger_invoice_id'), 'consignment_ledger', ['invoice_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_consignment_ledger_invoice_id'), table_name='consignment_ledger')
+    op.drop_index(op.f('ix_consignment_ledger_owner'), table_name='consignment_ledger')
+    op.drop_index(op.f('ix_consignment_ledger_id'), table_name='consignment_ledger')
+    op.drop_table('consignment_ledger')
+    op.drop_table('consignment_balances')
+    op.drop_index(op.f('ix_consignment_payouts_id'), table_name='consignment_payouts')
+    op.drop_table('consignment_payouts')
+    sa.Enum(name='ledgerentrytype').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,44 @@
+"""Add check_status_history table
+
+Revision ID: a84f2c1e6b09
+Revises: 5a6c0d9e3f71
+Create Date: 2026-10-19 18:05:44.612380
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a84f2c1e6b09'
+down_revision = '5a6c0d9e3f71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # نوع checkstatus قبلاً برای جدول checks ساخته شده است
+    check_status = postgresql.ENUM(
+        'NOT_REGISTERED', 'REGISTERED', 'CONFIRMED', 'PASSED', 'BOUNCED',
+        name='checkstatus', create_type=False
+    )
+    op.create_table(
+        'check_status_history',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('check_id', sa.Integer(), nullable=False),
+        sa.Column('from_status', check_status, nullable=True, comment='وضعیت قبلی'),
+        sa.Column('to_status', check_status, nullable=False, comment='وضعیت جدید'),
+        sa.Column('note', sa.String(length=500), nullable=True, comment='توضیحات'),
+        sa.Column('changed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['check_id'], ['checks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_check_status_history_id'), 'check_status_history', ['id'], unique=False)
+    op.create_index(op.f('ix_check_status_history_check_id'), 'check_status_history', ['check_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_check_status_history_check_id'), table_name='check_status_history')
+    op.drop_index(op.f('ix_check_status_history_id'), table_name='check_status_history')
+    op.drop_table('check_status_history')
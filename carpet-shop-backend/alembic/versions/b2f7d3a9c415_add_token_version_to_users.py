@@ -0,0 +1,24 @@
+"""Add token_version to users
+
+Revision ID: b2f7d3a9c415
+Revises: a84f2c1e6b09
+Create Date: 2026-10-19 19:37:02.258116
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2f7d3a9c415'
+down_revision = 'a84f2c1e6b09'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,114 @@
+"""Add customers and link invoices/checks
+
+Revision ID: c3d8e1f4a627
+Revises: 7b1e5d2c8a90
+Create Date: 2026-10-19 13:41:09.802615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.text import normalize_name
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d8e1f4a627'
+down_revision = '7b1e5d2c8a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'customers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False, comment='نام مشتری'),
+        sa.Column('normalized_name', sa.String(length=200), nullable=False, comment='نام یکسان‌سازی شده'),
+        sa.Column('phone', sa.String(length=50), nullable=True, comment='تلفن'),
+        sa.Column('total_invoiced', sa.Float(), nullable=False, server_default='0', comment='جمع فاکتورها'),
+        sa.Column('total_paid_cash', sa.Float(), nullable=False, server_default='0', comment='جمع پرداخت نقدی'),
+        sa.Column('total_paid_by_check', sa.Float(), nullable=False, server_default='0', comment='جمع چک‌های پاس شده'),
+        sa.Column('total_bounced', sa.Float(), nullable=False, server_default='0', comment='جمع چک‌های برگشتی'),
+        sa.Column('outstanding', sa.Float(), nullable=False, server_default='0', comment='مانده بدهی'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('normalized_name')
+    )
+    op.create_index(op.f('ix_customers_id'), 'customers', ['id'], unique=False)
+    op.create_index(
+        'ix_customers_normalized_name_prefix', 'customers', ['normalized_name'],
+        postgresql_ops={'normalized_name': 'varchar_pattern_ops'}
+    )
+    # batch mode تا روی SQLite هم کلید خارجی اضافه شود (روی PostgreSQL همان ALTER است)
+    for table in ('invoices', 'checks'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('customer_id', sa.Integer(), nullable=True))
+            batch_op.create_index(f'ix_{table}_customer_id', ['customer_id'], unique=False)
+            batch_op.create_foreign_key(f'fk_{table}_customer_id', 'customers', ['customer_id'], ['id'])
+    
+    # ساخت مشتری‌ها از نام‌های موجود؛ نام‌هایی که بعد از یکسان‌سازی برابرند یک مشتری می‌شوند
+    bind = op.get_bind()
+    customers = {}
+    for name, in bind.execute(sa.text("SELECT DISTINCT customer_name FROM invoices ORDER BY customer_name")):
+        customers.setdefault(normalize_name(name), name.strip())
+    
+    for normalized, name in customers.items():
+        customer_id = bind.execute(
+            sa.text(
+                "INSERT INTO customers (name, normalized_name, created_at, updated_at) "
+                "VALUES (:name, :normalized, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP) RETURNING id"
+            ),
+            {"name": name, "normalized": normalized}
+        ).scalar()
+        customers[normalized] = customer_id
+    
+    for invoice_id, name in bind.execute(sa.text("SELECT id, customer_name FROM invoices")).fetchall():
+        bind.execute(
+            sa.text("UPDATE invoices SET customer_id = :customer_id WHERE id = :id"),
+            {"customer_id": customers[normalize_name(name)], "id": invoice_id}
+        )
+    
+    # چک‌های ورودی مرتبط با فاکتور
+    op.execute(
+        "UPDATE checks SET customer_id = invoices.customer_id FROM invoices "
+        "WHERE checks.invoice_id = invoices.id AND checks.check_type = 'INCOMING'"
+    )
+    
+    # محاسبه اولیه جمع‌ها
+    op.execute("""
+        UPDATE customers SET
+            total_invoiced = coalesce(inv.invoiced, 0),
+            total_paid_cash = coalesce(inv.cash, 0)
+        FROM (
+            SELECT customer_id,
+                   sum(total_amount) AS invoiced,
+                   sum(CASE WHEN payment_method = 'نقدی' THEN total_amount ELSE 0 END) AS cash
+            FROM invoices GROUP BY customer_id
+        ) inv
+        WHERE inv.customer_id = customers.id
+    """)
+    op.execute("""
+        UPDATE customers SET
+            total_paid_by_check = coalesce(chk.paid, 0),
+            total_bounced = coalesce(chk.bounced, 0)
+        FROM (
+            SELECT customer_id,
+                   sum(CASE WHEN status = 'PASSED' THEN amount ELSE 0 END) AS paid,
+                   sum(CASE WHEN status = 'BOUNCED' THEN amount ELSE 0 END) AS bounced
+            FROM checks WHERE check_type = 'INCOMING' AND customer_id IS NOT NULL
+            GROUP BY customer_id
+        ) chk
+        WHERE chk.customer_id = customers.id
+    """)
+    op.execute("UPDATE customers SET outstanding = total_invoiced - total_paid_cash - total_paid_by_check")
+
+
+def downgrade() -> None:
+    for table in ('checks', 'invoices'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(f'fk_{table}_customer_id', type_='foreignkey')
+            batch_op.drop_index(f'ix_{table}_customer_id')
+            batch_op.drop_column('customer_id')
+    op.drop_index('ix_customers_normalized_name_prefix', table_name='customers')
+    op.drop_index(op.f('ix_customers_id'), table_name='customers')
+    op.drop_table('customers')
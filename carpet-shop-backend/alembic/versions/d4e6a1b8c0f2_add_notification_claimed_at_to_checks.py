@@ -0,0 +1,24 @@
+"""Add notification_claimed_at to checks
+
+Revision ID: d4e6a1b8c0f2
+Revises: b2f7d3a9c415
+Create Date: 2026-10-19 21:14:36.508142
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e6a1b8c0f2'
+down_revision = 'b2f7d3a9c415'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('checks', sa.Column('notification_claimed_at', sa.DateTime(), nullable=True, comment='زمان برداشتن برای ارسال یادآوری'))
+
+
+def downgrade() -> None:
+    op.drop_column('checks', 'notification_claimed_at')
@@ -0,0 +1,40 @@
+"""Add check_notifications table
+
+Revision ID: e91a4b6f2d15
+Revises: c3d8e1f4a627
+Create Date: 2026-10-19 15:22:51.371048
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e91a4b6f2d15'
+down_revision = 'c3d8e1f4a627'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'check_notifications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('check_id', sa.Integer(), nullable=False),
+        sa.Column('channel', sa.String(length=50), nullable=False, comment='کانال ارسال'),
+        sa.Column('status', sa.Enum('SENT', 'FAILED', name='notificationstatus'), nullable=False, comment='وضعیت'),
+        sa.Column('attempts', sa.Integer(), nullable=False, comment='تعداد تلاش'),
+        sa.Column('error', sa.Text(), nullable=True, comment='خطا'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['check_id'], ['checks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_check_notifications_id'), 'check_notifications', ['id'], unique=False)
+    op.create_index(op.f('ix_check_notifications_check_id'), 'check_notifications', ['check_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_check_notifications_check_id'), table_name='check_notifications')
+    op.drop_index(op.f('ix_check_notifications_id'), table_name='check_notifications')
+    op.drop_table('check_notifications')
+    sa.Enum(name='notificationstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,124 @@
+"""
+نسخه async پرترافیک‌ترین endpointهای خواندنی
+
+با تنظیم ASYNC_ROUTERS (مثلاً "carpets,reports") router async قبل از router sync
+همان بخش ثبت می‌شود و مسیرهای مشترک را جایگزین می‌کند؛ بقیه مسیرها از router
+sync سرویس داده می‌شوند. پارامترها و تبدیل خطاها از app.api.params می‌آیند تا
+با نسخه sync یکی بمانند.
+"""
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List
+from app.database import get_async_db
+from app.schemas.carpet import CarpetResponse, CarpetListResponse
+from app.schemas.invoice import InvoiceResponse, InvoiceListResponse
+from app.schemas.check import CheckResponse
+from app.api.params import (
+    carpet_filters, invoice_filters, check_filters, upcoming_days,
+    timeseries_params, profitability_params, value_errors_as_400, found_or_404
+)
+from app.api.reports import FinancialReport, PeriodRequest, TimeseriesReport, ProfitabilityRow
+from app.services.async_services import (
+    AsyncCarpetService, AsyncInvoiceService, AsyncCheckService, AsyncReportService
+)
+
+carpets_router = APIRouter(prefix="/carpets", tags=["Carpets"])
+invoices_router = APIRouter(prefix="/invoices", tags=["Invoices"])
+checks_router = APIRouter(prefix="/checks", tags=["Checks"])
+reports_router = APIRouter(prefix="/reports", tags=["Reports"])
+
+@carpets_router.get("/", response_model=List[CarpetListResponse])
+async def list_carpets(
+    filters: Dict[str, Any] = Depends(carpet_filters),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """لیست فرش‌ها با فیلتر و جستجو"""
+    service = AsyncCarpetService(db)
+    return await service.list_carpets(**filters)
+
+@carpets_router.get("/{carpet_id:int}", response_model=CarpetResponse)
+async def get_carpet(carpet_id: int, db: AsyncSession = Depends(get_async_db)):
+    """دریافت اطلاعات کامل یک فرش"""
+    service = AsyncCarpetService(db)
+    return found_or_404(await service.get_carpet(carpet_id), "فرش یافت نشد")
+
+@invoices_router.get("/", response_model=List[InvoiceListResponse])
+async def list_invoices(
+    filters: Dict[str, Any] = Depends(invoice_filters),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """لیست فاکتورها با فیلتر"""
+    service = AsyncInvoiceService(db)
+    return await service.list_invoices(**filters)
+
+@invoices_router.get("/{invoice_id:int}", response_model=InvoiceResponse)
+async def get_invoice(invoice_id: int, db: AsyncSession = Depends(get_async_db)):
+    """دریافت اطلاعات کامل یک فاکتور"""
+    service = AsyncInvoiceService(db)
+    return found_or_404(await service.get_invoice(invoice_id), "فاکتور یافت نشد")
+
+@checks_router.get("/", response_model=List[CheckResponse])
+async def list_checks(
+    filters: Dict[str, Any] = Depends(check_filters),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """لیست چک‌ها با فیلتر"""
+    service = AsyncCheckService(db)
+    return await service.list_checks(**filters)
+
+@checks_router.get("/upcoming", response_model=List[CheckResponse])
+async def get_upcoming_checks(
+    days: int = Depends(upcoming_days),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """دریافت چک‌های نزدیک به سررسید"""
+    service = AsyncCheckService(db)
+    return await service.get_upcoming_checks(days)
+
+@checks_router.get("/{check_id:int}", response_model=CheckResponse)
+async def get_check(check_id: int, db: AsyncSession = Depends(get_async_db)):
+    """دریافت اطلاعات یک چک"""
+    service = AsyncCheckService(db)
+    return found_or_404(await service.get_check(check_id), "چک یافت نشد")
+
+@reports_router.post("/financial", response_model=FinancialReport)
+async def get_financial_report(
+    period: PeriodRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """گزارش مالی با بازه زمانی دلخواه"""
+    service = AsyncReportService(db)
+    return await service.get_financial_report(period.start_date, period.end_date)
+
+@reports_router.get("/inventory")
+async def get_inventory_report(db: AsyncSession = Depends(get_async_db)):
+    """گزارش موجودی انبار"""
+    service = AsyncReportService(db)
+    return await service.get_inventory_report()
+
+@reports_router.get("/timeseries", response_model=TimeseriesReport)
+async def get_timeseries_report(
+    params: Dict[str, Any] = Depends(timeseries_params),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """سری زمانی درآمد، سود، تعداد فروش یا چک‌ها برای نمودار"""
+    service = AsyncReportService(db)
+    with value_errors_as_400():
+        return await service.get_timeseries(**params)
+
+@reports_router.get("/profitability", response_model=List[ProfitabilityRow])
+async def get_profitability_report(
+    params: Dict[str, Any] = Depends(profitability_params),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """سودآوری به تفکیک برند، جنس، اندازه یا فروشنده"""
+    service = AsyncReportService(db)
+    with value_errors_as_400():
+        return await service.get_profitability_report(**params)
+
+ASYNC_ROUTERS = {
+    "carpets": carpets_router,
+    "invoices": invoices_router,
+    "checks": checks_router,
+    "reports": reports_router,
+}
@@ -1,26 +1,42 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from sqlalchemy.orm.attributes import set_committed_value
+from datetime import datetime
 from app.database import get_db
 from app.models.user import User, UserRole
-from app.schemas.user import UserCreate, UserResponse, Token, LoginRequest
+from app.schemas.user import UserCreate, UserResponse, Token, LoginRequest, RefreshRequest, TokenData
+from fastapi.concurrency import run_in_threadpool
+from app.utils.write_behind import touch_buffer
 from app.utils.auth import (
     get_password_hash,
-    authenticate_user,
-    create_access_token,
+    authenticate_user_async,
+    create_token_pair,
+    decode_token,
+    revoke_token,
     get_current_user,
-    require_admin,
-    ACCESS_TOKEN_EXPIRE_MINUTES
+    oauth2_scheme,
+    require_admin
 )
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+def _record_login(db: Session, user: User) -> None:
+    # هش جدید رمز (در صورت تغییر تنظیمات) فوراً ذخیره می‌شود
+    if user in db.dirty:
+        db.commit()
+        db.refresh(user)
+    
+    # last_login از طریق بافر write-behind نوشته می‌شود
+    now = datetime.utcnow()
+    touch_buffer.touch(User, user.id, "last_login", now)
+    set_committed_value(user, "last_login", now)
+
 @router.post("/register", response_model=UserResponse, status_code=201)
 def register(
     user_data: UserCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin)  # فقط ادمین می‌تونه یوزر جدید بسازه
+    current_user: TokenData = Depends(require_admin)  # فقط ادمین می‌تونه یوزر جدید بسازه
 ):
     """ثبت‌نام کاربر جدید (فقط ادمین)"""
     
@@ -54,12 +70,12 @@ def register(
     return user
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     login_data: LoginRequest,
     db: Session = Depends(get_db)
 ):
     """ورود به سیستم"""
-    user = authenticate_user(db, login_data.username, login_data.password)
+    user = await authenticate_user_async(db, login_data.username, login_data.password)
     
     if not user:
         raise HTTPException(
@@ -68,30 +84,19 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # آپدیت آخرین ورود
-    user.last_login = datetime.utcnow()
-    db.commit()
-    
-    # ایجاد token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username, "role": user.role.value},
-        expires_delta=access_token_expires
-    )
+    # آپدیت آخرین ورود (و هش جدید رمز در صورت تغییر تنظیمات)
+    await run_in_threadpool(_record_login, db, user)
     
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user": user
-    }
+    # ایجاد توکن دسترسی کوتاه‌مدت و توکن تمدید
+    return {**create_token_pair(user), "user": user}
 
 @router.post("/token", response_model=Token)
-def login_for_swagger(
+async def login_for_swagger(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """ورود برای Swagger UI (OAuth2)"""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     
     if not user:
         raise HTTPException(
@@ -100,20 +105,52 @@ def login_for_swagger(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user.last_login = datetime.utcnow()
-    db.commit()
+    await run_in_threadpool(_record_login, db, user)
     
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username, "role": user.role.value},
-        expires_delta=access_token_expires
+    return {**create_token_pair(user), "user": user}
+
+@router.post("/refresh", response_model=Token)
+def refresh_token(
+    request: RefreshRequest,
+    db: Session = Depends(get_db)
+):
+    """تمدید توکن؛ توکن تمدید قبلی باطل و جفت جدید صادر می‌شود"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="توکن تمدید نامعتبر است",
+        headers={"WWW-Authenticate": "Bearer"},
     )
     
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user": user
-    }
+    try:
+        token_data = decode_token(request.refresh_token, expected_type="refresh")
+    except HTTPException:
+        raise credentials_exception
+    
+    user = db.query(User).filter(User.username == token_data.username).first()
+    if not user or not user.is_active:
+        raise credentials_exception
+    
+    if token_data.token_version != user.token_version:
+        raise credentials_exception
+    
+    # ابطال اتمیک؛ از دو درخواست هم‌زمان با یک توکن تمدید فقط یکی موفق می‌شود
+    if not revoke_token(token_data):
+        raise credentials_exception
+    return {**create_token_pair(user), "user": user}
+
+@router.post("/logout", status_code=204)
+def logout(
+    request: RefreshRequest = None,
+    token: str = Depends(oauth2_scheme)
+):
+    """خروج: ابطال توکن دسترسی فعلی و توکن تمدید (در صورت ارسال)"""
+    revoke_token(decode_token(token))
+    if request and request.refresh_token:
+        try:
+            revoke_token(decode_token(request.refresh_token, expected_type="refresh"))
+        except HTTPException:
+            pass
+    return None
 
 @router.get("/me", response_model=UserResponse)
 def get_me(current_user: User = Depends(get_current_user)):
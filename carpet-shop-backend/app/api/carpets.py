@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from app.database import get_db
 from app.models.user import User
+from app.schemas.user import TokenData
 from app.utils.auth import get_current_user, require_admin
 from app.schemas.carpet import (
     CarpetCreate, CarpetUpdate, CarpetResponse, CarpetListResponse,
     CarpetOperationCreate, CarpetOperationUpdate, CarpetOperationResponse
 )
 from app.services.carpet_service import CarpetService
+from app.api.params import carpet_filters, found_or_404
 from app.models.carpet import CarpetSize
 from fastapi.responses import FileResponse, JSONResponse
 import os
@@ -26,33 +28,18 @@ def create_carpet(
 
 @router.get("/", response_model=List[CarpetListResponse])
 def list_carpets(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
-    size: Optional[CarpetSize] = None,
-    material: Optional[str] = None,
-    search: Optional[str] = None,
-    available_only: bool = False,
+    filters: Dict[str, Any] = Depends(carpet_filters),
     db: Session = Depends(get_db)
 ):
     """لیست فرش‌ها با فیلتر و جستجو"""
     service = CarpetService(db)
-    return service.list_carpets(
-        skip=skip,
-        limit=limit,
-        size=size,
-        material=material,
-        search=search,
-        available_only=available_only
-    )
+    return service.list_carpets(**filters)
 
 @router.get("/{carpet_id}", response_model=CarpetResponse)
 def get_carpet(carpet_id: int, db: Session = Depends(get_db)):
     """دریافت اطلاعات کامل یک فرش"""
     service = CarpetService(db)
-    carpet = service.get_carpet(carpet_id)
-    if not carpet:
-        raise HTTPException(status_code=404, detail="فرش یافت نشد")
-    return carpet
+    return found_or_404(service.get_carpet(carpet_id), "فرش یافت نشد")
 
 @router.put("/{carpet_id}", response_model=CarpetResponse)
 def update_carpet(
@@ -72,7 +59,7 @@ def update_carpet(
 def delete_carpet(
     carpet_id: int, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin)
+    current_user: TokenData = Depends(require_admin)
 ):
     """حذف نرم فرش (فقط ادمین)"""
     service = CarpetService(db)
@@ -87,7 +74,7 @@ def delete_carpet(
 def restore_carpet(
     carpet_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin)
+    current_user: TokenData = Depends(require_admin)
 ):
     """بازگردانی فرش حذف شده (فقط ادمین)"""
     service = CarpetService(db)
@@ -104,7 +91,7 @@ async def upload_carpet_image(
     carpet_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin)  # فقط ادمین
+    current_user: TokenData = Depends(require_admin)  # فقط ادمین
 ):
     """آپلود عکس فرش"""
     
@@ -1,14 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime
+from typing import Any, Dict, List, Optional
 from app.database import get_db
-from app.schemas.check import CheckCreate, CheckUpdate, CheckResponse
+from app.schemas.check import (
+    CheckCreate, CheckUpdate, CheckResponse, CashflowProjection,
+    BulkTransitionRequest, TransitionResult, ReconciliationResult
+)
 from app.services.check_service import CheckService
-from app.models.check import CheckStatus, CheckType
+from app.api.params import check_filters, upcoming_days, value_errors_as_400, found_or_404
+from app.services.reconciliation_service import ReconciliationService
+from app.models.user import UserRole
+from app.utils.auth import decode_token, optional_oauth2_scheme
 
 router = APIRouter(prefix="/checks", tags=["Checks"])
 
+def status_override(
+    force: bool = Query(False, description="اصلاح وضعیت خارج از قواعد تغییر وضعیت (فقط ادمین)"),
+    token: Optional[str] = Depends(optional_oauth2_scheme)
+) -> bool:
+    """force فقط برای ادمین مجاز است؛ بقیه درخواست‌ها بدون نیاز به ورود مثل قبل"""
+    if not force:
+        return False
+    if not token:
+        raise HTTPException(status_code=401, detail="احراز هویت نامعتبر", headers={"WWW-Authenticate": "Bearer"})
+    if decode_token(token).role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="دسترسی مجاز نیست. نیاز به نقش ادمین")
+    return True
+
 @router.post("/", response_model=CheckResponse, status_code=201)
 def create_check(
     check: CheckCreate,
@@ -16,58 +34,80 @@ def create_check(
 ):
     """ایجاد چک جدید"""
     service = CheckService(db)
-    return service.create_check(check)
+    with value_errors_as_400():
+        return service.create_check(check)
+
 @router.get("/", response_model=List[CheckResponse])
 def list_checks(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
-    check_type: Optional[CheckType] = None,
-    status: Optional[CheckStatus] = None,
-    start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None,
+    filters: Dict[str, Any] = Depends(check_filters),
     db: Session = Depends(get_db)
 ):
     """لیست چک‌ها با فیلتر"""
     service = CheckService(db)
-    return service.list_checks(
-        skip=skip,
-        limit=limit,
-        check_type=check_type,
-        status=status,
-        start_date=start_date,
-        end_date=end_date
-    )
+    return service.list_checks(**filters)
 
 @router.get("/upcoming", response_model=List[CheckResponse])
 def get_upcoming_checks(
-    days: int = Query(7, ge=1, le=90),
+    days: int = Depends(upcoming_days),
     db: Session = Depends(get_db)
 ):
     """دریافت چک‌های نزدیک به سررسید"""
     service = CheckService(db)
     return service.get_upcoming_checks(days)
 
+@router.get("/cashflow", response_model=CashflowProjection)
+def get_cashflow_projection(
+    days: int = Query(90, ge=1, le=366),
+    opening_balance: float = 0.0,
+    weighted: bool = False,
+    db: Session = Depends(get_db)
+):
+    """پیش‌بینی مانده روزانه حساب از روی چک‌های باز (weighted: اعمال نرخ برگشت تاریخی)"""
+    service = CheckService(db)
+    return service.get_cashflow_projection(days, opening_balance, weighted)
+
+@router.post("/bulk-transition", response_model=List[TransitionResult])
+def bulk_transition_checks(
+    request: BulkTransitionRequest,
+    db: Session = Depends(get_db)
+):
+    """تغییر وضعیت گروهی چک‌ها (مثلاً پاس یا برگشت چند چک از صورت‌حساب بانک)"""
+    service = CheckService(db)
+    return service.bulk_transition(request.transitions, request.note)
+
+@router.post("/reconcile", response_model=ReconciliationResult)
+def reconcile_bank_statement(
+    file: UploadFile = File(...),
+    date_tolerance_days: int = Query(3, ge=0, le=60),
+    amount_tolerance: float = Query(0.5, ge=0),
+    dry_run: bool = False,
+    db: Session = Depends(get_db)
+):
+    """تطبیق فایل CSV صورت‌حساب بانک با چک‌ها (ستون‌ها: check_number, amount, date, status)"""
+    service = ReconciliationService(db)
+    try:
+        return service.reconcile(file.file, date_tolerance_days, amount_tolerance, dry_run)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="فایل باید CSV با کدگذاری UTF-8 باشد")
+
 @router.get("/{check_id}", response_model=CheckResponse)
 def get_check(check_id: int, db: Session = Depends(get_db)):
     """دریافت اطلاعات یک چک"""
     service = CheckService(db)
-    check = service.get_check(check_id)
-    if not check:
-        raise HTTPException(status_code=404, detail="چک یافت نشد")
-    return check
+    return found_or_404(service.get_check(check_id), "چک یافت نشد")
 
 @router.put("/{check_id}", response_model=CheckResponse)
 def update_check(
     check_id: int,
     check_update: CheckUpdate,
+    force: bool = Depends(status_override),
     db: Session = Depends(get_db)
 ):
-    """ویرایش چک"""
+    """ویرایش چک (تغییر وضعیت طبق قواعد؛ ادمین با force=true می‌تواند اشتباه را اصلاح کند)"""
     service = CheckService(db)
-    check = service.update_check(check_id, check_update)
-    if not check:
-        raise HTTPException(status_code=404, detail="چک یافت نشد")
-    return check
+    with value_errors_as_400():
+        check = service.update_check(check_id, check_update, force_status=force)
+    return found_or_404(check, "چک یافت نشد")
 
 @router.delete("/{check_id}", status_code=204)
 def delete_check(check_id: int, db: Session = Depends(get_db)):
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db
+from app.schemas.user import TokenData
+from app.utils.auth import require_admin
+from app.schemas.consignment import (
+    LedgerEntryResponse, OwnerBalanceResponse, PayoutCreate, PayoutResponse
+)
+from app.services.consignment_service import ConsignmentService
+
+router = APIRouter(prefix="/consignments", tags=["Consignments"])
+
+@router.get("/balances", response_model=List[OwnerBalanceResponse])
+def list_balances(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    outstanding_only: bool = False,
+    db: Session = Depends(get_db)
+):
+    """لیست مانده حساب صاحبان امانت"""
+    service = ConsignmentService(db)
+    return service.list_balances(skip=skip, limit=limit, outstanding_only=outstanding_only)
+
+@router.get("/balances/{owner}", response_model=OwnerBalanceResponse)
+def get_balance(owner: str, db: Session = Depends(get_db)):
+    """مانده حساب یک صاحب امانت"""
+    service = ConsignmentService(db)
+    balance = service.get_balance(owner)
+    if not balance:
+        raise HTTPException(status_code=404, detail="صاحب امانت یافت نشد")
+    return balance
+
+@router.get("/ledger", response_model=List[LedgerEntryResponse])
+def list_ledger(
+    owner: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """ردیف‌های دفتر امانت"""
+    service = ConsignmentService(db)
+    return service.list_ledger(owner=owner, skip=skip, limit=limit)
+
+@router.post("/payouts", response_model=PayoutResponse, status_code=201)
+def create_payout(
+    payout: PayoutCreate,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(require_admin)
+):
+    """تسویه گروهی با صاحبان امانت (فقط ادمین)"""
+    service = ConsignmentService(db)
+    try:
+        return service.create_payout(payout)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List
+from app.database import get_db
+from app.schemas.customer import (
+    CustomerCreate, CustomerResponse, CustomerSearchResult, CustomerStatement
+)
+from app.services.customer_service import CustomerService
+
+router = APIRouter(prefix="/customers", tags=["Customers"])
+
+@router.post("/", response_model=CustomerResponse, status_code=201)
+def create_customer(customer: CustomerCreate, db: Session = Depends(get_db)):
+    """ایجاد مشتری جدید"""
+    service = CustomerService(db)
+    try:
+        return service.create_customer(customer.name, customer.phone)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/", response_model=List[CustomerResponse])
+def list_customers(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    debtors_only: bool = False,
+    db: Session = Depends(get_db)
+):
+    """لیست مشتری‌ها (به ترتیب مانده بدهی)"""
+    service = CustomerService(db)
+    return service.list_customers(skip=skip, limit=limit, debtors_only=debtors_only)
+
+@router.get("/search", response_model=List[CustomerSearchResult])
+def search_customers(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """جستجوی سریع نام مشتری برای تکمیل خودکار"""
+    service = CustomerService(db)
+    return service.search(q, limit)
+
+@router.get("/{customer_id}", response_model=CustomerResponse)
+def get_customer(customer_id: int, db: Session = Depends(get_db)):
+    """دریافت اطلاعات و مانده یک مشتری"""
+    service = CustomerService(db)
+    customer = service.get_customer(customer_id)
+    if not customer:
+        raise HTTPException(status_code=404, detail="مشتری یافت نشد")
+    return customer
+
+@router.get("/{customer_id}/statement", response_model=CustomerStatement)
+def get_customer_statement(customer_id: int, db: Session = Depends(get_db)):
+    """صورت‌حساب مشتری"""
+    service = CustomerService(db)
+    statement = service.get_statement(customer_id)
+    if not statement:
+        raise HTTPException(status_code=404, detail="مشتری یافت نشد")
+    return statement
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime
+from typing import Any, Dict, List
 from app.database import get_db
 from app.schemas.invoice import (
     InvoiceCreate, InvoiceUpdate, InvoiceResponse, InvoiceListResponse
 )
 from app.services.invoice_service import InvoiceService
+from app.api.params import invoice_filters, value_errors_as_400, found_or_404
 
 router = APIRouter(prefix="/invoices", tags=["Invoices"])
 
@@ -17,35 +17,23 @@ def create_invoice(
 ):
     """ایجاد فاکتور جدید"""
     service = InvoiceService(db)
-    return service.create_invoice(invoice)
+    with value_errors_as_400():
+        return service.create_invoice(invoice)
 
 @router.get("/", response_model=List[InvoiceListResponse])
 def list_invoices(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
-    customer_name: Optional[str] = None,
-    start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None,
+    filters: Dict[str, Any] = Depends(invoice_filters),
     db: Session = Depends(get_db)
 ):
     """لیست فاکتورها با فیلتر"""
     service = InvoiceService(db)
-    return service.list_invoices(
-        skip=skip,
-        limit=limit,
-        customer_name=customer_name,
-        start_date=start_date,
-        end_date=end_date
-    )
+    return service.list_invoices(**filters)
 
 @router.get("/{invoice_id}", response_model=InvoiceResponse)
 def get_invoice(invoice_id: int, db: Session = Depends(get_db)):
     """دریافت اطلاعات کامل یک فاکتور"""
     service = InvoiceService(db)
-    invoice = service.get_invoice(invoice_id)
-    if not invoice:
-        raise HTTPException(status_code=404, detail="فاکتور یافت نشد")
-    return invoice
+    return found_or_404(service.get_invoice(invoice_id), "فاکتور یافت نشد")
 
 @router.put("/{invoice_id}", response_model=InvoiceResponse)
 def update_invoice(
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from typing import Dict, List
+from app.schemas.user import TokenData
+from app.utils.auth import require_admin
+from app.utils.pool_metrics import pool_snapshot
+from app.database import read_engine, replica_health
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+@router.get("/db-pool")
+def get_db_pool_metrics(current_user: TokenData = Depends(require_admin)) -> List[Dict]:
+    """وضعیت pool اتصال دیتابیس این worker (زمان انتظار، اتصال‌های در حال استفاده و overflow)"""
+    return pool_snapshot()
+
+@router.get("/db-replica")
+def get_db_replica_status(current_user: TokenData = Depends(require_admin)) -> Dict:
+    """وضعیت replica خواندنی و آخرین تاخیر اندازه‌گیری شده"""
+    return {
+        "configured": read_engine is not None,
+        "healthy": replica_health.available(),
+        "lag_seconds": replica_health.lag,
+    }
@@ -0,0 +1,90 @@
+"""
+پارامترها و تبدیل خطاهای مشترک routerهای sync و async
+
+هر دو نسخه endpointها از همین وابستگی‌ها استفاده می‌کنند تا اعتبارسنجی
+پارامترها و کد خطاها یکی بماند.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, TypeVar
+from fastapi import HTTPException, Query
+from app.models.carpet import CarpetSize
+from app.models.check import CheckStatus, CheckType
+
+T = TypeVar("T")
+
+def carpet_filters(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    size: Optional[CarpetSize] = None,
+    material: Optional[str] = None,
+    search: Optional[str] = None,
+    available_only: bool = False
+) -> Dict[str, Any]:
+    """فیلترهای لیست فرش‌ها"""
+    return dict(skip=skip, limit=limit, size=size, material=material, search=search, available_only=available_only)
+
+def invoice_filters(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    customer_name: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """فیلترهای لیست فاکتورها"""
+    return dict(skip=skip, limit=limit, customer_name=customer_name, start_date=start_date, end_date=end_date)
+
+def check_filters(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    check_type: Optional[CheckType] = None,
+    status: Optional[CheckStatus] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """فیلترهای لیست چک‌ها"""
+    return dict(
+        skip=skip, limit=limit, check_type=check_type, status=status,
+        start_date=start_date, end_date=end_date
+    )
+
+def upcoming_days(days: int = Query(7, ge=1, le=90)) -> int:
+    """بازه چک‌های نزدیک به سررسید (روز)"""
+    return days
+
+def timeseries_params(
+    metric: str = Query(..., pattern="^(revenue|profit|units|checks_in|checks_out)$"),
+    bucket: str = Query("day", pattern="^(day|week|month)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """پارامترهای گزارش سری زمانی (کلیدها همان آرگومان‌های get_timeseries)"""
+    return dict(metric=metric, bucket=bucket, start_date=start, end_date=end)
+
+def profitability_params(
+    dimension: str = Query("brand", pattern="^(brand|material|size|seller)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    sort_by: str = Query("profit", pattern="^(profit|margin|revenue|units_sold|sell_through_rate|avg_days_to_sell)$"),
+    limit: int = Query(50, ge=1, le=500),
+    percentiles: bool = False
+) -> Dict[str, Any]:
+    """پارامترهای گزارش سودآوری (کلیدها همان آرگومان‌های get_profitability_report)"""
+    return dict(
+        dimension=dimension, start_date=start, end_date=end, sort_by=sort_by,
+        limit=limit, include_percentiles=percentiles
+    )
+
+@contextmanager
+def value_errors_as_400() -> Iterator[None]:
+    """ValueError سرویس‌ها (ورودی نامعتبر) به پاسخ 400 تبدیل می‌شود"""
+    try:
+        yield
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def found_or_404(item: Optional[T], detail: str) -> T:
+    """برگرداندن نتیجه یا 404 اگر پیدا نشد"""
+    if not item:
+        raise HTTPException(status_code=404, detail=detail)
+    return item
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Dict, List
+from app.schemas.user import TokenData
+from app.utils.auth import require_admin
+from app.utils.request_profiler import profile_store
+
+router = APIRouter(prefix="/profiles", tags=["Profiles"])
+
+@router.get("/")
+def list_profiles(current_user: TokenData = Depends(require_admin)) -> List[Dict]:
+    """فهرست پروفایل‌های ذخیره شده (بدون پشته‌ها)"""
+    return profile_store.list()
+
+@router.get("/{profile_id}")
+def get_profile(profile_id: str, current_user: TokenData = Depends(require_admin)) -> Dict:
+    """پروفایل کامل به صورت JSON"""
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="پروفایل یافت نشد")
+    return profile
+
+@router.get("/{profile_id}/collapsed", response_class=PlainTextResponse)
+def download_profile_collapsed(profile_id: str, current_user: TokenData = Depends(require_admin)):
+    """دانلود با فرمت collapsed stacks برای speedscope یا flamegraph.pl"""
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="پروفایل یافت نشد")
+    body = "\n".join(f"{stack} {count}" for stack, count in profile["stacks"].items())
+    return PlainTextResponse(
+        body,
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.txt"'}
+    )
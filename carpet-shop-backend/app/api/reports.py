@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, Query
+import uuid
+import redis
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from app.database import get_db
 from app.services.report_service import ReportService
-from pydantic import BaseModel
+from app.api.params import timeseries_params, profitability_params, value_errors_as_400
+from pydantic import BaseModel, Field, ValidationError
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
@@ -18,6 +22,79 @@ class FinancialReport(BaseModel):
     total_outgoing_checks: float
     net_check_balance: float
 
+class TimeseriesPoint(BaseModel):
+    period: datetime
+    value: float
+
+class TimeseriesReport(BaseModel):
+    metric: str
+    bucket: str
+    start_date: datetime
+    end_date: datetime
+    points: List[TimeseriesPoint]
+
+class JalaliPeriodReport(FinancialReport):
+    period: str
+    jalali_year: int
+    jalali_month: Optional[int] = None
+    fiscal_quarter: Optional[int] = None
+    start_date: datetime
+    end_date: datetime
+
+class JalaliMonthReport(BaseModel):
+    jalali_year: int
+    jalali_month: int
+    total_revenue: float
+    total_invoices: int
+
+class ReportJobRequest(BaseModel):
+    report_type: str = Field(..., pattern="^(financial|inventory|timeseries|jalali_monthly)$")
+    params: Dict[str, Any] = {}
+
+# پارامترهای هر نوع گزارش پس‌زمینه؛ قبل از صف شدن بررسی می‌شوند
+class FinancialJobParams(BaseModel):
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+class InventoryJobParams(BaseModel):
+    pass
+
+class TimeseriesJobParams(BaseModel):
+    metric: str = Field("revenue", pattern="^(revenue|profit|units|checks_in|checks_out)$")
+    bucket: str = Field("day", pattern="^(day|week|month)$")
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+class JalaliMonthlyJobParams(BaseModel):
+    jalali_year: int = Field(..., ge=1300, le=1500)
+
+REPORT_JOB_PARAMS = {
+    "financial": FinancialJobParams,
+    "inventory": InventoryJobParams,
+    "timeseries": TimeseriesJobParams,
+    "jalali_monthly": JalaliMonthlyJobParams,
+}
+
+class ReportJobResponse(BaseModel):
+    job_id: str
+    report_type: Optional[str] = None
+    status: str
+    progress: Optional[float] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+class ProfitabilityRow(BaseModel):
+    key: Optional[str]
+    units_sold: int
+    in_stock: int
+    revenue: float
+    cost: float
+    profit: float
+    margin: float
+    sell_through_rate: float
+    avg_days_to_sell: Optional[float]
+    percentiles: Optional[Dict[str, Optional[float]]] = None
+
 class PeriodRequest(BaseModel):
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
@@ -83,4 +160,103 @@ def get_annual_report(db: Session = Depends(get_db)):
 def get_inventory_report(db: Session = Depends(get_db)):
     """گزارش موجودی انبار"""
     service = ReportService(db)
-    return service.get_inventory_report()
\ No newline at end of file
+    return service.get_inventory_report()
+
+@router.get("/timeseries", response_model=TimeseriesReport)
+def get_timeseries_report(
+    params: Dict[str, Any] = Depends(timeseries_params),
+    db: Session = Depends(get_db)
+):
+    """سری زمانی درآمد، سود، تعداد فروش یا چک‌ها برای نمودار"""
+    service = ReportService(db)
+    with value_errors_as_400():
+        return service.get_timeseries(**params)
+
+@router.get("/jalali/monthly", response_model=List[JalaliMonthReport])
+def get_jalali_monthly_report(
+    jalali_year: int = Query(..., ge=1300, le=1500),
+    db: Session = Depends(get_db)
+):
+    """فروش ماه به ماه یک سال شمسی"""
+    service = ReportService(db)
+    return service.get_jalali_monthly_report(jalali_year)
+
+@router.get("/jalali/{period}", response_model=JalaliPeriodReport)
+def get_jalali_period_report(period: str, db: Session = Depends(get_db)):
+    """گزارش مالی ماه/فصل/سال شمسی جاری یا قبلی (مثلاً this_month یا last_quarter)"""
+    service = ReportService(db)
+    try:
+        return service.get_jalali_period_report(period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.post("/jobs", response_model=ReportJobResponse, status_code=202)
+def create_report_job(job: ReportJobRequest):
+    """ثبت گزارش سنگین برای اجرا در پس‌زمینه"""
+    # import داخل تابع تا شروع برنامه Celery را بارگذاری نکند
+    from app.tasks.report_tasks import acquire_slot, release_slot, run_report_job
+    
+    try:
+        params = REPORT_JOB_PARAMS[job.report_type](**job.params)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=jsonable_encoder(e.errors(include_url=False, include_context=False)))
+    
+    job_id = uuid.uuid4().hex
+    try:
+        acquired = acquire_slot(job.report_type, job_id)
+    except redis.RedisError:
+        raise HTTPException(status_code=503, detail="صف گزارش‌ها در دسترس نیست")
+    if not acquired:
+        raise HTTPException(
+            status_code=429,
+            detail="تعداد گزارش‌های در حال اجرا از این نوع به سقف رسیده است"
+        )
+    
+    try:
+        task = run_report_job.apply_async(
+            (job.report_type, params.model_dump(mode="json", exclude_none=True)), task_id=job_id
+        )
+    except Exception:
+        # اگر صف در دسترس نباشد task هرگز اجرا نمی‌شود که جای رزرو شده را آزاد کند
+        try:
+            release_slot(job.report_type, job_id)
+        except redis.RedisError:
+            pass  # جای رزرو شده با رسیدن مهلتش آزاد می‌شود
+        raise HTTPException(status_code=503, detail="صف گزارش‌ها در دسترس نیست")
+    return {"job_id": task.id, "report_type": job.report_type, "status": task.status}
+
+@router.get("/jobs/{job_id}", response_model=ReportJobResponse)
+def get_report_job(job_id: str):
+    """وضعیت و نتیجه یک گزارش پس‌زمینه"""
+    from app.tasks.report_tasks import run_report_job
+    
+    task = run_report_job.AsyncResult(job_id)
+    response = {"job_id": job_id, "status": task.status}
+    
+    if task.status == "PROGRESS" and isinstance(task.info, dict):
+        response["progress"] = task.info.get("progress")
+    elif task.successful():
+        response["progress"] = 1.0
+        response["result"] = task.result
+    elif task.failed():
+        response["error"] = str(task.result)
+    
+    return response
+
+@router.get("/profitability", response_model=List[ProfitabilityRow])
+def get_profitability_report(
+    params: Dict[str, Any] = Depends(profitability_params),
+    db: Session = Depends(get_db)
+):
+    """سودآوری به تفکیک برند، جنس، اندازه یا فروشنده"""
+    service = ReportService(db)
+    with value_errors_as_400():
+        return service.get_profitability_report(**params)
+
+@router.get("/inventory/aging")
+def get_inventory_aging_report(db: Session = Depends(get_db)):
+    """گزارش سن موجودی انبار (کش کوتاه‌مدت)"""
+    service = ReportService(db)
+    return service.get_inventory_aging_report()
\ No newline at end of file
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, List
+from app.schemas.user import TokenData
+from app.utils.auth import require_admin
+from app.utils.tracing import exporter
+
+router = APIRouter(prefix="/traces", tags=["Traces"])
+
+@router.get("/")
+def list_traces(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: TokenData = Depends(require_admin)
+) -> List[Dict]:
+    """traceهای اخیر با span ریشه، مدت و تعداد span"""
+    traces: Dict[str, Dict] = {}
+    for span in exporter.recent_spans():
+        trace = traces.setdefault(span["trace_id"], {
+            "trace_id": span["trace_id"], "root": None, "start": span["start"],
+            "duration_ms": 0.0, "span_count": 0, "sql_count": 0, "errors": 0
+        })
+        trace["span_count"] += 1
+        trace["sql_count"] += span["kind"] == "sql"
+        trace["errors"] += span["error"] is not None
+        trace["start"] = min(trace["start"], span["start"])
+        if span["parent_id"] is None:
+            trace["root"] = span["name"]
+            trace["duration_ms"] = span["duration_ms"] or 0.0
+        elif trace["root"] is None:
+            # span ریشه از buffer خارج شده؛ طولانی‌ترین span نمایش داده می‌شود
+            trace["duration_ms"] = max(trace["duration_ms"], span["duration_ms"] or 0.0)
+    return sorted(traces.values(), key=lambda t: t["start"], reverse=True)[:limit]
+
+@router.get("/{trace_id}")
+def get_trace(trace_id: str, current_user: TokenData = Depends(require_admin)) -> List[Dict]:
+    """همه spanهای یک trace به ترتیب شروع (برای دیدن مسیر بحرانی)"""
+    spans = [span for span in exporter.recent_spans() if span["trace_id"] == trace_id]
+    if not spans:
+        raise HTTPException(status_code=404, detail="trace یافت نشد")
+    return sorted(spans, key=lambda span: span["start"])
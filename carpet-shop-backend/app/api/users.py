@@ -0,0 +1,98 @@
+import redis
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List
+from app.database import get_db
+from app.models.user import User
+from app.schemas.user import TokenData, UserResponse, UserUpdate
+from app.utils.auth import (
+    get_password_hash,
+    require_admin,
+    bump_token_version,
+    invalidate_user_cache,
+    revoke_user_tokens
+)
+
+router = APIRouter(prefix="/users", tags=["Users"])
+
+def _revoke_before_commit(db: Session, user: User) -> None:
+    """ابطال توکن‌های قبلی؛ اگر ممکن نباشد تغییرات ذخیره نمی‌شود"""
+    try:
+        revoke_user_tokens(user)
+    except redis.RedisError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="ابطال توکن‌های کاربر ممکن نشد؛ تغییرات ذخیره نشد"
+        )
+
+@router.get("/", response_model=List[UserResponse])
+def list_users(
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(require_admin)
+):
+    """لیست کاربران (فقط ادمین)"""
+    return db.query(User).order_by(User.id).all()
+
+@router.put("/{user_id}", response_model=UserResponse)
+def update_user(
+    user_id: int,
+    user_update: UserUpdate,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(require_admin)
+):
+    """ویرایش کاربر (فقط ادمین)"""
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="کاربر یافت نشد")
+    
+    update_data = user_update.model_dump(exclude_unset=True)
+    
+    if "email" in update_data and db.query(User).filter(
+        User.email == update_data["email"], User.id != user_id
+    ).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="این ایمیل قبلاً استفاده شده"
+        )
+    
+    # تغییر رمز، نقش یا غیرفعال شدن توکن‌های قبلی را باطل می‌کند
+    revoke = (
+        "password" in update_data
+        or ("role" in update_data and update_data["role"] != user.role)
+        or ("is_active" in update_data and update_data["is_active"] != user.is_active)
+    )
+    
+    password = update_data.pop("password", None)
+    if password:
+        user.hashed_password = get_password_hash(password)
+    for field, value in update_data.items():
+        setattr(user, field, value)
+    
+    if revoke:
+        bump_token_version(user)
+        _revoke_before_commit(db, user)
+    db.commit()
+    db.refresh(user)
+    invalidate_user_cache(user.username)
+    return user
+
+@router.delete("/{user_id}", status_code=204)
+def deactivate_user(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(require_admin)
+):
+    """غیرفعال کردن کاربر (فقط ادمین)"""
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="کاربر یافت نشد")
+    if user.id == current_user.user_id:
+        raise HTTPException(status_code=400, detail="نمی‌توانید حساب خودتان را غیرفعال کنید")
+    
+    user.is_active = False
+    bump_token_version(user)
+    _revoke_before_commit(db, user)
+    db.commit()
+    invalidate_user_cache(user.username)
+    return None
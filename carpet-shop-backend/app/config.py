@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     database_url: str
@@ -7,6 +8,79 @@ class Settings(BaseSettings):
     secret_key: str
     upload_dir: str = "uploads"
     
+    # کارهای گزارش پس‌زمینه
+    report_job_result_ttl: int = 3600  # ثانیه
+    report_job_max_concurrency: int = 2  # برای هر نوع گزارش
+    
+    # هش رمز عبور؛ با تغییر این مقادیر رمز کاربران در ورود بعدی دوباره هش می‌شود
+    password_hash_scheme: str = "bcrypt"
+    password_hash_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64  # درخواست‌های منتظر بیشتر از این 503 می‌گیرند
+    
+    # توکن‌ها
+    access_token_expire_minutes: int = 15
+    refresh_token_expire_days: int = 14
+    revocation_redis_timeout: float = 0.5  # ثانیه؛ Redis کند نباید درخواست‌ها را معطل کند
+    revocation_rebuild_interval: float = 3600.0  # ثانیه؛ بازسازی bloom filter ابطال از روی Redis
+    
+    # replica فقط خواندنی برای GETها و گزارش‌ها (برای تست محلی می‌تواند فایل SQLite دیگری باشد)
+    read_database_url: Optional[str] = None
+    replica_max_lag_seconds: float = 5.0
+    replica_lag_check_interval: float = 10.0  # ثانیه
+    
+    # pool اتصال دیتابیس (برای هر worker)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0  # ثانیه انتظار برای گرفتن اتصال
+    db_pool_recycle: int = 1800  # ثانیه؛ اتصال‌های قدیمی‌تر دوباره ساخته می‌شوند
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0  # فقط PostgreSQL؛ صفر یعنی بدون محدودیت
+    
+    # حالت debug: هدرهای X-DB-Queries و Server-Timing در پاسخ‌ها
+    debug: bool = False
+    slow_query_ms: float = 200.0  # کوئری‌های کندتر لاگ می‌شوند؛ صفر یعنی خاموش
+    
+    # پروفایل درخواست برای ادمین‌ها (هدر X-Profile: 1 یا ?profile=1)
+    profile_dir: str = "profiles"
+    profile_max_count: int = 50
+    profile_retention_hours: int = 24
+    profile_sample_interval: float = 0.005  # ثانیه
+    
+    # tracing داخلی
+    trace_buffer_size: int = 5000  # تعداد spanهای نگه‌داشته شده
+    trace_export_path: str = ""  # فایل JSON lines مشترک بین API و Celery؛ خالی یعنی فقط حافظه
+    trace_export_max_bytes: int = 20_000_000  # بعد از این حجم فایل به .1 منتقل می‌شود
+    trace_statement_max_length: int = 500
+    
+    # routerهایی که از مسیر async دیتابیس استفاده می‌کنند (مثلاً "carpets,reports")
+    async_routers: str = ""
+    
+    # بافر write-behind برای last_login و last_edited_at
+    write_behind_flush_interval: float = 5.0  # ثانیه
+    write_behind_max_pending: int = 5000
+    
+    # کش کاربر احراز هویت شده (ثانیه)
+    auth_cache_ttl: int = 60
+    
+    # نوتیفیکیشن چک‌ها
+    notification_channels: str = "file"  # با کاما جدا شود: file,smtp,webhook,log
+    notification_file_path: str = "notifications.log"
+    notification_batch_size: int = 100
+    notification_max_batches_per_run: int = 50
+    reminder_lead_days_incoming: int = 2  # چند روز قبل از سررسید یادآوری شود
+    reminder_lead_days_outgoing: int = 2
+    reminder_scan_interval: float = 300.0  # ثانیه
+    notification_max_concurrency: int = 10
+    notification_max_retries: int = 3
+    notification_retry_backoff: float = 1.0  # ثانیه، دو برابر در هر تلاش
+    notification_claim_lease: float = 600.0  # ثانیه؛ بعد از آن چک برداشته شده دوباره قابل برداشتن است
+    smtp_host: str = "localhost"
+    smtp_port: int = 1025
+    smtp_sender: str = "noreply@carpet-shop.com"
+    notification_email_to: str = ""
+    notification_webhook_url: str = ""
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
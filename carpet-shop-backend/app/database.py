@@ -1,17 +1,173 @@
-from sqlalchemy import create_engine
+from typing import Dict, Optional
+import logging
+import threading
+import time
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import settings
+from app.utils.pool_metrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool, instrument_engine
+from app.utils import query_profiler  # ثبت رویدادهای شمارش کوئری و کوئری‌های کند
+from app.utils import tracing  # spanهای SQL
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger = logging.getLogger(__name__)
+
+def engine_options(url: str, async_driver: bool = False) -> Dict:
+    """تنظیمات pool و timeout دستورات از Settings"""
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool if async_driver else InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    timeout = settings.db_statement_timeout_ms
+    if timeout and make_url(url).get_backend_name() == "postgresql":
+        if async_driver:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(timeout)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+instrument_engine("primary", engine)
+
+# replica فقط خواندنی (اختیاری)
+read_engine = None
+if settings.read_database_url:
+    read_engine = create_engine(settings.read_database_url, **engine_options(settings.read_database_url))
+    instrument_engine("replica", read_engine)
+
+# تاخیر replica؛ اگر replica همه WAL دریافتی را اعمال کرده باشد تاخیر صفر است
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+class ReplicaHealth:
+    """بررسی دوره‌ای تاخیر replica؛ در صورت خطا یا تاخیر زیاد از primary خوانده می‌شود"""
+    
+    def __init__(self):
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.checked_at = float("-inf")
+        self._lock = threading.Lock()
+    
+    def available(self) -> bool:
+        if read_engine is None:
+            return False
+        if time.monotonic() - self.checked_at < settings.replica_lag_check_interval:
+            return self.healthy
+        # فقط یک thread بررسی می‌کند؛ بقیه وضعیت قبلی را می‌بینند
+        if not self._lock.acquire(blocking=False):
+            return self.healthy
+        try:
+            self.lag = self._measure_lag()
+            self.healthy = self.lag <= settings.replica_max_lag_seconds
+        except Exception as e:
+            logger.warning("Replica lag check failed, reading from primary: %s", e)
+            self.lag = None
+            self.healthy = False
+        finally:
+            self.checked_at = time.monotonic()
+            self._lock.release()
+        return self.healthy
+    
+    def _measure_lag(self) -> float:
+        with read_engine.connect() as connection:
+            if read_engine.dialect.name != "postgresql":
+                # مثلاً دو فایل SQLite برای تست محلی؛ تاخیری وجود ندارد
+                connection.execute(text("SELECT 1"))
+                return 0.0
+            return float(connection.execute(REPLICA_LAG_SQL).scalar() or 0)
+
+replica_health = ReplicaHealth()
+
+class RoutingSession(Session):
+    """خواندن از replica برای sessionهای فقط خواندنی؛ بعد از اولین نوشتن همه چیز از primary"""
+    
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if clause is not None and (getattr(clause, "is_dml", False) or getattr(clause, "_for_update_arg", None) is not None):
+            self.info["wrote"] = True
+        if (
+            self.info.get("prefer_replica")
+            and not self.info.get("wrote")
+            and not self._flushing
+            and (clause is None or getattr(clause, "is_select", False))
+            and replica_health.available()
+        ):
+            return read_engine
+        return engine
+
+@event.listens_for(RoutingSession, "after_flush")
+def _stick_to_primary(session, flush_context):
+    session.info["wrote"] = True
+
+def use_replica(db: Session) -> None:
+    """خواندن‌های بعدی این session در صورت امکان از replica (تا وقتی چیزی نوشته نشده)"""
+    if not db.info.get("wrote"):
+        db.info["prefer_replica"] = True
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-def get_db():
-    """وابستگی برای دریافت session دیتابیس"""
+def get_db(request: Request):
+    """وابستگی برای دریافت session دیتابیس (درخواست‌های GET از replica می‌خوانند)"""
     db = SessionLocal()
+    if request.method in ("GET", "HEAD"):
+        use_replica(db)
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# درایور async متناظر با هر دیتابیس
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str) -> str:
+    """تبدیل آدرس دیتابیس به درایور async (asyncpg یا aiosqlite)"""
+    parsed = make_url(url)
+    if parsed.drivername in ASYNC_DRIVERS.values():
+        return url
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"درایور async برای {backend} پشتیبانی نمی‌شود")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+# engine async فقط وقتی ساخته می‌شود که یک router async فعال باشد
+async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+def get_async_session_factory() -> async_sessionmaker:
+    global async_engine, _async_session_factory
+    if _async_session_factory is None:
+        async_url = to_async_url(settings.database_url)
+        async_engine = create_async_engine(async_url, **engine_options(async_url, async_driver=True))
+        instrument_engine("async", async_engine.sync_engine)
+        _async_session_factory = async_sessionmaker(
+            async_engine, class_=AsyncSession, autoflush=False
+        )
+    return _async_session_factory
+
+async def dispose_async_engine() -> None:
+    """بستن اتصال‌های pool async هنگام خاموش شدن؛ در شروع بعدی دوباره ساخته می‌شود"""
+    global async_engine, _async_session_factory
+    if async_engine is not None:
+        await async_engine.dispose()
+    async_engine = None
+    _async_session_factory = None
+
+async def get_async_db():
+    """وابستگی برای دریافت session async دیتابیس"""
+    async with get_async_session_factory()() as db:
+        yield db
@@ -1,18 +1,34 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import carpets, invoices, checks, reports, auth
+from app.api import carpets, invoices, checks, reports, auth, consignments, customers, users, metrics, profiles, traces
+from app.api.async_routes import ASYNC_ROUTERS
+from app.config import settings
+from app.database import dispose_async_engine
 from fastapi.staticfiles import StaticFiles
 
-from app.database import Base, engine
+from app.utils.write_behind import touch_buffer
+from app.utils.http_metrics import MetricsMiddleware, metrics_payload, mark_worker_dead
+from app.utils.query_profiler import QueryProfilerMiddleware
+from app.utils.request_profiler import ProfilingMiddleware
+from app.utils.tracing import TracingMiddleware
 import os
 
-# ایجاد جداول دیتابیس
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """آماده‌سازی منابع هنگام شروع و تخلیه بافرها هنگام خاموش شدن
 
-# ایجاد پوشه uploads
-os.makedirs("uploads", exist_ok=True)
+    جداول فقط با Alembic ساخته می‌شوند (alembic upgrade head).
+    """
+    os.makedirs(settings.upload_dir, exist_ok=True)
+    yield
+    # نوشتن به‌روزرسانی‌های لمسی باقی‌مانده
+    touch_buffer.flush()
+    await dispose_async_engine()
+    mark_worker_dead()
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Carpet Shop Management System",
     description="سامانه مدیریت انبار و فروشگاه فرش با احراز هویت",
     version="1.0.0",
@@ -28,14 +44,33 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+if settings.debug:
+    app.add_middleware(QueryProfilerMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+
+# پوشه در lifespan ساخته می‌شود
+app.mount("/uploads", StaticFiles(directory=settings.upload_dir, check_dir=False), name="uploads")
 
 # Include Routers
+# routerهای async قبل از نسخه sync ثبت می‌شوند تا مسیرهای مشترک را بگیرند
+for name in filter(None, (n.strip() for n in settings.async_routers.split(","))):
+    if name not in ASYNC_ROUTERS:
+        raise ValueError(f"router async ناشناخته: {name}")
+    app.include_router(ASYNC_ROUTERS[name], prefix="/api")
+
 app.include_router(auth.router, prefix="/api")  # Auth routes
+app.include_router(users.router, prefix="/api")
 app.include_router(carpets.router, prefix="/api")
 app.include_router(invoices.router, prefix="/api")
 app.include_router(checks.router, prefix="/api")
 app.include_router(reports.router, prefix="/api")
+app.include_router(consignments.router, prefix="/api")
+app.include_router(customers.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
+app.include_router(profiles.router, prefix="/api")
+app.include_router(traces.router, prefix="/api")
 
 @app.get("/")
 def root():
@@ -47,4 +82,10 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """آمار درخواست‌ها با فرمت Prometheus"""
+    payload, content_type = metrics_payload()
+    return Response(content=payload, media_type=content_type)
\ No newline at end of file
@@ -1,7 +1,13 @@
 from app.models.carpet import Carpet, CarpetOperation, CarpetSize, PaymentMethod
 from app.models.invoice import Invoice, InvoiceItem
-from app.models.check import Check, CheckStatus, CheckType
+from app.models.check import Check, CheckStatus, CheckStatusHistory, CheckType
 from app.models.user import User, UserRole
+from app.models.calendar import CalendarDay
+from app.models.customer import Customer
+from app.models.notification import CheckNotification, NotificationStatus
+from app.models.consignment import (
+    ConsignmentLedgerEntry, ConsignmentOwnerBalance, ConsignmentPayout, LedgerEntryType
+)
 
 __all__ = [
     "Carpet",
@@ -12,7 +18,16 @@ __all__ = [
     "InvoiceItem",
     "Check",
     "CheckStatus",
+    "CheckStatusHistory",
     "CheckType",
     "User",
     "UserRole",
+    "CalendarDay",
+    "Customer",
+    "CheckNotification",
+    "NotificationStatus",
+    "ConsignmentLedgerEntry",
+    "ConsignmentOwnerBalance",
+    "ConsignmentPayout",
+    "LedgerEntryType",
 ]
\ No newline at end of file
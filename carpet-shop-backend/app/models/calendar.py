@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, Date, DateTime, Index
+from app.database import Base
+
+class CalendarDay(Base):
+    """جدول بُعد تقویم: هر روز میلادی با معادل شمسی و مرز روز به وقت تهران"""
+    __tablename__ = "calendar_days"
+    
+    date = Column(Date, primary_key=True, comment="تاریخ میلادی")
+    jalali_year = Column(Integer, nullable=False, comment="سال شمسی")
+    jalali_month = Column(Integer, nullable=False, comment="ماه شمسی")
+    jalali_day = Column(Integer, nullable=False, comment="روز شمسی")
+    jalali_week = Column(Integer, nullable=False, comment="هفته سال شمسی (شروع از شنبه)")
+    weekday = Column(Integer, nullable=False, comment="روز هفته (شنبه = 0)")
+    fiscal_quarter = Column(Integer, nullable=False, comment="فصل مالی")
+    day_start_utc = Column(DateTime, nullable=False, comment="شروع روز تهران به UTC")
+    day_end_utc = Column(DateTime, nullable=False, comment="پایان روز تهران به UTC")
+    
+    __table_args__ = (
+        Index("ix_calendar_days_jalali", "jalali_year", "jalali_month", "jalali_day"),
+        Index("ix_calendar_days_day_start_utc", "day_start_utc"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, Enum as SQLEnum, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -11,6 +11,15 @@ class CheckStatus(str, enum.Enum):
     PASSED = "پاس شده"
     BOUNCED = "برگشت خورده"
 
+# تغییر وضعیت‌های مجاز چک
+ALLOWED_STATUS_TRANSITIONS = {
+    CheckStatus.NOT_REGISTERED: {CheckStatus.REGISTERED},
+    CheckStatus.REGISTERED: {CheckStatus.CONFIRMED, CheckStatus.PASSED, CheckStatus.BOUNCED},
+    CheckStatus.CONFIRMED: {CheckStatus.PASSED, CheckStatus.BOUNCED},
+    CheckStatus.BOUNCED: {CheckStatus.PASSED},
+    CheckStatus.PASSED: set(),
+}
+
 class CheckType(str, enum.Enum):
     INCOMING = "ورودی"
     OUTGOING = "خروجی"
@@ -29,11 +38,16 @@ class Check(Base):
     # ارتباط با فاکتور (اختیاری)
     invoice_id = Column(Integer, ForeignKey("invoices.id"), nullable=True)
     
+    # ارتباط با مشتری برای چک‌های ورودی (اختیاری)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True, index=True)
+    
     # ارتباط با فرش در صورت خرید با چک (اختیاری)
     carpet_id = Column(Integer, ForeignKey("carpets.id"), nullable=True)
     
     # نوتیفیکیشن
+    remind_at = Column(DateTime, nullable=True, comment="زمان یادآوری")
     notification_sent = Column(DateTime, nullable=True, comment="زمان ارسال نوتیفیکیشن")
+    notification_claimed_at = Column(DateTime, nullable=True, comment="زمان برداشتن برای ارسال یادآوری")
     
     description = Column(String(500), nullable=True, comment="توضیحات")
     
@@ -43,4 +57,31 @@ class Check(Base):
     
     # روابط
     invoice = relationship("Invoice", foreign_keys=[invoice_id], back_populates="checks")
-    carpet = relationship("Carpet", foreign_keys=[carpet_id], back_populates="purchase_checks")
\ No newline at end of file
+    carpet = relationship("Carpet", foreign_keys=[carpet_id], back_populates="purchase_checks")
+    customer = relationship("Customer", back_populates="checks")
+    
+    __table_args__ = (
+        # فقط یادآوری‌های ارسال نشده؛ اسکن زمان‌بند فقط روی همین ایندکس کوچک است
+        Index(
+            "ix_checks_remind_at_pending",
+            "remind_at",
+            "id",
+            postgresql_where=text(
+                "notification_sent IS NULL AND remind_at IS NOT NULL "
+                "AND status IN ('REGISTERED', 'CONFIRMED')"
+            )
+        ),
+    )
+
+
+class CheckStatusHistory(Base):
+    """تاریخچه تغییر وضعیت چک‌ها"""
+    __tablename__ = "check_status_history"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    check_id = Column(Integer, ForeignKey("checks.id", ondelete="CASCADE"), nullable=False, index=True)
+    from_status = Column(SQLEnum(CheckStatus), nullable=True, comment="وضعیت قبلی")
+    to_status = Column(SQLEnum(CheckStatus), nullable=False, comment="وضعیت جدید")
+    note = Column(String(500), nullable=True, comment="توضیحات")
+    
+    changed_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
@@ -0,0 +1,52 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import enum
+from app.database import Base
+
+class LedgerEntryType(str, enum.Enum):
+    SALE = "فروش"
+    REVERSAL = "برگشت فروش"
+    PAYOUT = "تسویه"
+
+class ConsignmentLedgerEntry(Base):
+    """دفتر بدهی به صاحبان فرش‌های امانتی (فقط افزودنی)"""
+    __tablename__ = "consignment_ledger"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    owner = Column(String(200), nullable=False, index=True, comment="صاحب امانت")
+    entry_type = Column(SQLEnum(LedgerEntryType), nullable=False, comment="نوع ردیف")
+    amount = Column(Float, nullable=False, comment="مبلغ (مثبت = بدهی ما، منفی = پرداخت)")
+    
+    carpet_id = Column(Integer, ForeignKey("carpets.id"), nullable=True)
+    invoice_id = Column(Integer, ForeignKey("invoices.id", ondelete="SET NULL"), nullable=True, index=True)
+    invoice_item_id = Column(Integer, ForeignKey("invoice_items.id", ondelete="SET NULL"), nullable=True)
+    payout_id = Column(Integer, ForeignKey("consignment_payouts.id"), nullable=True)
+    
+    description = Column(String(500), nullable=True, comment="توضیحات")
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    payout = relationship("ConsignmentPayout", back_populates="entries")
+
+class ConsignmentOwnerBalance(Base):
+    """مانده حساب هر صاحب امانت (با هر ردیف دفتر به‌روز می‌شود)"""
+    __tablename__ = "consignment_balances"
+    
+    owner = Column(String(200), primary_key=True, comment="صاحب امانت")
+    total_owed = Column(Float, nullable=False, default=0, comment="جمع بدهی")
+    total_paid = Column(Float, nullable=False, default=0, comment="جمع پرداختی")
+    balance = Column(Float, nullable=False, default=0, comment="مانده")
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ConsignmentPayout(Base):
+    """یک نوبت تسویه گروهی با صاحبان امانت"""
+    __tablename__ = "consignment_payouts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    total_amount = Column(Float, nullable=False, comment="جمع پرداخت")
+    owner_count = Column(Integer, nullable=False, comment="تعداد صاحبان")
+    description = Column(String(500), nullable=True, comment="توضیحات")
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    entries = relationship("ConsignmentLedgerEntry", back_populates="payout")
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.database import Base
+
+class Customer(Base):
+    __tablename__ = "customers"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(200), nullable=False, comment="نام مشتری")
+    normalized_name = Column(String(200), nullable=False, unique=True, comment="نام یکسان‌سازی شده")
+    phone = Column(String(50), nullable=True, comment="تلفن")
+    
+    # جمع‌های تجمعی که با هر فاکتور و چک به‌روز می‌شوند
+    total_invoiced = Column(Float, nullable=False, default=0, comment="جمع فاکتورها")
+    total_paid_cash = Column(Float, nullable=False, default=0, comment="جمع پرداخت نقدی")
+    total_paid_by_check = Column(Float, nullable=False, default=0, comment="جمع چک‌های پاس شده")
+    total_bounced = Column(Float, nullable=False, default=0, comment="جمع چک‌های برگشتی")
+    outstanding = Column(Float, nullable=False, default=0, comment="مانده بدهی")
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # روابط
+    invoices = relationship("Invoice", back_populates="customer")
+    checks = relationship("Check", back_populates="customer")
+    
+    __table_args__ = (
+        # برای جستجوی پیشوندی (autocomplete) با LIKE 'abc%'
+        Index(
+            "ix_customers_normalized_name_prefix",
+            "normalized_name",
+            postgresql_ops={"normalized_name": "varchar_pattern_ops"}
+        ),
+    )
@@ -9,6 +9,7 @@ class Invoice(Base):
     id = Column(Integer, primary_key=True, index=True)
     invoice_number = Column(String(50), unique=True, nullable=False, index=True, comment="شماره فاکتور")
     customer_name = Column(String(200), nullable=False, comment="نام خریدار")
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True, index=True)
     invoice_date = Column(DateTime, default=datetime.utcnow, comment="تاریخ فاکتور")
     payment_method = Column(String(50), nullable=False, comment="نوع پرداخت")
     total_amount = Column(Float, nullable=False, comment="مبلغ کل")
@@ -25,6 +26,7 @@ class Invoice(Base):
     # روابط
     items = relationship("InvoiceItem", back_populates="invoice", cascade="all, delete-orphan")
     checks = relationship("Check", foreign_keys="[Check.invoice_id]", back_populates="invoice")
+    customer = relationship("Customer", back_populates="invoices")
 
 
 class InvoiceItem(Base):
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum as SQLEnum
+from datetime import datetime
+import enum
+from app.database import Base
+
+class NotificationStatus(str, enum.Enum):
+    SENT = "ارسال شده"
+    FAILED = "ناموفق"
+
+class CheckNotification(Base):
+    """نتیجه ارسال یادآوری چک در هر کانال"""
+    __tablename__ = "check_notifications"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    check_id = Column(Integer, ForeignKey("checks.id", ondelete="CASCADE"), nullable=False, index=True)
+    channel = Column(String(50), nullable=False, comment="کانال ارسال")
+    status = Column(SQLEnum(NotificationStatus), nullable=False, comment="وضعیت")
+    attempts = Column(Integer, nullable=False, default=1, comment="تعداد تلاش")
+    error = Column(Text, nullable=True, comment="خطا")
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
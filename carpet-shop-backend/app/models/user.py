@@ -17,6 +17,8 @@ class User(Base):
     full_name = Column(String(200), nullable=True)
     role = Column(SQLEnum(UserRole), default=UserRole.USER, nullable=False)
     is_active = Column(Boolean, default=True)
+    # با غیرفعال شدن، تغییر نقش یا تغییر رمز زیاد می‌شود تا توکن‌های قبلی باطل شوند
+    token_version = Column(Integer, default=0, nullable=False)
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, date as Date
+from typing import List, Optional
 from app.models.check import CheckStatus, CheckType
 
 class CheckBase(BaseModel):
@@ -15,6 +15,7 @@ class CheckCreate(CheckBase):
    # status: CheckStatus = CheckStatus.NOT_REGISTERED
     invoice_id: Optional[int] = None
     carpet_id: Optional[int] = None
+    customer_id: Optional[int] = None
 
 class CheckUpdate(BaseModel):
     check_number: Optional[str] = Field(None, min_length=1, max_length=100)
@@ -23,6 +24,7 @@ class CheckUpdate(BaseModel):
     check_date: Optional[datetime] = None
     status: Optional[CheckStatus] = None
     check_type: Optional[CheckType] = None
+    customer_id: Optional[int] = None
     description: Optional[str] = None
 
 class CheckResponse(CheckBase):
@@ -30,10 +32,66 @@ class CheckResponse(CheckBase):
     status: CheckStatus
     invoice_id: Optional[int]
     carpet_id: Optional[int]
+    customer_id: Optional[int] = None
+    remind_at: Optional[datetime] = None
     notification_sent: Optional[datetime]
     created_at: datetime
     updated_at: datetime
     last_edited_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class CashflowPoint(BaseModel):
+    date: Date
+    incoming: float
+    outgoing: float
+    net: float
+    balance: float
+
+class CashflowProjection(BaseModel):
+    start_date: Date
+    days: int
+    opening_balance: float
+    weighted: bool
+    min_balance: float
+    min_balance_date: Date
+    points: List[CashflowPoint]
+
+
+class CheckTransition(BaseModel):
+    check_id: int
+    to_status: CheckStatus
+
+class BulkTransitionRequest(BaseModel):
+    transitions: List[CheckTransition] = Field(..., min_length=1, max_length=1000)
+    note: Optional[str] = Field(None, max_length=500)
+
+class TransitionResult(BaseModel):
+    check_id: int
+    from_status: Optional[CheckStatus]
+    to_status: CheckStatus
+    success: bool
+    error: Optional[str] = None
+
+class ReconciliationMatch(BaseModel):
+    line: int
+    check_id: int
+    to_status: CheckStatus
+
+class UnmatchedStatementLine(BaseModel):
+    line: int
+    check_number: str
+    amount: float
+    date: datetime
+    status: CheckStatus
+
+class ReconciliationResult(BaseModel):
+    total_lines: int
+    matched_count: int
+    unmatched_count: int
+    dry_run: bool
+    matched: List[ReconciliationMatch]
+    unmatched: List[UnmatchedStatementLine]
+    errors: List[str]
+    transitions: List[TransitionResult]
@@ -0,0 +1,49 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List
+from app.models.consignment import LedgerEntryType
+
+class LedgerEntryResponse(BaseModel):
+    id: int
+    owner: str
+    entry_type: LedgerEntryType
+    amount: float
+    carpet_id: Optional[int]
+    invoice_id: Optional[int]
+    invoice_item_id: Optional[int]
+    payout_id: Optional[int]
+    description: Optional[str]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class OwnerBalanceResponse(BaseModel):
+    owner: str
+    total_owed: float
+    total_paid: float
+    balance: float
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class PayoutLine(BaseModel):
+    owner: str = Field(..., min_length=1, max_length=200)
+    # اگر خالی باشد کل مانده تسویه می‌شود
+    amount: Optional[float] = Field(None, gt=0)
+
+class PayoutCreate(BaseModel):
+    lines: List[PayoutLine] = Field(..., min_length=1)
+    description: Optional[str] = None
+
+class PayoutResponse(BaseModel):
+    id: int
+    total_amount: float
+    owner_count: int
+    description: Optional[str]
+    created_at: datetime
+    entries: List[LedgerEntryResponse] = []
+
+    class Config:
+        from_attributes = True
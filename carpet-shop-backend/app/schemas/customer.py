@@ -0,0 +1,44 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List
+from app.models.check import CheckStatus
+
+class CustomerCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=200)
+    phone: Optional[str] = Field(None, max_length=50)
+
+class CustomerSearchResult(BaseModel):
+    id: int
+    name: str
+    outstanding: float
+
+    class Config:
+        from_attributes = True
+
+class CustomerResponse(BaseModel):
+    id: int
+    name: str
+    phone: Optional[str]
+    total_invoiced: float
+    total_paid_cash: float
+    total_paid_by_check: float
+    total_bounced: float
+    outstanding: float
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class StatementEntry(BaseModel):
+    date: datetime
+    kind: str
+    reference: str
+    debit: float
+    credit: float
+    balance: float
+    status: Optional[CheckStatus] = None
+
+class CustomerStatement(BaseModel):
+    customer: CustomerResponse
+    entries: List[StatementEntry]
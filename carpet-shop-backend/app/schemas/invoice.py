@@ -41,6 +41,7 @@ class InvoiceBase(BaseModel):
     description: Optional[str] = None
 
 class InvoiceCreate(InvoiceBase):
+    customer_id: Optional[int] = None
     items: List[InvoiceItemCreate]
     invoice_date: datetime = Field(default_factory=datetime.utcnow)
 
@@ -53,6 +54,7 @@ class InvoiceUpdate(BaseModel):
 class InvoiceResponse(InvoiceBase):
     id: int
     invoice_number: str
+    customer_id: Optional[int] = None
     invoice_date: datetime
     total_amount: float
     signature_path: Optional[str]
@@ -69,6 +71,7 @@ class InvoiceListResponse(BaseModel):
     id: int
     invoice_number: str
     customer_name: str
+    customer_id: Optional[int] = None
     invoice_date: datetime
     total_amount: float
     is_signed: bool
@@ -17,6 +17,7 @@ class UserUpdate(BaseModel):
     full_name: Optional[str] = None
     password: Optional[str] = Field(None, min_length=6)
     is_active: Optional[bool] = None
+    role: Optional[UserRole] = None
 
 class UserResponse(UserBase):
     id: int
@@ -30,12 +31,21 @@ class UserResponse(UserBase):
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
+    expires_in: Optional[int] = None
     user: UserResponse
 
 class TokenData(BaseModel):
     username: Optional[str] = None
     role: Optional[UserRole] = None
+    user_id: Optional[int] = None
+    token_version: int = 0
+    jti: Optional[str] = None
+    expires_at: Optional[float] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class LoginRequest(BaseModel):
     username: str
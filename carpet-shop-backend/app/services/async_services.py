@@ -0,0 +1,113 @@
+"""
+نسخه async سرویس‌های فرش، فاکتور، چک و گزارش
+
+منطق همان سرویس‌های sync است که داخل AsyncSession.run_sync اجرا می‌شود؛
+I/O دیتابیس از درایور async (asyncpg/aiosqlite) عبور می‌کند و thread درخواست
+در زمان انتظار برای دیتابیس اشغال نمی‌شود. خروجی همان‌جا به schema پاسخ
+تبدیل می‌شود تا بارگذاری lazy روابط بیرون از greenlet رخ ندهد.
+"""
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.services.carpet_service import CarpetService
+from app.services.invoice_service import InvoiceService
+from app.services.check_service import CheckService
+from app.services.report_service import ReportService
+from app.schemas.carpet import CarpetResponse, CarpetListResponse
+from app.schemas.invoice import InvoiceResponse, InvoiceListResponse
+from app.schemas.check import CheckResponse
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+class AsyncService:
+    """پایه سرویس‌های async؛ service_class سرویس sync متناظر است"""
+    service_class: type
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def _run(self, method: str, response_model: Any = None, *args, **kwargs) -> Any:
+        def call(session: Session) -> Any:
+            result = getattr(self.service_class(session), method)(*args, **kwargs)
+            if response_model is not None and result is not None:
+                result = _adapter(response_model).validate_python(result, from_attributes=True)
+            return result
+        
+        return await self.db.run_sync(call)
+
+
+class AsyncCarpetService(AsyncService):
+    service_class = CarpetService
+    
+    async def get_carpet(self, carpet_id: int) -> Optional[CarpetResponse]:
+        return await self._run("get_carpet", CarpetResponse, carpet_id)
+    
+    async def list_carpets(self, **filters) -> List[CarpetListResponse]:
+        return await self._run("list_carpets", List[CarpetListResponse], **filters)
+
+
+class AsyncInvoiceService(AsyncService):
+    service_class = InvoiceService
+    
+    async def get_invoice(self, invoice_id: int) -> Optional[InvoiceResponse]:
+        return await self._run("get_invoice", InvoiceResponse, invoice_id)
+    
+    async def list_invoices(self, **filters) -> List[InvoiceListResponse]:
+        return await self._run("list_invoices", List[InvoiceListResponse], **filters)
+
+
+class AsyncCheckService(AsyncService):
+    service_class = CheckService
+    
+    async def get_check(self, check_id: int) -> Optional[CheckResponse]:
+        return await self._run("get_check", CheckResponse, check_id)
+    
+    async def list_checks(self, **filters) -> List[CheckResponse]:
+        return await self._run("list_checks", List[CheckResponse], **filters)
+    
+    async def get_upcoming_checks(self, days: int = 7) -> List[CheckResponse]:
+        return await self._run("get_upcoming_checks", List[CheckResponse], days)
+
+
+class AsyncReportService(AsyncService):
+    service_class = ReportService
+    
+    async def get_financial_report(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Dict:
+        return await self._run("get_financial_report", None, start_date, end_date)
+    
+    async def get_inventory_report(self) -> Dict:
+        return await self._run("get_inventory_report")
+    
+    async def get_timeseries(
+        self,
+        metric: str,
+        bucket: str = "day",
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Dict:
+        return await self._run("get_timeseries", None, metric, bucket, start_date, end_date)
+    
+    async def get_profitability_report(
+        self,
+        dimension: str = "brand",
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        sort_by: str = "profit",
+        limit: int = 50,
+        include_percentiles: bool = False
+    ) -> List[Dict]:
+        return await self._run(
+            "get_profitability_report", None,
+            dimension, start_date, end_date, sort_by, limit, include_percentiles
+        )
@@ -11,7 +11,10 @@ from app.schemas.carpet import (
     CarpetCreate, CarpetUpdate, CarpetOperationCreate, CarpetOperationUpdate
 )
 from app.config import settings
+from app.utils.write_behind import touch_buffer
+from app.utils.tracing import traced_service, file_span
 
+@traced_service
 class CarpetService:
     def __init__(self, db: Session):
         self.db = db
@@ -134,12 +137,13 @@ class CarpetService:
         unique_filename = f"{uuid.uuid4()}{file_extension}"
         file_path = os.path.join(settings.upload_dir, unique_filename)
         
-        with open(file_path, "wb") as buffer:
+        with file_span("write", file_path), open(file_path, "wb") as buffer:
             content = file.file.read()
             buffer.write(content)
         
         if carpet.image_path and os.path.exists(carpet.image_path):
-            os.remove(carpet.image_path)
+            with file_span("delete", carpet.image_path):
+                os.remove(carpet.image_path)
         
         carpet.image_path = file_path
         carpet.last_edited_at = datetime.utcnow()
@@ -159,10 +163,8 @@ class CarpetService:
             **operation_data.model_dump()
         )
         self.db.add(operation)
-        
-        carpet.last_edited_at = datetime.utcnow()
-        
         self.db.commit()
+        touch_buffer.touch(Carpet, carpet_id, "last_edited_at")
         self.db.refresh(operation)
         return operation
     
@@ -180,12 +182,8 @@ class CarpetService:
             setattr(operation, field, value)
         
         operation.updated_at = datetime.utcnow()
-        
-        carpet = self.get_carpet(operation.carpet_id)
-        if carpet:
-            carpet.last_edited_at = datetime.utcnow()
-        
         self.db.commit()
+        touch_buffer.touch(Carpet, operation.carpet_id, "last_edited_at")
         self.db.refresh(operation)
         return operation
     
@@ -198,10 +196,8 @@ class CarpetService:
         if not operation:
             return False
         
-        carpet = self.get_carpet(operation.carpet_id)
-        if carpet:
-            carpet.last_edited_at = datetime.utcnow()
-        
+        carpet_id = operation.carpet_id
         self.db.delete(operation)
         self.db.commit()
+        touch_buffer.touch(Carpet, carpet_id, "last_edited_at")
         return True
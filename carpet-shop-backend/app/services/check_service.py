@@ -1,24 +1,51 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import func, case, or_, select, update
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from app.models.check import Check, CheckStatus, CheckType
-from app.schemas.check import CheckCreate, CheckUpdate
+from itertools import accumulate
+from app.models.check import Check, CheckStatus, CheckStatusHistory, CheckType, ALLOWED_STATUS_TRANSITIONS
+from app.models.invoice import Invoice
+from app.schemas.check import CheckCreate, CheckUpdate, CheckTransition
+from app.services.customer_service import CustomerService, check_snapshot
+from app.utils.cache import TTLCache
+from app.utils.lazy import optional_module
+from app.utils.tracing import traced_service
+from app.config import settings
 
+# پیش‌بینی جریان نقدی تا تغییر بعدی چک‌ها کش می‌شود
+cashflow_cache = TTLCache(ttl=300)
+
+@traced_service
 class CheckService:
     def __init__(self, db: Session):
         self.db = db
     
     def create_check(self, check_data: CheckCreate) -> Check:
         """ایجاد چک جدید"""
+        self._validate_customer(check_data.customer_id)
         check = Check(
             **check_data.model_dump(),
             status=CheckStatus.NOT_REGISTERED  # default status
         )
+        
+        # چک ورودی مشتری فاکتور را به ارث می‌برد
+        if check.customer_id is None and check.invoice_id and check.check_type == CheckType.INCOMING:
+            check.customer_id = self.db.query(Invoice.customer_id).filter(
+                Invoice.id == check.invoice_id
+            ).scalar()
+        
+        check.remind_at = self.compute_remind_at(check)
         self.db.add(check)
+        CustomerService(self.db).track_check_changes([(None, check_snapshot(check))])
         self.db.commit()
+        cashflow_cache.invalidate()
         self.db.refresh(check)
         return check
     
+    def _validate_customer(self, customer_id: Optional[int]) -> None:
+        if customer_id is not None and not CustomerService(self.db).get_customer(customer_id):
+            raise ValueError("مشتری یافت نشد")
+    
     def get_check(self, check_id: int) -> Optional[Check]:
         """دریافت یک چک"""
         return self.db.query(Check).filter(Check.id == check_id).first()
@@ -53,7 +80,7 @@ class CheckService:
         """دریافت چک‌های نزدیک به سررسید"""
         from datetime import datetime, timedelta
         
-        today = datetime.now().date()
+        today = datetime.utcnow().date()
         target_date = today + timedelta(days=days)
         
         checks = self.db.query(Check).filter(
@@ -63,44 +90,239 @@ class CheckService:
         
         return checks
     
-    def update_check(self, check_id: int, check_update: CheckUpdate) -> Optional[Check]:
-        """ویرایش چک"""
+    def update_check(self, check_id: int, check_update: CheckUpdate, force_status: bool = False) -> Optional[Check]:
+        """ویرایش چک؛ force_status (فقط ادمین) برای اصلاح وضعیت اشتباه خارج از قواعد تغییر وضعیت"""
         check = self.get_check(check_id)
         if not check:
             return None
         
+        before = check_snapshot(check)
         update_data = check_update.model_dump(exclude_unset=True)
+        
+        if "customer_id" in update_data:
+            self._validate_customer(update_data["customer_id"])
+        
+        # تغییر وضعیت از همان قواعد تغییر وضعیت گروهی پیروی می‌کند
+        if not force_status and update_data.get("status", check.status) != check.status:
+            error = self._transition_error(check.status, update_data["status"])
+            if error:
+                raise ValueError(error)
+        
         for field, value in update_data.items():
             setattr(check, field, value)
         
+        # تغییر سررسید یا نوع چک زمان یادآوری را از نو تعیین می‌کند
+        if "check_date" in update_data or "check_type" in update_data:
+            check.remind_at = self.compute_remind_at(check)
+            check.notification_sent = None
+            check.notification_claimed_at = None
+        
+        if check.status != before[2]:
+            self.db.add(CheckStatusHistory(
+                check_id=check.id, from_status=before[2], to_status=check.status,
+                note="اصلاح وضعیت توسط مدیر" if force_status else None
+            ))
+        
+        CustomerService(self.db).track_check_changes([(before, check_snapshot(check))])
         check.last_edited_at = datetime.utcnow()
         self.db.commit()
+        cashflow_cache.invalidate()
         self.db.refresh(check)
         return check
     
+    def bulk_transition(self, transitions: List[CheckTransition], note: Optional[str] = None) -> List[Dict]:
+        """تغییر وضعیت گروهی چک‌ها با بررسی مجاز بودن تغییر
+        
+        برای هر وضعیت مقصد یک UPDATE اجرا می‌شود و تاریخچه با یک bulk insert ثبت می‌شود.
+        """
+        check_ids = [transition.check_id for transition in transitions]
+        current = {
+            row.id: row
+            for row in self.db.query(
+                Check.id, Check.status, Check.customer_id, Check.check_type, Check.amount
+            ).filter(Check.id.in_(check_ids)).with_for_update().all()
+        }
+        
+        # یک نتیجه برای هر ردیف درخواست (به همان ترتیب)؛ ردیف تکراری خطای خودش را دارد
+        results: List[Dict] = []
+        applied: Dict[int, Dict] = {}
+        by_target: Dict[CheckStatus, List[int]] = {}
+        for transition in transitions:
+            row = current.get(transition.check_id)
+            result = {
+                "check_id": transition.check_id,
+                "from_status": row.status if row else None,
+                "to_status": transition.to_status,
+                "success": False,
+                "error": None
+            }
+            if transition.check_id in applied:
+                result["error"] = "شناسه تکراری"
+            elif not row:
+                result["error"] = "چک یافت نشد"
+            else:
+                result["error"] = self._transition_error(row.status, transition.to_status)
+                if not result["error"]:
+                    by_target.setdefault(transition.to_status, []).append(transition.check_id)
+                    result["success"] = True
+            applied.setdefault(transition.check_id, result)
+            results.append(result)
+        
+        now = datetime.utcnow()
+        history = []
+        customer_changes = []
+        for target, ids in by_target.items():
+            allowed_from = [status for status, targets in ALLOWED_STATUS_TRANSITIONS.items() if target in targets]
+            updated_ids = {
+                row[0] for row in self.db.execute(
+                    update(Check).where(
+                        Check.id.in_(ids),
+                        Check.status.in_(allowed_from)
+                    ).values(
+                        status=target, last_edited_at=now, updated_at=now
+                    ).returning(Check.id).execution_options(synchronize_session=False)
+                ).all()
+            }
+            for check_id in ids:
+                if check_id not in updated_ids:
+                    applied[check_id].update(success=False, error="وضعیت چک همزمان تغییر کرد")
+                    continue
+                row = current[check_id]
+                history.append({
+                    "check_id": check_id,
+                    "from_status": row.status,
+                    "to_status": target,
+                    "note": note,
+                    "changed_at": now,
+                })
+                customer_changes.append((
+                    (row.customer_id, row.check_type, row.status, row.amount),
+                    (row.customer_id, row.check_type, target, row.amount)
+                ))
+        
+        if history:
+            self.db.bulk_insert_mappings(CheckStatusHistory, history)
+        CustomerService(self.db).track_check_changes(customer_changes)
+        self.db.commit()
+        cashflow_cache.invalidate()
+        
+        return results
+    
+    @staticmethod
+    def _transition_error(from_status: CheckStatus, to_status: CheckStatus) -> Optional[str]:
+        """پیام خطا اگر تغییر وضعیت مجاز نباشد"""
+        if to_status not in ALLOWED_STATUS_TRANSITIONS.get(from_status, set()):
+            return f"تغییر وضعیت از «{from_status.value}» به «{to_status.value}» مجاز نیست"
+        return None
+    
     def delete_check(self, check_id: int) -> bool:
         """حذف چک"""
         check = self.get_check(check_id)
         if not check:
             return False
         
+        CustomerService(self.db).track_check_changes([(check_snapshot(check), None)])
         self.db.delete(check)
         self.db.commit()
+        cashflow_cache.invalidate()
         return True
     
+    def get_cashflow_projection(
+        self,
+        days: int = 90,
+        opening_balance: float = 0.0,
+        weighted: bool = False
+    ) -> Dict:
+        """پیش‌بینی مانده روزانه حساب بر اساس سررسید چک‌های باز"""
+        today = datetime.utcnow().date()
+        key = (today, days, opening_balance, weighted)
+        return cashflow_cache.get_or_set(
+            key, lambda: self._compute_cashflow_projection(today, days, opening_balance, weighted)
+        )
+    
+    def _compute_cashflow_projection(self, today, days: int, opening_balance: float, weighted: bool) -> Dict:
+        start = datetime.combine(today, datetime.min.time())
+        end = start + timedelta(days=days + 1)
+        
+        # نرخ برگشت تاریخی هر صادرکننده (فقط چک‌های ورودی تعیین تکلیف شده)
+        bounce_rates = self.db.query(
+            Check.payee.label("payee"),
+            (
+                func.sum(case((Check.status == CheckStatus.BOUNCED, 1), else_=0)) * 1.0
+                / func.count(Check.id)
+            ).label("bounce_rate")
+        ).filter(
+            Check.check_type == CheckType.INCOMING,
+            Check.status.in_([CheckStatus.PASSED, CheckStatus.BOUNCED])
+        ).group_by(Check.payee).subquery()
+        
+        # یک کوئری مرتب برای کل جریان چک‌های باز
+        rows = self.db.query(
+            Check.check_date,
+            Check.check_type,
+            Check.amount,
+            func.coalesce(bounce_rates.c.bounce_rate, 0)
+        ).outerjoin(
+            bounce_rates, bounce_rates.c.payee == Check.payee
+        ).filter(
+            Check.check_date >= start,
+            Check.check_date < end,
+            Check.status.notin_([CheckStatus.PASSED, CheckStatus.BOUNCED])
+        ).order_by(Check.check_date).all()
+        
+        day_index = [(row[0] - start).days for row in rows]
+        is_incoming = [row[1] == CheckType.INCOMING for row in rows]
+        amounts = [float(row[2]) for row in rows]
+        # چک‌های خروجی خودمان قطعی فرض می‌شوند
+        weights = [1.0 - float(row[3]) if weighted and incoming else 1.0 for row, incoming in zip(rows, is_incoming)]
+        size = days + 1
+        
+        np = optional_module("numpy")
+        if np is not None:
+            index = np.array(day_index, dtype=np.int64)
+            incoming_mask = np.array(is_incoming, dtype=bool)
+            weighted_amounts = np.array(amounts, dtype=float) * np.array(weights, dtype=float)
+            incoming = np.bincount(index[incoming_mask], weights=weighted_amounts[incoming_mask], minlength=size)
+            outgoing = np.bincount(index[~incoming_mask], weights=weighted_amounts[~incoming_mask], minlength=size)
+            net = incoming - outgoing
+            balance = opening_balance + np.cumsum(net)
+            incoming, outgoing, net, balance = incoming.tolist(), outgoing.tolist(), net.tolist(), balance.tolist()
+        else:
+            incoming = [0.0] * size
+            outgoing = [0.0] * size
+            for index, incoming_check, amount, weight in zip(day_index, is_incoming, amounts, weights):
+                if incoming_check:
+                    incoming[index] += amount * weight
+                else:
+                    outgoing[index] += amount * weight
+            net = [i - o for i, o in zip(incoming, outgoing)]
+            balance = [opening_balance + value for value in accumulate(net)]
+        
+        points = [
+            {
+                "date": today + timedelta(days=offset),
+                "incoming": incoming[offset],
+                "outgoing": outgoing[offset],
+                "net": net[offset],
+                "balance": balance[offset]
+            }
+            for offset in range(size)
+        ]
+        lowest = min(points, key=lambda point: point["balance"])
+        
+        return {
+            "start_date": today,
+            "days": days,
+            "opening_balance": opening_balance,
+            "weighted": weighted,
+            "min_balance": lowest["balance"],
+            "min_balance_date": lowest["date"],
+            "points": points
+        }
+    
     def get_checks_needing_notification(self) -> List[Check]:
-        """دریافت چک‌هایی که نیاز به نوتیفیکیشن دارند (2 روز قبل)"""
-        today = datetime.now()
-        notification_date = today + timedelta(days=2)
-        
-        return self.db.query(Check).filter(
-            Check.check_date.between(
-                notification_date,
-                notification_date + timedelta(days=1)
-            ),
-            Check.notification_sent.is_(None),
-            Check.status.in_([CheckStatus.REGISTERED, CheckStatus.CONFIRMED])
-        ).all()
+        """دریافت چک‌هایی که زمان یادآوری‌شان رسیده است"""
+        return self.db.query(Check).filter(*self._notification_due_filter()).all()
     
     def mark_notification_sent(self, check_id: int) -> bool:
         """علامت‌گذاری چک به عنوان نوتیفیکیشن ارسال شده"""
@@ -110,4 +332,80 @@ class CheckService:
         
         check.notification_sent = datetime.utcnow()
         self.db.commit()
-        return True
\ No newline at end of file
+        return True
+    
+    @staticmethod
+    def compute_remind_at(check: Check) -> Optional[datetime]:
+        """زمان یادآوری: سررسید منهای فاصله تنظیم شده برای نوع چک
+        
+        مثل backfill مهاجرت، چکی که سررسیدش گذشته یادآوری نمی‌گیرد.
+        """
+        if check.check_date is None:
+            return None
+        # زمان‌های ذخیره شده UTC بدون tzinfo هستند
+        tz = check.check_date.tzinfo
+        if check.check_date < (datetime.now(tz) if tz else datetime.utcnow()):
+            return None
+        lead_days = (
+            settings.reminder_lead_days_incoming
+            if check.check_type == CheckType.INCOMING
+            else settings.reminder_lead_days_outgoing
+        )
+        return check.check_date - timedelta(days=lead_days)
+    
+    def _notification_due_filter(self) -> List:
+        """شرط چک‌هایی که زمان یادآوری‌شان رسیده و هنوز ارسال نشده‌اند
+        
+        همه یادآوری‌های عقب‌افتاده (مثلاً بعد از قطعی) هم برداشته می‌شوند و
+        شرط‌ها با ایندکس جزئی ix_checks_remind_at_pending یکی است.
+        """
+        return [
+            Check.remind_at <= datetime.utcnow(),
+            Check.remind_at.isnot(None),
+            Check.notification_sent.is_(None),
+            Check.status.in_([CheckStatus.REGISTERED, CheckStatus.CONFIRMED])
+        ]
+    
+    def claim_checks_for_notification(self, limit: int = 100) -> List[Dict]:
+        """برداشتن اتمیک یک دسته چک برای ارسال یادآوری (با commit)
+        
+        برداشتن یک lease با زمان notification_claimed_at است که بلافاصله commit می‌شود تا
+        ارسال بیرون از تراکنش و بدون قفل ردیف‌ها انجام شود. با SKIP LOCKED چند worker
+        می‌توانند همزمان برداشت کنند؛ اگر worker وسط ارسال از کار بیفتد بعد از
+        notification_claim_lease ثانیه چک دوباره برداشته می‌شود.
+        """
+        now = datetime.utcnow()
+        lease_expired = now - timedelta(seconds=settings.notification_claim_lease)
+        due_ids = select(Check.id).where(
+            *self._notification_due_filter(),
+            or_(Check.notification_claimed_at.is_(None), Check.notification_claimed_at < lease_expired)
+        ).order_by(Check.remind_at).limit(limit).with_for_update(skip_locked=True)
+        
+        rows = self.db.execute(
+            update(Check).where(Check.id.in_(due_ids.scalar_subquery())).values(
+                notification_claimed_at=now
+            ).returning(
+                Check.id, Check.check_number, Check.amount, Check.payee, Check.check_date, Check.check_type
+            ).execution_options(synchronize_session=False)
+        ).mappings().all()
+        self.db.commit()
+        return [{**row, "claimed_at": now} for row in rows]
+    
+    def settle_notification_claims(
+        self, claimed_at: datetime, delivered_ids: List[int], failed_ids: List[int]
+    ) -> None:
+        """ثبت ارسال موفق و آزاد کردن چک‌های ناموفق برای اجرای بعدی (بدون commit)
+        
+        فقط ردیف‌هایی که هنوز همین lease را دارند تغییر می‌کنند؛ اگر lease منقضی و
+        چک توسط worker دیگری برداشته شده باشد (یا سررسید عوض شده باشد) دست نمی‌خورد.
+        """
+        own_claim = Check.notification_claimed_at == claimed_at
+        if delivered_ids:
+            self.db.query(Check).filter(Check.id.in_(delivered_ids), own_claim).update(
+                {Check.notification_sent: datetime.utcnow(), Check.notification_claimed_at: None},
+                synchronize_session=False
+            )
+        if failed_ids:
+            self.db.query(Check).filter(Check.id.in_(failed_ids), own_claim).update(
+                {Check.notification_claimed_at: None}, synchronize_session=False
+            )
\ No newline at end of file
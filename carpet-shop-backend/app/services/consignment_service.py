@@ -0,0 +1,173 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from datetime import datetime
+from app.models.carpet import Carpet
+from app.models.invoice import Invoice
+from app.models.consignment import (
+    ConsignmentLedgerEntry, ConsignmentOwnerBalance, ConsignmentPayout, LedgerEntryType
+)
+from app.schemas.consignment import PayoutCreate
+
+class ConsignmentService:
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def _locked_balance(self, owner: str) -> Optional[ConsignmentOwnerBalance]:
+        return self.db.query(ConsignmentOwnerBalance).filter(
+            ConsignmentOwnerBalance.owner == owner
+        ).with_for_update().first()
+    
+    def _apply_to_balance(self, owner: str, owed: float = 0, paid: float = 0) -> ConsignmentOwnerBalance:
+        """به‌روزرسانی افزایشی مانده صاحب امانت (بدون commit)"""
+        balance = self._locked_balance(owner)
+        if balance is None:
+            # FOR UPDATE روی ردیفی که هنوز نیست قفلی نمی‌گیرد؛ دو فروش همزمان اول
+            # یک صاحب هر دو insert می‌کنند. savepoint تا شکست insert تراکنش بیرونی را خراب نکند
+            balance = ConsignmentOwnerBalance(
+                owner=owner, total_owed=owed, total_paid=paid, balance=owed - paid,
+                updated_at=datetime.utcnow()
+            )
+            try:
+                with self.db.begin_nested():
+                    self.db.add(balance)
+                return balance
+            except IntegrityError:
+                # تراکنش همزمان دیگری ردیف را ساخت؛ با قفل روی همان ردیف ادامه می‌دهیم
+                balance = self._locked_balance(owner)
+        
+        balance.total_owed += owed
+        balance.total_paid += paid
+        balance.balance += owed - paid
+        balance.updated_at = datetime.utcnow()
+        return balance
+    
+    def record_invoice_sales(self, invoice: Invoice) -> List[ConsignmentLedgerEntry]:
+        """ثبت بدهی به صاحبان امانت هنگام نهایی شدن فاکتور (بدون commit)"""
+        already_recorded = self.db.query(ConsignmentLedgerEntry.id).filter(
+            ConsignmentLedgerEntry.invoice_id == invoice.id,
+            ConsignmentLedgerEntry.entry_type == LedgerEntryType.SALE
+        ).first()
+        if already_recorded:
+            return []
+        
+        carpet_ids = [item.carpet_id for item in invoice.items]
+        carpets = {
+            carpet.id: carpet
+            for carpet in self.db.query(Carpet).filter(
+                Carpet.id.in_(carpet_ids),
+                Carpet.is_consignment == True
+            ).all()
+        } if carpet_ids else {}
+        
+        entries = []
+        owed_by_owner: Dict[str, float] = {}
+        for item in invoice.items:
+            carpet = carpets.get(item.carpet_id)
+            if not carpet or not carpet.consignment_owner:
+                continue
+            
+            amount = (carpet.owner_declared_price or 0) * item.quantity
+            entry = ConsignmentLedgerEntry(
+                owner=carpet.consignment_owner,
+                entry_type=LedgerEntryType.SALE,
+                amount=amount,
+                carpet_id=carpet.id,
+                invoice_id=invoice.id,
+                invoice_item_id=item.id,
+                description=f"فروش در فاکتور {invoice.invoice_number}"
+            )
+            self.db.add(entry)
+            owed_by_owner[carpet.consignment_owner] = owed_by_owner.get(carpet.consignment_owner, 0) + amount
+            entries.append(entry)
+        
+        # یک به‌روزرسانی مانده برای هر صاحب امانت، نه برای هر ردیف فاکتور
+        for owner, owed in owed_by_owner.items():
+            self._apply_to_balance(owner, owed=owed)
+        
+        return entries
+    
+    def reverse_invoice_sales(self, invoice: Invoice) -> None:
+        """ثبت ردیف برگشتی برای فروش‌های امانتی یک فاکتور حذف شده (بدون commit)"""
+        sales = self.db.query(ConsignmentLedgerEntry).filter(
+            ConsignmentLedgerEntry.invoice_id == invoice.id,
+            ConsignmentLedgerEntry.entry_type == LedgerEntryType.SALE
+        ).all()
+        
+        reversed_by_owner: Dict[str, float] = {}
+        for sale in sales:
+            self.db.add(ConsignmentLedgerEntry(
+                owner=sale.owner,
+                entry_type=LedgerEntryType.REVERSAL,
+                amount=-sale.amount,
+                carpet_id=sale.carpet_id,
+                description=f"حذف فاکتور {invoice.invoice_number}"
+            ))
+            reversed_by_owner[sale.owner] = reversed_by_owner.get(sale.owner, 0) + sale.amount
+        
+        # برگشت فروش از بدهی کم می‌شود، نه اینکه پرداخت حساب شود
+        for owner, amount in reversed_by_owner.items():
+            self._apply_to_balance(owner, owed=-amount)
+    
+    def get_balance(self, owner: str) -> Optional[ConsignmentOwnerBalance]:
+        """مانده یک صاحب امانت"""
+        return self.db.query(ConsignmentOwnerBalance).filter(
+            ConsignmentOwnerBalance.owner == owner
+        ).first()
+    
+    def list_balances(self, skip: int = 0, limit: int = 100, outstanding_only: bool = False) -> List[ConsignmentOwnerBalance]:
+        """لیست مانده صاحبان امانت"""
+        query = self.db.query(ConsignmentOwnerBalance)
+        if outstanding_only:
+            query = query.filter(ConsignmentOwnerBalance.balance > 0)
+        return query.order_by(ConsignmentOwnerBalance.balance.desc()).offset(skip).limit(limit).all()
+    
+    def list_ledger(self, owner: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[ConsignmentLedgerEntry]:
+        """ردیف‌های دفتر امانت"""
+        query = self.db.query(ConsignmentLedgerEntry)
+        if owner:
+            query = query.filter(ConsignmentLedgerEntry.owner == owner)
+        return query.order_by(ConsignmentLedgerEntry.id.desc()).offset(skip).limit(limit).all()
+    
+    def create_payout(self, payout_data: PayoutCreate) -> ConsignmentPayout:
+        """تسویه گروهی چند صاحب امانت در یک تراکنش"""
+        owners = [line.owner for line in payout_data.lines]
+        if len(set(owners)) != len(owners):
+            raise ValueError("هر صاحب امانت فقط یک بار می‌تواند در تسویه باشد")
+        
+        balances: Dict[str, ConsignmentOwnerBalance] = {
+            balance.owner: balance
+            for balance in self.db.query(ConsignmentOwnerBalance).filter(
+                ConsignmentOwnerBalance.owner.in_(owners)
+            ).with_for_update().all()
+        }
+        
+        payout = ConsignmentPayout(total_amount=0, owner_count=0, description=payout_data.description)
+        self.db.add(payout)
+        self.db.flush()
+        
+        total = 0.0
+        for line in payout_data.lines:
+            balance = balances.get(line.owner)
+            amount = line.amount if line.amount is not None else (balance.balance if balance else 0)
+            if not balance or amount <= 0 or amount > balance.balance:
+                self.db.rollback()
+                raise ValueError(f"مبلغ تسویه برای {line.owner} بیشتر از مانده است")
+            
+            self.db.add(ConsignmentLedgerEntry(
+                owner=line.owner,
+                entry_type=LedgerEntryType.PAYOUT,
+                amount=-amount,
+                payout_id=payout.id,
+                description=payout_data.description
+            ))
+            balance.total_paid += amount
+            balance.balance -= amount
+            balance.updated_at = datetime.utcnow()
+            total += amount
+        
+        payout.total_amount = total
+        payout.owner_count = len(payout_data.lines)
+        self.db.commit()
+        self.db.refresh(payout)
+        return payout
@@ -0,0 +1,192 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from app.models.customer import Customer
+from app.models.invoice import Invoice
+from app.models.check import Check, CheckStatus, CheckType
+from app.models.carpet import PaymentMethod
+from app.utils.text import normalize_name
+
+# (customer_id, check_type, status, amount)
+CheckSnapshot = Tuple[Optional[int], Optional[CheckType], Optional[CheckStatus], float]
+
+def check_snapshot(check: Optional[Check]) -> Optional[CheckSnapshot]:
+    """وضعیت یک چک که روی حساب مشتری اثر دارد"""
+    if check is None:
+        return None
+    return (check.customer_id, check.check_type, check.status, check.amount or 0)
+
+def _check_contribution(snapshot: Optional[CheckSnapshot]) -> Dict[str, float]:
+    if not snapshot:
+        return {}
+    customer_id, check_type, status, amount = snapshot
+    if customer_id is None or check_type != CheckType.INCOMING:
+        return {}
+    if status == CheckStatus.PASSED:
+        return {"total_paid_by_check": amount}
+    if status == CheckStatus.BOUNCED:
+        return {"total_bounced": amount}
+    return {}
+
+def _invoice_contribution(invoice: Invoice) -> Dict[str, float]:
+    contribution = {"total_invoiced": invoice.total_amount or 0}
+    if invoice.payment_method == PaymentMethod.CASH.value:
+        contribution["total_paid_cash"] = invoice.total_amount or 0
+    return contribution
+
+class CustomerService:
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def _find_by_normalized_name(self, normalized: str) -> Optional[Customer]:
+        return self.db.query(Customer).filter(Customer.normalized_name == normalized).first()
+    
+    def get_or_create(self, name: str, phone: Optional[str] = None) -> Customer:
+        """یافتن مشتری با نام یکسان‌سازی شده یا ایجاد آن (بدون commit)"""
+        normalized = normalize_name(name)
+        customer = self._find_by_normalized_name(normalized)
+        if customer:
+            return customer
+        
+        customer = Customer(
+            name=name.strip(),
+            normalized_name=normalized,
+            phone=phone,
+            total_invoiced=0,
+            total_paid_cash=0,
+            total_paid_by_check=0,
+            total_bounced=0,
+            outstanding=0
+        )
+        try:
+            # savepoint تا شکست insert تراکنش بیرونی (مثلاً ساخت فاکتور) را خراب نکند
+            with self.db.begin_nested():
+                self.db.add(customer)
+        except IntegrityError:
+            # درخواست همزمان دیگری همین مشتری را ساخت
+            customer = self._find_by_normalized_name(normalized)
+            if customer is None:
+                raise
+        return customer
+    
+    def create_customer(self, name: str, phone: Optional[str] = None) -> Customer:
+        """ایجاد مشتری جدید"""
+        if self.db.query(Customer.id).filter(Customer.normalized_name == normalize_name(name)).first():
+            raise ValueError("مشتری با این نام قبلاً ثبت شده")
+        customer = self.get_or_create(name, phone)
+        self.db.commit()
+        self.db.refresh(customer)
+        return customer
+    
+    def _apply_deltas(self, deltas: Dict[int, Dict[str, float]]) -> None:
+        """اعمال تغییرات جمع‌ها با UPDATE اتمیک (بدون commit)"""
+        for customer_id, delta in deltas.items():
+            if not any(delta.values()):
+                continue
+            invoiced = delta.get("total_invoiced", 0)
+            cash = delta.get("total_paid_cash", 0)
+            paid = delta.get("total_paid_by_check", 0)
+            bounced = delta.get("total_bounced", 0)
+            self.db.query(Customer).filter(Customer.id == customer_id).update({
+                Customer.total_invoiced: Customer.total_invoiced + invoiced,
+                Customer.total_paid_cash: Customer.total_paid_cash + cash,
+                Customer.total_paid_by_check: Customer.total_paid_by_check + paid,
+                Customer.total_bounced: Customer.total_bounced + bounced,
+                Customer.outstanding: Customer.outstanding + (invoiced - cash - paid),
+                Customer.updated_at: datetime.utcnow(),
+            }, synchronize_session=False)
+    
+    @staticmethod
+    def _accumulate(deltas: Dict, customer_id: Optional[int], contribution: Dict[str, float], sign: int) -> None:
+        if customer_id is None:
+            return
+        target = deltas.setdefault(customer_id, {})
+        for field, value in contribution.items():
+            target[field] = target.get(field, 0) + sign * value
+    
+    def track_invoice(self, invoice: Invoice, sign: int = 1) -> None:
+        """افزودن (sign=1) یا کم کردن (sign=-1) اثر یک فاکتور از حساب مشتری"""
+        deltas: Dict = {}
+        self._accumulate(deltas, invoice.customer_id, _invoice_contribution(invoice), sign)
+        self._apply_deltas(deltas)
+    
+    def track_check_changes(self, changes: List[Tuple[Optional[CheckSnapshot], Optional[CheckSnapshot]]]) -> None:
+        """اعمال اثر تغییر وضعیت چک‌ها (قبل، بعد) روی حساب مشتری‌ها"""
+        deltas: Dict = {}
+        for before, after in changes:
+            if before:
+                self._accumulate(deltas, before[0], _check_contribution(before), -1)
+            if after:
+                self._accumulate(deltas, after[0], _check_contribution(after), 1)
+        self._apply_deltas(deltas)
+    
+    def get_customer(self, customer_id: int) -> Optional[Customer]:
+        """دریافت یک مشتری"""
+        return self.db.query(Customer).filter(Customer.id == customer_id).first()
+    
+    def search(self, query: str, limit: int = 10) -> List[Customer]:
+        """جستجوی پیشوندی نام مشتری (autocomplete)"""
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+        escaped = normalized.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return self.db.query(Customer).filter(
+            Customer.normalized_name.like(f"{escaped}%", escape="\\")
+        ).order_by(Customer.normalized_name).limit(limit).all()
+    
+    def list_customers(self, skip: int = 0, limit: int = 100, debtors_only: bool = False) -> List[Customer]:
+        """لیست مشتری‌ها"""
+        query = self.db.query(Customer)
+        if debtors_only:
+            query = query.filter(Customer.outstanding > 0)
+        return query.order_by(Customer.outstanding.desc()).offset(skip).limit(limit).all()
+    
+    def get_statement(self, customer_id: int) -> Optional[Dict]:
+        """صورت‌حساب مشتری با مانده جاری"""
+        customer = self.get_customer(customer_id)
+        if not customer:
+            return None
+        
+        invoices = self.db.query(Invoice).filter(Invoice.customer_id == customer_id).all()
+        checks = self.db.query(Check).filter(
+            Check.customer_id == customer_id,
+            Check.check_type == CheckType.INCOMING
+        ).all()
+        
+        entries = []
+        for invoice in invoices:
+            entries.append({
+                "date": invoice.invoice_date,
+                "kind": "invoice",
+                "reference": invoice.invoice_number,
+                "debit": invoice.total_amount,
+                "credit": 0.0,
+                "status": None
+            })
+            if invoice.payment_method == PaymentMethod.CASH.value:
+                entries.append({
+                    "date": invoice.invoice_date,
+                    "kind": "cash",
+                    "reference": invoice.invoice_number,
+                    "debit": 0.0,
+                    "credit": invoice.total_amount,
+                    "status": None
+                })
+        for check in checks:
+            entries.append({
+                "date": check.check_date,
+                "kind": "check",
+                "reference": check.check_number,
+                "debit": 0.0,
+                "credit": check.amount if check.status == CheckStatus.PASSED else 0.0,
+                "status": check.status
+            })
+        
+        entries.sort(key=lambda entry: entry["date"])
+        balance = 0.0
+        for entry in entries:
+            balance += entry["debit"] - entry["credit"]
+            entry["balance"] = balance
+        
+        return {"customer": customer, "entries": entries}
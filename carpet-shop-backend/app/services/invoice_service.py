@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List, Optional
 from datetime import datetime
 from fastapi import UploadFile
@@ -7,8 +8,13 @@ import uuid
 from app.models.invoice import Invoice, InvoiceItem
 from app.models.carpet import Carpet
 from app.schemas.invoice import InvoiceCreate, InvoiceUpdate
+from app.services.consignment_service import ConsignmentService
+from app.services.customer_service import CustomerService
 from app.config import settings
+from app.utils.write_behind import touch_buffer
+from app.utils.tracing import traced_service, file_span
 
+@traced_service
 class InvoiceService:
     def __init__(self, db: Session):
         self.db = db
@@ -33,10 +39,19 @@ class InvoiceService:
     
     def create_invoice(self, invoice_data: InvoiceCreate) -> Invoice:
         """ایجاد فاکتور جدید"""
+        customer_service = CustomerService(self.db)
+        if invoice_data.customer_id:
+            customer = customer_service.get_customer(invoice_data.customer_id)
+            if not customer:
+                raise ValueError("مشتری یافت نشد")
+        else:
+            customer = customer_service.get_or_create(invoice_data.customer_name)
+        
         # ایجاد فاکتور
         invoice = Invoice(
             invoice_number=self.generate_invoice_number(),
             customer_name=invoice_data.customer_name,
+            customer_id=customer.id,
             payment_method=invoice_data.payment_method,
             description=invoice_data.description,
             invoice_date=invoice_data.invoice_date,
@@ -70,6 +85,7 @@ class InvoiceService:
             total += total_price
         
         invoice.total_amount = total
+        customer_service.track_invoice(invoice)
         self.db.commit()
         self.db.refresh(invoice)
         return invoice
@@ -106,10 +122,17 @@ class InvoiceService:
         if not invoice:
             return None
         
+        customer_service = CustomerService(self.db)
+        customer_service.track_invoice(invoice, sign=-1)
+        
         update_data = invoice_update.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(invoice, field, value)
         
+        if "customer_name" in update_data:
+            invoice.customer_id = customer_service.get_or_create(invoice.customer_name).id
+        customer_service.track_invoice(invoice)
+        
         invoice.last_edited_at = datetime.utcnow()
         self.db.commit()
         self.db.refresh(invoice)
@@ -127,6 +150,10 @@ class InvoiceService:
             if carpet:
                 carpet.quantity += item.quantity
         
+        # برگشت بدهی ثبت شده به صاحبان امانت
+        ConsignmentService(self.db).reverse_invoice_sales(invoice)
+        CustomerService(self.db).track_invoice(invoice, sign=-1)
+        
         self.db.delete(invoice)
         self.db.commit()
         return True
@@ -143,12 +170,13 @@ class InvoiceService:
         unique_filename = f"signature_{uuid.uuid4()}{file_extension}"
         file_path = os.path.join(settings.upload_dir, unique_filename)
         
-        with open(file_path, "wb") as buffer:
+        with file_span("write", file_path), open(file_path, "wb") as buffer:
             content = file.file.read()
             buffer.write(content)
         
         if invoice.signature_path and os.path.exists(invoice.signature_path):
-            os.remove(invoice.signature_path)
+            with file_span("delete", invoice.signature_path):
+                os.remove(invoice.signature_path)
         
         invoice.signature_path = file_path
         invoice.is_signed = True
@@ -164,15 +192,26 @@ class InvoiceService:
         if not invoice:
             return None
         
-        # کم کردن موجودی فرش‌ها
+        # کم کردن موجودی فرش‌ها (همه فرش‌ها با یک کوئری)
+        carpet_ids = [item.carpet_id for item in invoice.items]
+        carpets = {
+            carpet.id: carpet
+            for carpet in self.db.query(Carpet).filter(Carpet.id.in_(carpet_ids)).all()
+        } if carpet_ids else {}
         for item in invoice.items:
-            carpet = self.db.query(Carpet).filter(Carpet.id == item.carpet_id).first()
+            carpet = carpets.get(item.carpet_id)
             if carpet:
                 carpet.quantity -= item.quantity
                 if carpet.quantity < 0:
                     carpet.quantity = 0
         
-        invoice.last_edited_at = datetime.utcnow()
+        # ثبت بدهی به صاحبان فرش‌های امانتی در همان تراکنش
+        ConsignmentService(self.db).record_invoice_sales(invoice)
+        
         self.db.commit()
+        # last_edited_at از بافر write-behind نوشته می‌شود؛ پاسخ همان مقدار بافر شده را نشان می‌دهد
+        now = datetime.utcnow()
+        touch_buffer.touch(Invoice, invoice_id, "last_edited_at", now)
         self.db.refresh(invoice)
+        set_committed_value(invoice, "last_edited_at", now)
         return invoice
\ No newline at end of file
@@ -0,0 +1,232 @@
+"""
+ارسال یادآوری چک‌ها از طریق کانال‌های قابل تعویض (فایل، ایمیل، وب‌هوک)
+"""
+import asyncio
+import json
+import logging
+import smtplib
+import urllib.request
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Type
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.notification import CheckNotification, NotificationStatus
+from app.services.check_service import CheckService
+
+logger = logging.getLogger(__name__)
+
+def build_message(check: Dict) -> Dict:
+    """ساخت متن یادآوری یک چک"""
+    return {
+        'check_id': check['id'],
+        'check_number': check['check_number'],
+        'amount': check['amount'],
+        'check_date': check['check_date'].isoformat(),
+        'message': (
+            f"یادآوری: چک شماره {check['check_number']} "
+            f"به مبلغ {check['amount']:,} ریال "
+            f"در تاریخ {check['check_date'].strftime('%Y-%m-%d')} سررسید دارد."
+        )
+    }
+
+
+class NotificationChannel:
+    """کلاس پایه کانال ارسال؛ send در صورت خطا exception می‌دهد"""
+    name = "base"
+    
+    async def send(self, message: Dict) -> None:
+        raise NotImplementedError
+
+
+class LogChannel(NotificationChannel):
+    name = "log"
+    
+    async def send(self, message: Dict) -> None:
+        logger.info("🔔 %s", message["message"])
+
+
+class FileChannel(NotificationChannel):
+    """نوشتن یادآوری‌ها در فایل (جایگزین محلی برای تست و توسعه)"""
+    name = "file"
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.notification_file_path
+        self._lock = asyncio.Lock()
+    
+    def _write(self, line: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+    
+    async def send(self, message: Dict) -> None:
+        line = json.dumps({**message, "sent_at": datetime.utcnow().isoformat()}, ensure_ascii=False)
+        async with self._lock:
+            await asyncio.to_thread(self._write, line)
+
+
+class SMTPChannel(NotificationChannel):
+    """ارسال ایمیل (برای توسعه: python -m aiosmtpd -n -l localhost:1025)"""
+    name = "smtp"
+    
+    def _send(self, message: Dict) -> None:
+        email = EmailMessage()
+        email["Subject"] = f"یادآوری چک {message['check_number']}"
+        email["From"] = settings.smtp_sender
+        email["To"] = settings.notification_email_to
+        email.set_content(message["message"])
+        with smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=10) as client:
+            client.send_message(email)
+    
+    async def send(self, message: Dict) -> None:
+        if not settings.notification_email_to:
+            raise ValueError("notification_email_to تنظیم نشده است")
+        await asyncio.to_thread(self._send, message)
+
+
+class WebhookChannel(NotificationChannel):
+    name = "webhook"
+    
+    def _post(self, message: Dict) -> None:
+        request = urllib.request.Request(
+            settings.notification_webhook_url,
+            data=json.dumps(message, ensure_ascii=False).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=10) as response:
+            response.read()
+    
+    async def send(self, message: Dict) -> None:
+        if not settings.notification_webhook_url:
+            raise ValueError("notification_webhook_url تنظیم نشده است")
+        await asyncio.to_thread(self._post, message)
+
+
+CHANNELS: Dict[str, Type[NotificationChannel]] = {
+    channel.name: channel
+    for channel in (LogChannel, FileChannel, SMTPChannel, WebhookChannel)
+}
+
+def get_channels(names: Optional[str] = None) -> List[NotificationChannel]:
+    """ساخت کانال‌ها از روی تنظیمات"""
+    names = names if names is not None else settings.notification_channels
+    channels = []
+    for name in filter(None, (part.strip() for part in names.split(","))):
+        if name not in CHANNELS:
+            raise ValueError(f"کانال نوتیفیکیشن ناشناخته: {name}")
+        channels.append(CHANNELS[name]())
+    return channels
+
+
+class NotificationDispatcher:
+    def __init__(
+        self,
+        channels: List[NotificationChannel],
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff: Optional[float] = None
+    ):
+        self.channels = channels
+        self.max_concurrency = max_concurrency or settings.notification_max_concurrency
+        self.max_retries = max_retries if max_retries is not None else settings.notification_max_retries
+        self.backoff = backoff if backoff is not None else settings.notification_retry_backoff
+    
+    async def _send_with_retry(self, semaphore: asyncio.Semaphore, channel: NotificationChannel, message: Dict) -> Dict:
+        error = None
+        for attempt in range(1, self.max_retries + 2):
+            async with semaphore:
+                try:
+                    await channel.send(message)
+                    return {"check_id": message["check_id"], "channel": channel.name, "attempts": attempt, "error": None}
+                except Exception as e:
+                    error = str(e) or e.__class__.__name__
+            if attempt <= self.max_retries:
+                await asyncio.sleep(self.backoff * (2 ** (attempt - 1)))
+        return {"check_id": message["check_id"], "channel": channel.name, "attempts": self.max_retries + 1, "error": error}
+    
+    async def dispatch(self, messages: List[Dict]) -> List[Dict]:
+        """ارسال همزمان همه پیام‌ها در همه کانال‌ها با سقف همزمانی"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        return await asyncio.gather(*(
+            self._send_with_retry(semaphore, channel, message)
+            for message in messages
+            for channel in self.channels
+        ))
+
+
+class NotificationService:
+    def __init__(self, db: Session, dispatcher: Optional[NotificationDispatcher] = None):
+        self.db = db
+        self.dispatcher = dispatcher or NotificationDispatcher(get_channels())
+    
+    def record_outcomes(self, outcomes: List[Dict]) -> None:
+        """ثبت نتیجه هر کانال با یک bulk insert"""
+        if not outcomes:
+            return
+        self.db.bulk_insert_mappings(CheckNotification, [
+            {
+                "check_id": outcome["check_id"],
+                "channel": outcome["channel"],
+                "status": NotificationStatus.FAILED if outcome["error"] else NotificationStatus.SENT,
+                "attempts": outcome["attempts"],
+                "error": outcome["error"],
+                "created_at": datetime.utcnow(),
+            }
+            for outcome in outcomes
+        ])
+    
+    def process_due_checks(self) -> Dict:
+        """برداشتن یک دسته چک سررسیدی، ارسال و ثبت نتیجه"""
+        check_service = CheckService(self.db)
+        claimed = check_service.claim_checks_for_notification(settings.notification_batch_size)
+        if not claimed:
+            return {'success': True, 'claimed': 0, 'notifications_sent': 0, 'failed_check_ids': [], 'notifications': []}
+        
+        # ارسال بیرون از تراکنش؛ ردیف‌ها فقط با lease برداشته شده‌اند و قفل نیستند
+        claimed_at = claimed[0]["claimed_at"]
+        messages = [build_message(check) for check in claimed]
+        try:
+            outcomes = asyncio.run(self.dispatcher.dispatch(messages))
+        except BaseException:
+            # آزاد کردن فوری؛ اگر پروسه از بین برود lease خودش منقضی می‌شود
+            self.db.rollback()
+            check_service.settle_notification_claims(claimed_at, [], [check["id"] for check in claimed])
+            self.db.commit()
+            raise
+        
+        # چک‌هایی که در هیچ کانالی ارسال نشدند برای اجرای بعدی آزاد می‌شوند
+        delivered = {outcome["check_id"] for outcome in outcomes if not outcome["error"]}
+        failed = [check["id"] for check in claimed if check["id"] not in delivered]
+        try:
+            check_service.settle_notification_claims(claimed_at, list(delivered), failed)
+            self.record_outcomes(outcomes)
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+        
+        return {
+            'success': not failed,
+            'claimed': len(claimed),
+            'notifications_sent': len(delivered),
+            'failed_check_ids': failed,
+            'notifications': [message for message in messages if message['check_id'] in delivered]
+        }
+    
+    def process_all_due_checks(self) -> Dict:
+        """پردازش دسته به دسته همه یادآوری‌های سررسیده (جبران اجراهای از دست رفته)"""
+        total_sent = 0
+        failed_check_ids: List[int] = []
+        for _ in range(settings.notification_max_batches_per_run):
+            result = self.process_due_checks()
+            total_sent += result['notifications_sent']
+            failed_check_ids.extend(result['failed_check_ids'])
+            # دسته ناقص یعنی صف خالی شد؛ در صورت خطا هم تا اجرای بعد صبر می‌کنیم
+            if result['claimed'] < settings.notification_batch_size or result['failed_check_ids']:
+                break
+        
+        return {
+            'success': not failed_check_ids,
+            'notifications_sent': total_sent,
+            'failed_check_ids': failed_check_ids
+        }
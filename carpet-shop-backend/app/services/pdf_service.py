@@ -1,22 +1,19 @@
 """
 PDF Service - با پشتیبانی از حالت بدون reportlab
-"""
 
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib import colors
-    from reportlab.lib.units import cm
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
+reportlab فقط هنگام ساخت PDF import می‌شود.
+"""
 
 from typing import List
 import tempfile
 from datetime import datetime
+from app.utils.lazy import module_available
+from app.utils.tracing import traced_service, file_span
 
+REPORTLAB_AVAILABLE = module_available("reportlab")
 
+
+@traced_service
 class PDFService:
     def __init__(self):
         if not REPORTLAB_AVAILABLE:
@@ -31,6 +28,12 @@ class PDFService:
                 "Please install it with: pip install reportlab"
             )
         
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib import colors
+        from reportlab.lib.units import cm
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        
         # ایجاد فایل موقت
         temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
         pdf_path = temp_file.name
@@ -93,6 +96,7 @@ class PDFService:
         elements.append(table)
         
         # ساخت PDF
-        doc.build(elements)
+        with file_span("write", pdf_path):
+            doc.build(elements)
         
         return pdf_path
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+تطبیق صورت‌حساب بانک با چک‌های ثبت شده
+"""
+import csv
+import io
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.models.check import Check, CheckStatus
+from app.schemas.check import CheckTransition
+from app.services.check_service import CheckService
+from app.utils.jalali import jalali_to_gregorian
+
+_DIGITS = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩", "01234567890123456789")
+
+BOUNCED_KEYWORDS = {"bounced", "returned", "برگشتی", "برگشت خورده", "برگشت"}
+
+# وضعیت‌هایی که می‌توانند با صورت‌حساب بانک پاس یا برگشت شوند
+OPEN_STATUSES = [CheckStatus.REGISTERED, CheckStatus.CONFIRMED]
+
+
+def _normalize_number(value: str) -> str:
+    return value.translate(_DIGITS).strip().lstrip("0") or "0"
+
+def _parse_amount(value: str) -> float:
+    return float(value.translate(_DIGITS).replace(",", "").replace("٬", "").strip())
+
+def _parse_date(value: str) -> datetime:
+    """تاریخ میلادی (2024-05-01) یا شمسی (1403/02/12)"""
+    parts = value.translate(_DIGITS).strip().replace("-", "/").split("/")
+    year, month, day = (int(part) for part in parts[:3])
+    if year < 1700:
+        year, month, day = jalali_to_gregorian(year, month, day)
+    return datetime(year, month, day)
+
+def parse_statement(file: BinaryIO) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """خواندن جریانی CSV صورت‌حساب بانک
+    
+    ستون‌ها: check_number, amount, date و ستون اختیاری status (passed/bounced).
+    خروجی: (شماره خط، ردیف یا None، خطا یا None)
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    for line_number, row in enumerate(reader, start=2):
+        try:
+            status = (row.get("status") or "").strip().lower()
+            yield line_number, {
+                "line": line_number,
+                "check_number": _normalize_number(row["check_number"]),
+                "amount": _parse_amount(row["amount"]),
+                "date": _parse_date(row["date"]),
+                "status": CheckStatus.BOUNCED if status in BOUNCED_KEYWORDS else CheckStatus.PASSED,
+            }, None
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            yield line_number, None, f"خط {line_number} نامعتبر است: {e}"
+
+
+class ReconciliationService:
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def _build_index(self) -> Dict[str, List[Dict]]:
+        """ایندکس هش چک‌های باز بر اساس شماره چک (با یک کوئری)"""
+        index: Dict[str, List[Dict]] = {}
+        rows = self.db.query(
+            Check.id, Check.check_number, Check.amount, Check.check_date
+        ).filter(Check.status.in_(OPEN_STATUSES)).all()
+        for check_id, check_number, amount, check_date in rows:
+            index.setdefault(_normalize_number(check_number), []).append({
+                "id": check_id,
+                "amount": amount,
+                "check_date": check_date,
+            })
+        return index
+    
+    def reconcile(
+        self,
+        file: BinaryIO,
+        date_tolerance_days: int = 3,
+        amount_tolerance: float = 0.5,
+        dry_run: bool = False
+    ) -> Dict:
+        """تطبیق خطوط صورت‌حساب با چک‌ها و اعمال گروهی وضعیت پاس/برگشت"""
+        index = self._build_index()
+        tolerance = timedelta(days=date_tolerance_days)
+        
+        matched = []
+        unmatched = []
+        errors = []
+        total_lines = 0
+        
+        for _, line, error in parse_statement(file):
+            total_lines += 1
+            if error:
+                errors.append(error)
+                continue
+            
+            candidates = index.get(line["check_number"], [])
+            best = None
+            for candidate in candidates:
+                if abs(candidate["amount"] - line["amount"]) > amount_tolerance:
+                    continue
+                distance = abs(candidate["check_date"] - line["date"])
+                if distance <= tolerance and (best is None or distance < best[1]):
+                    best = (candidate, distance)
+            
+            if best is None:
+                unmatched.append({
+                    "line": line["line"],
+                    "check_number": line["check_number"],
+                    "amount": line["amount"],
+                    "date": line["date"],
+                    "status": line["status"]
+                })
+                continue
+            
+            # هر چک فقط با یک خط تطبیق داده می‌شود
+            candidates.remove(best[0])
+            matched.append({"line": line["line"], "check_id": best[0]["id"], "to_status": line["status"]})
+        
+        results = []
+        if matched and not dry_run:
+            results = CheckService(self.db).bulk_transition(
+                [CheckTransition(check_id=match["check_id"], to_status=match["to_status"]) for match in matched],
+                note="تطبیق صورت‌حساب بانک"
+            )
+        
+        return {
+            "total_lines": total_lines,
+            "matched_count": len(matched),
+            "unmatched_count": len(unmatched),
+            "dry_run": dry_run,
+            "matched": matched,
+            "unmatched": unmatched,
+            "errors": errors,
+            "transitions": results
+        }
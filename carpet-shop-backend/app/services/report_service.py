@@ -1,14 +1,48 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from datetime import datetime
+from sqlalchemy import DateTime, bindparam, func, and_, case
+from datetime import datetime, timedelta, timezone
+from dateutil.relativedelta import relativedelta
 from typing import Optional, Dict, List
+from app.database import use_replica
 from app.models.invoice import Invoice, InvoiceItem
 from app.models.check import Check, CheckType
-from app.models.carpet import Carpet
+from app.models.carpet import Carpet, CarpetOperation
+from app.models.calendar import CalendarDay
+from app.utils.jalali import tehran_today
+from app.utils.cache import TTLCache
+from app.utils.lazy import optional_module
+from app.utils.tracing import traced_service
 
+TIMESERIES_METRICS = ("revenue", "profit", "units", "checks_in", "checks_out")
+TIMESERIES_BUCKETS = {
+    "day": relativedelta(days=1),
+    "week": relativedelta(weeks=1),
+    "month": relativedelta(months=1),
+}
+PROFITABILITY_DIMENSIONS = {
+    "brand": Carpet.brand,
+    "material": Carpet.material,
+    "size": Carpet.size,
+    "seller": Carpet.seller_name,
+}
+PROFITABILITY_SORT_KEYS = ("profit", "margin", "revenue", "units_sold", "sell_through_rate", "avg_days_to_sell")
+
+# بازه‌های سن موجودی (روز)
+AGING_BUCKETS = ("0-30", "31-90", "91-180", "180+")
+aging_cache = TTLCache(ttl=60)
+
+JALALI_PERIODS = (
+    "this_month", "last_month",
+    "this_quarter", "last_quarter",
+    "this_year", "last_year",
+)
+
+@traced_service
 class ReportService:
     def __init__(self, db: Session):
         self.db = db
+        # گزارش‌ها فقط می‌خوانند؛ در صورت امکان از replica
+        use_replica(db)
     
     def get_financial_report(
         self,
@@ -43,12 +77,12 @@ class ReportService:
             func.sum(InvoiceItem.quantity)
         ).scalar() or 0
         
-        # محاسبه هزینه کل (قیمت خرید فرش‌های فروخته شده)
-        sold_carpets_cost = 0
-        for item in item_query.all():
-            carpet = self.db.query(Carpet).filter(Carpet.id == item.carpet_id).first()
-            if carpet:
-                sold_carpets_cost += carpet.total_cost * item.quantity
+        # محاسبه هزینه کل (قیمت تمام شده فرش‌های فروخته شده) در یک کوئری
+        operations_cost = self._operations_cost_subquery()
+        unit_cost = self._unit_cost_expression(operations_cost)
+        sold_carpets_cost = item_query.join(Carpet, Carpet.id == InvoiceItem.carpet_id).outerjoin(
+            operations_cost, operations_cost.c.carpet_id == Carpet.id
+        ).with_entities(func.sum(unit_cost * InvoiceItem.quantity)).scalar() or 0
         
         # محاسبه سود
         profit = total_revenue - sold_carpets_cost
@@ -84,36 +118,426 @@ class ReportService:
     def get_inventory_report(self) -> Dict:
         """گزارش موجودی انبار"""
         
-        # تعداد کل فرش‌ها
-        total_carpets = self.db.query(func.sum(Carpet.quantity)).scalar() or 0
+        # یک کوئری گروه‌بندی شده روی اندازه، جنس و امانتی بودن
+        # (تعداد گروه‌ها به تعداد فرش‌ها وابسته نیست)
+        operations_cost = self._operations_cost_subquery()
+        unit_cost = self._unit_cost_expression(operations_cost)
+        
+        rows = self.db.query(
+            Carpet.size,
+            Carpet.material,
+            Carpet.is_consignment,
+            func.sum(Carpet.quantity).label('count'),
+            func.sum(unit_cost * Carpet.quantity).label('value')
+        ).outerjoin(
+            operations_cost, operations_cost.c.carpet_id == Carpet.id
+        ).filter(
+            Carpet.quantity > 0,
+            Carpet.is_deleted == False
+        ).group_by(
+            Carpet.size, Carpet.material, Carpet.is_consignment
+        ).all()
+        
+        total_carpets = 0
+        total_inventory_value = 0.0
+        consignment_count = 0
+        by_size: Dict = {}
+        by_material: Dict = {}
+        
+        for size, material, is_consignment, count, value in rows:
+            count = int(count or 0)
+            total_carpets += count
+            total_inventory_value += float(value or 0)
+            if is_consignment:
+                consignment_count += count
+            by_size[size] = by_size.get(size, 0) + count
+            by_material[material] = by_material.get(material, 0) + count
+        
+        return {
+            "total_carpets": total_carpets,
+            "total_inventory_value": total_inventory_value,
+            "by_size": [{"size": size, "count": count} for size, count in by_size.items()],
+            "by_material": [{"material": material, "count": count} for material, count in by_material.items()],
+            "consignment_count": consignment_count,
+            "owned_count": total_carpets - consignment_count
+        }
+    
+    def _operations_cost_subquery(self):
+        """جمع هزینه عملیات هر فرش به صورت یک زیرکوئری گروه‌بندی شده"""
+        return self.db.query(
+            CarpetOperation.carpet_id.label("carpet_id"),
+            func.sum(CarpetOperation.price).label("operations_cost")
+        ).group_by(CarpetOperation.carpet_id).subquery()
+    
+    def _unit_cost_expression(self, operations_cost):
+        """عبارت SQL قیمت تمام شده یک عدد فرش (معادل Carpet.total_cost)"""
+        base_price = case(
+            (Carpet.is_consignment == True, func.coalesce(Carpet.owner_declared_price, 0)),
+            else_=Carpet.purchase_price
+        )
+        return base_price + func.coalesce(operations_cost.c.operations_cost, 0)
+    
+    @staticmethod
+    def _received_at_expression():
+        """زمان ورود فرش به انبار: تاریخ امانت برای فرش‌های امانتی و تاریخ خرید برای بقیه"""
+        return case(
+            (Carpet.is_consignment == True, func.coalesce(Carpet.consignment_date, Carpet.purchase_date)),
+            else_=Carpet.purchase_date
+        )
+    
+    def get_timeseries(
+        self,
+        metric: str,
+        bucket: str = "day",
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Dict:
+        """سری زمانی یک شاخص با بازه‌های روزانه/هفتگی/ماهانه (بازه‌های خالی با صفر پر می‌شوند)"""
+        if metric not in TIMESERIES_METRICS:
+            raise ValueError(f"شاخص نامعتبر: {metric}")
+        if bucket not in TIMESERIES_BUCKETS:
+            raise ValueError(f"بازه نامعتبر: {bucket}")
+        
+        # ستون‌های دیتابیس UTC بدون tzinfo هستند؛ ورودی‌هایی مثل 2024-01-01T00:00:00Z یک بار تبدیل می‌شوند
+        end_date = self._to_naive_utc(end_date) if end_date else datetime.utcnow()
+        start_date = self._to_naive_utc(start_date) if start_date else end_date - timedelta(days=30)
+        if start_date > end_date:
+            raise ValueError("تاریخ شروع باید قبل از تاریخ پایان باشد")
+        
+        # یک کوئری گروه‌بندی شده با date_trunc برای کل بازه
+        if metric in ("checks_in", "checks_out"):
+            period = func.date_trunc(bucket, Check.check_date).label("period")
+            check_type = CheckType.INCOMING if metric == "checks_in" else CheckType.OUTGOING
+            query = self.db.query(period, func.sum(Check.amount)).filter(
+                Check.check_type == check_type,
+                Check.check_date >= start_date,
+                Check.check_date <= end_date
+            )
+        elif metric == "revenue":
+            period = func.date_trunc(bucket, Invoice.invoice_date).label("period")
+            query = self.db.query(period, func.sum(Invoice.total_amount)).filter(
+                Invoice.invoice_date >= start_date,
+                Invoice.invoice_date <= end_date
+            )
+        else:
+            period = func.date_trunc(bucket, Invoice.invoice_date).label("period")
+            if metric == "units":
+                value = func.sum(InvoiceItem.quantity)
+                query = self.db.query(period, value).select_from(InvoiceItem).join(Invoice)
+            else:
+                operations_cost = self._operations_cost_subquery()
+                unit_cost = self._unit_cost_expression(operations_cost)
+                value = func.sum(InvoiceItem.total_price - unit_cost * InvoiceItem.quantity)
+                query = self.db.query(period, value).select_from(InvoiceItem).join(Invoice).join(
+                    Carpet, Carpet.id == InvoiceItem.carpet_id
+                ).outerjoin(operations_cost, operations_cost.c.carpet_id == Carpet.id)
+            query = query.filter(
+                Invoice.invoice_date >= start_date,
+                Invoice.invoice_date <= end_date
+            )
+        
+        totals = {
+            row_period.replace(tzinfo=None): float(row_value or 0)
+            for row_period, row_value in query.group_by(period).all()
+        }
+        
+        # پر کردن بازه‌های بدون داده با صفر
+        step = TIMESERIES_BUCKETS[bucket]
+        current = self._truncate(start_date, bucket)
+        points = []
+        while current <= end_date:
+            points.append({"period": current, "value": totals.get(current, 0.0)})
+            current = current + step
+        
+        return {
+            "metric": metric,
+            "bucket": bucket,
+            "start_date": start_date,
+            "end_date": end_date,
+            "points": points
+        }
+    
+    @staticmethod
+    def _to_naive_utc(value: datetime) -> datetime:
+        """تبدیل زمان دارای tzinfo به UTC بدون tzinfo (مقادیر بدون tzinfo UTC فرض می‌شوند)"""
+        if value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    @staticmethod
+    def _truncate(value: datetime, bucket: str) -> datetime:
+        """معادل پایتونی date_trunc برای شروع سری"""
+        value = value.replace(hour=0, minute=0, second=0, microsecond=0)
+        if bucket == "week":
+            return value - timedelta(days=value.weekday())
+        if bucket == "month":
+            return value.replace(day=1)
+        return value
+    
+    def _jalali_today(self) -> CalendarDay:
+        """ردیف تقویم امروز (به وقت تهران)"""
+        today = self.db.query(CalendarDay).filter(CalendarDay.date == tehran_today()).first()
+        if not today:
+            raise LookupError("جدول تقویم برای تاریخ امروز پر نشده است")
+        return today
+    
+    def get_jalali_period_bounds(self, period: str) -> Dict:
+        """مرزهای UTC یک بازه شمسی (ماه/فصل/سال جاری یا قبلی) از روی جدول تقویم"""
+        if period not in JALALI_PERIODS:
+            raise ValueError(f"بازه نامعتبر: {period}")
+        
+        today = self._jalali_today()
+        year, month, quarter = today.jalali_year, today.jalali_month, today.fiscal_quarter
+        
+        if period == "last_month":
+            year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+        elif period == "last_quarter":
+            year, quarter = (year - 1, 4) if quarter == 1 else (year, quarter - 1)
+        elif period == "last_year":
+            year -= 1
         
-        # ارزش کل موجودی (قیمت تمام شده)
-        carpets = self.db.query(Carpet).filter(Carpet.quantity > 0).all()
-        total_inventory_value = sum(carpet.total_cost * carpet.quantity for carpet in carpets)
+        filters = [CalendarDay.jalali_year == year]
+        if period.endswith("month"):
+            filters.append(CalendarDay.jalali_month == month)
+        elif period.endswith("quarter"):
+            filters.append(CalendarDay.fiscal_quarter == quarter)
         
-        # گروه‌بندی بر اساس اندازه
-        by_size = self.db.query(
+        start_date, end_date = self.db.query(
+            func.min(CalendarDay.day_start_utc),
+            func.max(CalendarDay.day_end_utc)
+        ).filter(*filters).one()
+        if start_date is None:
+            raise LookupError("جدول تقویم برای این بازه پر نشده است")
+        
+        return {
+            "period": period,
+            "jalali_year": year,
+            "jalali_month": month if period.endswith("month") else None,
+            "fiscal_quarter": quarter if period.endswith("quarter") else None,
+            "start_date": start_date,
+            "end_date": end_date
+        }
+    
+    def get_jalali_period_report(self, period: str) -> Dict:
+        """گزارش مالی یک بازه شمسی"""
+        bounds = self.get_jalali_period_bounds(period)
+        report = self.get_financial_report(
+            bounds["start_date"],
+            bounds["end_date"] - timedelta(microseconds=1)
+        )
+        return {**bounds, **report}
+    
+    def get_jalali_monthly_report(self, jalali_year: int) -> List[Dict]:
+        """فروش ماه به ماه یک سال شمسی با join روی جدول تقویم"""
+        rows = self.db.query(
+            CalendarDay.jalali_month,
+            func.coalesce(func.sum(Invoice.total_amount), 0),
+            func.count(Invoice.id)
+        ).select_from(CalendarDay).join(
+            Invoice,
+            and_(
+                Invoice.invoice_date >= CalendarDay.day_start_utc,
+                Invoice.invoice_date < CalendarDay.day_end_utc
+            )
+        ).filter(
+            CalendarDay.jalali_year == jalali_year
+        ).group_by(CalendarDay.jalali_month).all()
+        
+        totals = {month: (float(revenue), int(count)) for month, revenue, count in rows}
+        return [
+            {
+                "jalali_year": jalali_year,
+                "jalali_month": month,
+                "total_revenue": totals.get(month, (0.0, 0))[0],
+                "total_invoices": totals.get(month, (0.0, 0))[1]
+            }
+            for month in range(1, 13)
+        ]
+    
+    def get_profitability_report(
+        self,
+        dimension: str = "brand",
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        sort_by: str = "profit",
+        limit: int = 50,
+        include_percentiles: bool = False
+    ) -> List[Dict]:
+        """سودآوری، نرخ فروش و میانگین روز تا فروش به تفکیک برند/جنس/اندازه/فروشنده"""
+        if dimension not in PROFITABILITY_DIMENSIONS:
+            raise ValueError(f"بُعد نامعتبر: {dimension}")
+        if sort_by not in PROFITABILITY_SORT_KEYS:
+            raise ValueError(f"مرتب‌سازی نامعتبر: {sort_by}")
+        
+        group_column = PROFITABILITY_DIMENSIONS[dimension]
+        operations_cost = self._operations_cost_subquery()
+        unit_cost = self._unit_cost_expression(operations_cost)
+        days_to_sell = func.extract("epoch", Invoice.invoice_date - self._received_at_expression()) / 86400
+        
+        # فروش دوره به تفکیک گروه
+        sales_query = self.db.query(
+            group_column.label("key"),
+            func.sum(InvoiceItem.quantity).label("units_sold"),
+            func.sum(InvoiceItem.total_price).label("revenue"),
+            func.sum(unit_cost * InvoiceItem.quantity).label("cost"),
+            func.sum(days_to_sell * InvoiceItem.quantity).label("days_weighted")
+        ).select_from(InvoiceItem).join(Invoice).join(
+            Carpet, Carpet.id == InvoiceItem.carpet_id
+        ).outerjoin(operations_cost, operations_cost.c.carpet_id == Carpet.id)
+        sales_query = self._filter_invoice_period(sales_query, start_date, end_date)
+        sales = sales_query.group_by(group_column).all()
+        
+        # موجودی فعلی هر گروه برای نرخ فروش
+        stock = dict(self.db.query(
+            group_column,
+            func.sum(Carpet.quantity)
+        ).filter(
+            Carpet.quantity > 0,
+            Carpet.is_deleted == False
+        ).group_by(group_column).all())
+        
+        results = []
+        for key, units_sold, revenue, cost, days_weighted in sales:
+            units_sold = int(units_sold or 0)
+            revenue = float(revenue or 0)
+            cost = float(cost or 0)
+            in_stock = int(stock.get(key) or 0)
+            results.append({
+                "key": key,
+                "units_sold": units_sold,
+                "in_stock": in_stock,
+                "revenue": revenue,
+                "cost": cost,
+                "profit": revenue - cost,
+                "margin": (revenue - cost) / revenue if revenue else 0.0,
+                "sell_through_rate": units_sold / (units_sold + in_stock) if units_sold + in_stock else 0.0,
+                "avg_days_to_sell": float(days_weighted or 0) / units_sold if units_sold else None
+            })
+        
+        results.sort(key=lambda row: row[sort_by] if row[sort_by] is not None else float("-inf"), reverse=True)
+        results = results[:limit]
+        
+        if include_percentiles:
+            self._add_profitability_percentiles(results, group_column, unit_cost, operations_cost, days_to_sell, start_date, end_date)
+        
+        return results
+    
+    def _filter_invoice_period(self, query, start_date: Optional[datetime], end_date: Optional[datetime]):
+        if start_date:
+            query = query.filter(Invoice.invoice_date >= start_date)
+        if end_date:
+            query = query.filter(Invoice.invoice_date <= end_date)
+        return query
+    
+    def _add_profitability_percentiles(
+        self, results: List[Dict], group_column, unit_cost, operations_cost, days_to_sell,
+        start_date: Optional[datetime], end_date: Optional[datetime]
+    ) -> None:
+        """صدک‌های حاشیه سود و روز تا فروش هر گروه (محاسبه برداری با NumPy)"""
+        np = optional_module("numpy")
+        if np is None or not results:
+            return
+        
+        keys = [row["key"] for row in results]
+        item_margin = case(
+            (InvoiceItem.total_price > 0,
+             (InvoiceItem.total_price - unit_cost * InvoiceItem.quantity) / InvoiceItem.total_price),
+            else_=0
+        )
+        query = self.db.query(group_column, item_margin, days_to_sell).select_from(InvoiceItem).join(Invoice).join(
+            Carpet, Carpet.id == InvoiceItem.carpet_id
+        ).outerjoin(operations_cost, operations_cost.c.carpet_id == Carpet.id).filter(group_column.in_(keys))
+        rows = self._filter_invoice_period(query, start_date, end_date).all()
+        if not rows:
+            return
+        
+        row_keys = [row[0] for row in rows]
+        margins = np.array([float(row[1] or 0) for row in rows])
+        days = np.array([float(row[2]) if row[2] is not None else np.nan for row in rows])
+        
+        # مرتب‌سازی یک‌باره بر اساس گروه و برش هر گروه
+        unique_keys, inverse = np.unique(np.array([str(k) for k in row_keys]), return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        boundaries = np.searchsorted(inverse[order], np.arange(len(unique_keys) + 1))
+        quantiles = [50, 90]
+        
+        percentiles = {}
+        for index, key in enumerate(unique_keys):
+            selection = order[boundaries[index]:boundaries[index + 1]]
+            margin_p = np.percentile(margins[selection], quantiles)
+            days_p = np.nanpercentile(days[selection], quantiles) if np.any(~np.isnan(days[selection])) else [None, None]
+            percentiles[key] = {
+                "margin_p50": float(margin_p[0]),
+                "margin_p90": float(margin_p[1]),
+                "days_to_sell_p50": float(days_p[0]) if days_p[0] is not None else None,
+                "days_to_sell_p90": float(days_p[1]) if days_p[1] is not None else None,
+            }
+        
+        for row in results:
+            row["percentiles"] = percentiles.get(str(row["key"]))
+    
+    def get_inventory_aging_report(self) -> Dict:
+        """هیستوگرام مدت ماندن فرش‌ها در انبار (تعداد و سرمایه) به تفکیک اندازه، برند و امانتی بودن"""
+        return aging_cache.get_or_set("inventory_aging", self._compute_inventory_aging)
+    
+    def _compute_inventory_aging(self) -> Dict:
+        operations_cost = self._operations_cost_subquery()
+        unit_cost = self._unit_cost_expression(operations_cost)
+        
+        received_at = self._received_at_expression()
+        # ستون‌ها UTC بدون tzinfo هستند؛ now() در PostgreSQL timestamptz است و نتیجه
+        # تفریق به منطقه زمانی session بستگی پیدا می‌کند
+        now = bindparam("now", datetime.utcnow(), type_=DateTime)
+        age_days = func.extract("epoch", now - received_at) / 86400
+        bucket = case(
+            (age_days <= 30, AGING_BUCKETS[0]),
+            (age_days <= 90, AGING_BUCKETS[1]),
+            (age_days <= 180, AGING_BUCKETS[2]),
+            else_=AGING_BUCKETS[3]
+        ).label("bucket")
+        
+        rows = self.db.query(
+            bucket,
             Carpet.size,
-            func.sum(Carpet.quantity).label('count')
-        ).filter(Carpet.quantity > 0).group_by(Carpet.size).all()
+            Carpet.brand,
+            Carpet.is_consignment,
+            func.sum(Carpet.quantity).label("count"),
+            func.sum(unit_cost * Carpet.quantity).label("value")
+        ).outerjoin(
+            operations_cost, operations_cost.c.carpet_id == Carpet.id
+        ).filter(
+            Carpet.quantity > 0,
+            Carpet.is_deleted == False
+        ).group_by(
+            bucket, Carpet.size, Carpet.brand, Carpet.is_consignment
+        ).all()
         
-        # گروه‌بندی بر اساس جنس
-        by_material = self.db.query(
-            Carpet.material,
-            func.sum(Carpet.quantity).label('count')
-        ).filter(Carpet.quantity > 0).group_by(Carpet.material).all()
+        def empty_histogram():
+            return {name: {"count": 0, "value": 0.0} for name in AGING_BUCKETS}
         
-        # فرش‌های امانتی
-        consignment_count = self.db.query(func.sum(Carpet.quantity)).filter(
-            Carpet.is_consignment == True,
-            Carpet.quantity > 0
-        ).scalar() or 0
+        totals = empty_histogram()
+        by_size: Dict = {}
+        by_brand: Dict = {}
+        by_consignment: Dict = {}
+        
+        for bucket_name, size, brand, is_consignment, count, value in rows:
+            count = int(count or 0)
+            value = float(value or 0)
+            consignment_key = "consignment" if is_consignment else "owned"
+            for histogram in (
+                totals,
+                by_size.setdefault(size, empty_histogram()),
+                by_brand.setdefault(brand, empty_histogram()),
+                by_consignment.setdefault(consignment_key, empty_histogram()),
+            ):
+                histogram[bucket_name]["count"] += count
+                histogram[bucket_name]["value"] += value
         
         return {
-            "total_carpets": int(total_carpets),
-            "total_inventory_value": float(total_inventory_value),
-            "by_size": [{"size": size, "count": int(count)} for size, count in by_size],
-            "by_material": [{"material": material, "count": int(count)} for material, count in by_material],
-            "consignment_count": int(consignment_count),
-            "owned_count": int(total_carpets - consignment_count)
-        }
\ No newline at end of file
+            "buckets": list(AGING_BUCKETS),
+            "total": totals,
+            "by_size": [{"size": size, "histogram": histogram} for size, histogram in by_size.items()],
+            "by_brand": [{"brand": brand, "histogram": histogram} for brand, histogram in by_brand.items()],
+            "by_consignment": by_consignment,
+            "generated_at": datetime.utcnow()
+        }
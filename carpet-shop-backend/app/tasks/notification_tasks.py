@@ -1,13 +1,15 @@
 from celery import Celery
 from app.config import settings
 from app.database import SessionLocal
-from app.services.check_service import CheckService
+from app.services.notification_service import NotificationService
+from app.utils.tracing import connect_celery_signals
 
 # ایجاد Celery app
 celery_app = Celery(
     'carpet_shop',
     broker=settings.redis_url,
-    backend=settings.redis_url
+    backend=settings.redis_url,
+    include=['app.tasks.report_tasks']
 )
 
 celery_app.conf.update(
@@ -16,54 +18,28 @@ celery_app.conf.update(
     result_serializer='json',
     timezone='Asia/Tehran',
     enable_utc=True,
+    result_expires=settings.report_job_result_ttl,
+    task_track_started=True,
 )
 
+# انتقال trace درخواست به taskها
+connect_celery_signals()
+
 @celery_app.task
 def check_upcoming_checks():
     """بررسی چک‌های نزدیک به سررسید و ارسال نوتیفیکیشن"""
     db = SessionLocal()
     try:
-        check_service = CheckService(db)
-        checks = check_service.get_checks_needing_notification()
-        
-        notifications = []
-        for check in checks:
-            # اینجا می‌توانید نوتیفیکیشن را به روش‌های مختلف ارسال کنید:
-            # - ایمیل
-            # - SMS
-            # - Webhook
-            # - Push Notification
-            
-            notification_message = (
-                f"یادآوری: چک شماره {check.check_number} "
-                f"به مبلغ {check.amount:,} ریال "
-                f"در تاریخ {check.check_date.strftime('%Y-%m-%d')} سررسید دارد."
-            )
-            
-            notifications.append({
-                'check_id': check.id,
-                'check_number': check.check_number,
-                'amount': check.amount,
-                'check_date': check.check_date.isoformat(),
-                'message': notification_message
-            })
-            
-            # علامت‌گذاری به عنوان ارسال شده
-            check_service.mark_notification_sent(check.id)
-        
-        return {
-            'success': True,
-            'notifications_sent': len(notifications),
-            'notifications': notifications
-        }
+        # کانال‌ها (فایل، ایمیل، وب‌هوک، ...) از تنظیمات notification_channels خوانده می‌شوند
+        return NotificationService(db).process_all_due_checks()
     
     finally:
         db.close()
 
 # تنظیم Schedule برای اجرای خودکار
 celery_app.conf.beat_schedule = {
-    'check-upcoming-checks-daily': {
+    'check-upcoming-checks': {
         'task': 'app.tasks.notification_tasks.check_upcoming_checks',
-        'schedule': 86400.0,  # هر 24 ساعت
+        'schedule': settings.reminder_scan_interval,  # هر چند دقیقه؛ remind_at عقب‌افتاده‌ها را هم می‌گیرد
     },
 }
\ No newline at end of file
@@ -0,0 +1,122 @@
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import redis
+from dateutil.relativedelta import relativedelta
+from fastapi.encoders import jsonable_encoder
+from app.config import settings
+from app.database import SessionLocal
+from app.services.report_service import ReportService
+from app.tasks.notification_tasks import celery_app
+
+REPORT_JOB_TYPES = ("financial", "inventory", "timeseries", "jalali_monthly")
+
+# جای‌های رزرو شده هر نوع گزارش: sorted set از job_id با امتیاز مهلت اجرا
+RUNNING_KEY = "report_jobs:running:{report_type}"
+
+# حذف جای‌های منقضی، شمارش و رزرو به صورت اتمیک
+_ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return 1
+"""
+
+logger = logging.getLogger(__name__)
+
+_redis_client: Optional[redis.Redis] = None
+
+def get_redis() -> redis.Redis:
+    """اتصال اشتراکی Redis برای شمارنده‌های همزمانی"""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.redis_url)
+    return _redis_client
+
+def acquire_slot(report_type: str, job_id: str) -> bool:
+    """رزرو یک جای خالی برای اجرای گزارش (با سقف همزمانی هر نوع)
+    
+    هر job مهلت جداگانه دارد؛ اگر worker از کار بیفتد فقط جای همان job بعد از
+    report_job_result_ttl ثانیه آزاد می‌شود و سقف بقیه کارها دست نمی‌خورد.
+    """
+    now = time.time()
+    ttl = settings.report_job_result_ttl
+    return bool(get_redis().eval(
+        _ACQUIRE_SCRIPT, 1, RUNNING_KEY.format(report_type=report_type),
+        now, settings.report_job_max_concurrency, now + ttl, job_id, ttl
+    ))
+
+def release_slot(report_type: str, job_id: str) -> None:
+    """آزاد کردن جای رزرو شده"""
+    get_redis().zrem(RUNNING_KEY.format(report_type=report_type), job_id)
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+def _yearly_chunks(start_date: datetime, end_date: datetime) -> List[Tuple[datetime, datetime]]:
+    """تقسیم بازه طولانی به تکه‌های یکساله برای گزارش پیشرفت"""
+    chunks = []
+    current = start_date
+    while current <= end_date:
+        chunk_end = min(current + relativedelta(years=1), end_date)
+        chunks.append((current, chunk_end))
+        if chunk_end >= end_date:
+            break
+        current = chunk_end
+    return chunks
+
+def _financial_report(task, service: ReportService, params: Dict) -> Dict:
+    """گزارش مالی؛ بازه‌های چندساله تکه‌تکه محاسبه و جمع می‌شوند"""
+    start_date = _parse_date(params.get("start_date"))
+    end_date = _parse_date(params.get("end_date"))
+    if not start_date or not end_date:
+        return service.get_financial_report(start_date, end_date)
+    
+    chunks = _yearly_chunks(start_date, end_date)
+    totals: Dict = {}
+    for index, (chunk_start, chunk_end) in enumerate(chunks):
+        # مرز انتهای هر تکه فقط در تکه آخر شامل می‌شود
+        chunk_end_inclusive = chunk_end if index == len(chunks) - 1 else chunk_end - relativedelta(microseconds=1)
+        report = service.get_financial_report(chunk_start, chunk_end_inclusive)
+        for key, value in report.items():
+            totals[key] = totals.get(key, 0) + value
+        task.update_state(state="PROGRESS", meta={"progress": (index + 1) / len(chunks)})
+    return totals
+
+@celery_app.task(bind=True)
+def run_report_job(self, report_type: str, params: Dict):
+    """اجرای گزارش سنگین در پس‌زمینه"""
+    db = SessionLocal()
+    try:
+        service = ReportService(db)
+        self.update_state(state="PROGRESS", meta={"progress": 0.0})
+        
+        if report_type == "financial":
+            result = _financial_report(self, service, params)
+        elif report_type == "inventory":
+            result = service.get_inventory_report()
+        elif report_type == "timeseries":
+            result = service.get_timeseries(
+                params.get("metric", "revenue"),
+                params.get("bucket", "day"),
+                _parse_date(params.get("start_date")),
+                _parse_date(params.get("end_date"))
+            )
+        elif report_type == "jalali_monthly":
+            result = service.get_jalali_monthly_report(int(params["jalali_year"]))
+        else:
+            raise ValueError(f"نوع گزارش نامعتبر: {report_type}")
+        
+        return jsonable_encoder(result)
+    
+    finally:
+        db.close()
+        try:
+            release_slot(report_type, self.request.id)
+        except redis.RedisError:
+            # جای رزرو شده با رسیدن مهلتش خودبه‌خود آزاد می‌شود
+            logger.warning("Could not release report slot for job %s", self.request.id, exc_info=True)
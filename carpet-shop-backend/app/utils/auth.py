@@ -1,37 +1,91 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Dict, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+import asyncio
+import logging
+import threading
+import time
+import uuid
+import redis
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User, UserRole
 from app.schemas.user import TokenData
 from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.revocation import revocation_list, REVOCATION_CHANNEL
 
-# Password hashing با تنظیمات بهینه شده
+logger = logging.getLogger(__name__)
+
+# Password hashing؛ هش‌هایی با الگوریتم یا هزینه متفاوت در ورود بعدی به‌روز می‌شوند
+_hash_scheme = settings.password_hash_scheme
 pwd_context = CryptContext(
-    schemes=["bcrypt"],
+    schemes=list(dict.fromkeys([_hash_scheme, "bcrypt"])),
+    default=_hash_scheme,
     deprecated="auto",
-    bcrypt__rounds=12
+    **{
+        f"{_hash_scheme}__rounds": settings.password_hash_rounds,
+        f"{_hash_scheme}__min_rounds": settings.password_hash_rounds,
+        f"{_hash_scheme}__max_rounds": settings.password_hash_rounds,
+    }
+)
+
+# هش کردن در یک executor جدا تا threadpool درخواست‌ها اشغال نشود
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="password-hash"
 )
+_hash_slots = threading.BoundedSemaphore(settings.password_hash_workers + settings.password_hash_max_queue)
+
+def _submit_hash_job(func: Callable, *args) -> Future:
+    """ارسال کار هش به executor با محدودیت طول صف"""
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="سرور مشغول است، لطفاً دوباره تلاش کنید",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        future = _hash_executor.submit(func, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return future
 
 # OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+# برای endpointهایی که فقط بعضی گزینه‌هایشان نیاز به ورود دارد
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
 # JWT settings
 SECRET_KEY = settings.secret_key
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 ساعت
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
+REFRESH_TOKEN_EXPIRE_DAYS = settings.refresh_token_expire_days
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """بررسی صحت پسورد"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return _submit_hash_job(pwd_context.verify, plain_password, hashed_password).result()
 
 def get_password_hash(password: str) -> str:
     """هش کردن پسورد"""
-    return pwd_context.hash(password)
+    return _submit_hash_job(pwd_context.hash, password).result()
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """بررسی پسورد بدون بلاک کردن؛ اگر هش قدیمی باشد هش جدید هم برمی‌گردد"""
+    return await asyncio.wrap_future(
+        _submit_hash_job(pwd_context.verify_and_update, plain_password, hashed_password)
+    )
+
+async def get_password_hash_async(password: str) -> str:
+    """هش کردن پسورد بدون بلاک کردن"""
+    return await asyncio.wrap_future(_submit_hash_job(pwd_context.hash, password))
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """ایجاد JWT token"""
@@ -42,14 +96,28 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", uuid.uuid4().hex)
+    to_encode.setdefault("type", "access")
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """دریافت کاربر فعلی از token"""
+def create_token_pair(user: User) -> Dict:
+    """توکن دسترسی کوتاه‌مدت (با نقش) و توکن تمدید"""
+    claims = {"sub": user.username, "uid": user.id, "role": user.role.value, "ver": user.token_version}
+    access_token = create_access_token(claims, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    refresh_token = create_access_token(
+        {**claims, "type": "refresh"},
+        timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+def decode_token(token: str, expected_type: str = "access") -> TokenData:
+    """اعتبارسنجی امضا، نوع و ابطال توکن بدون مراجعه به جدول users"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="احراز هویت نامعتبر",
@@ -58,16 +126,134 @@ def get_current_user(
     
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == token_data.username).first()
-    if user is None:
+    username = payload.get("sub")
+    if username is None or payload.get("type", "access") != expected_type:
+        raise credentials_exception
+    
+    _ensure_invalidation_listener()
+    revocation_list.ensure_loaded()
+    token_data = TokenData(
+        username=username,
+        role=payload.get("role"),
+        user_id=payload.get("uid"),
+        token_version=payload.get("ver", 0),
+        jti=payload.get("jti"),
+        expires_at=payload.get("exp")
+    )
+    if revocation_list.is_version_revoked(username, token_data.token_version):
         raise credentials_exception
+    if revocation_list.is_token_revoked(token_data.jti):
+        raise credentials_exception
+    
+    return token_data
+
+def revoke_token(token_data: TokenData) -> bool:
+    """ابطال یک توکن (مثلاً هنگام خروج یا تمدید)؛ اگر قبلاً باطل شده بود False"""
+    if not token_data.jti:
+        return True
+    return revocation_list.revoke_token(token_data.jti, token_data.expires_at or time.time())
+
+# کش کاربر فعال بر اساس username (sub توکن)؛ باطل‌سازی بین workerها با Redis pub/sub
+_principal_cache = TTLCache(ttl=settings.auth_cache_ttl, max_entries=1024)
+INVALIDATION_CHANNEL = "auth:user-invalidated"
+_listener_started = False
+_listener_lock = threading.Lock()
+_redis_client: Optional[redis.Redis] = None
+
+def _get_redis() -> redis.Redis:
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.redis_url)
+    return _redis_client
+
+def _listen_for_invalidations() -> None:
+    """دریافت پیام‌های باطل‌سازی و ابطال توکن از سایر workerها"""
+    while True:
+        try:
+            pubsub = _get_redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL, REVOCATION_CHANNEL)
+            # پیام‌های قبل از subscribe با بارگذاری کامل جبران می‌شوند
+            revocation_list.load()
+            for message in pubsub.listen():
+                data = message["data"].decode()
+                if message["channel"].decode() == REVOCATION_CHANNEL:
+                    revocation_list.handle_message(data)
+                else:
+                    _principal_cache.invalidate(data)
+        except redis.RedisError:
+            # ممکن است پیامی از دست رفته باشد؛ کل کش پاک می‌شود
+            _principal_cache.invalidate()
+            time.sleep(5)
+
+def _ensure_invalidation_listener() -> None:
+    global _listener_started
+    if _listener_started:
+        return
+    with _listener_lock:
+        if not _listener_started:
+            threading.Thread(
+                target=_listen_for_invalidations,
+                name="auth-cache-invalidation",
+                daemon=True
+            ).start()
+            _listener_started = True
+
+def invalidate_user_cache(username: str) -> None:
+    """حذف کاربر از کش این worker و اطلاع به بقیه"""
+    _principal_cache.invalidate(username)
+    try:
+        _get_redis().publish(INVALIDATION_CHANNEL, username)
+    except redis.RedisError:
+        pass
+
+def bump_token_version(user: User) -> None:
+    """باطل کردن توکن‌های قبلی کاربر (قبل از commit باید revoke_user_tokens صدا زده شود)"""
+    user.token_version = (user.token_version or 0) + 1
+
+def revoke_user_tokens(user: User) -> None:
+    """ابطال فوری توکن‌های نسخه قبلی کاربر در همه workerها
+    
+    قبل از commit صدا زده شود؛ خطای Redis بالا می‌رود تا عملیات ادمین شکست بخورد
+    و توکن‌های قبلی بی‌صدا معتبر نمانند.
+    """
+    try:
+        revocation_list.revoke_user_versions(user.username, user.token_version)
+    except redis.RedisError:
+        logger.exception("Could not revoke tokens of user %s", user.username)
+        raise
+
+def _detached_principal(user: User) -> User:
+    """کپی مستقل از session برای نگه‌داری در کش"""
+    return User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+
+def _load_principal(db: Session, username: str) -> Optional[User]:
+    _ensure_invalidation_listener()
+    principal = _principal_cache.get(username)
+    if principal is None:
+        user = db.query(User).filter(User.username == username).first()
+        if user is None:
+            return None
+        principal = _detached_principal(user)
+        _principal_cache.set(username, principal)
+    return principal
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    """دریافت کاربر فعلی از token (برای endpointهایی که به رکورد کامل کاربر نیاز دارند)"""
+    token_data = decode_token(token)
+    
+    user = _load_principal(db, token_data.username)
+    if user is None or token_data.token_version != user.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="احراز هویت نامعتبر",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
     if not user.is_active:
         raise HTTPException(
@@ -77,6 +263,10 @@ def get_current_user(
     
     return user
 
+def get_token_principal(token: str = Depends(oauth2_scheme)) -> TokenData:
+    """کاربر فعلی فقط از روی توکن (بدون کوئری دیتابیس)"""
+    return decode_token(token)
+
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """دریافت کاربر فعال"""
     if not current_user.is_active:
@@ -86,8 +276,8 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
         )
     return current_user
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
-    """نیاز به دسترسی ادمین"""
+def require_admin(current_user: TokenData = Depends(get_token_principal)) -> TokenData:
+    """نیاز به دسترسی ادمین (از روی نقش داخل توکن)"""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -102,4 +292,22 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
         return None
     if not verify_password(password, user.hashed_password):
         return None
+    return user
+
+async def authenticate_user_async(db: Session, username: str, password: str) -> Optional[User]:
+    """احراز هویت کاربر بدون اشغال threadpool در زمان هش
+
+    اگر الگوریتم یا هزینه هش تغییر کرده باشد، هش جدید روی کاربر گذاشته می‌شود
+    و با commit بعدی ذخیره می‌شود.
+    """
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.username == username).first()
+    )
+    if not user:
+        return None
+    valid, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+    if not valid:
+        return None
+    if new_hash:
+        user.hashed_password = new_hash
     return user
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+کش ساده در حافظه با زمان انقضا (برای گزارش‌هایی که چند ثانیه کهنه بودنشان مشکلی ندارد)
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+class TTLCache:
+    def __init__(self, ttl: float, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """دریافت مقدار اگر منقضی نشده باشد"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            if len(self._data) >= self.max_entries:
+                # حذف قدیمی‌ترین ورودی
+                oldest = min(self._data, key=lambda k: self._data[k][0])
+                del self._data[oldest]
+            self._data[key] = (time.monotonic() + self.ttl, value)
+    
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """مقدار کش شده یا محاسبه و ذخیره آن"""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value)
+        return value
+    
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """پاک کردن یک کلید یا کل کش"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
@@ -0,0 +1,136 @@
+"""
+آمار تاخیر، تعداد و حجم درخواست‌ها به تفکیک مسیر (قالب مسیر، نه آدرس واقعی)
+
+خروجی با فرمت متنی Prometheus در /metrics. برای جمع آمار چند worker
+uvicorn، متغیر محیطی PROMETHEUS_MULTIPROC_DIR را روی یک پوشه خالی مشترک
+تنظیم کنید تا هر worker آمارش را در فایل بنویسد و /metrics همه را جمع کند.
+"""
+import os
+import time
+from typing import Dict, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram,
+    REGISTRY, generate_latest, multiprocess
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests", ("method", "route", "status")
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route"),
+    buckets=LATENCY_BUCKETS
+)
+REQUEST_SIZE = Histogram(
+    "http_request_size_bytes", "HTTP request body size", ("method", "route"),
+    buckets=SIZE_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "HTTP response body size", ("method", "route"),
+    buckets=SIZE_BUCKETS
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests in flight", ("method",),
+    multiprocess_mode="livesum"
+)
+
+# سری‌های هر (method, route) یک بار ساخته و نگه داشته می‌شوند
+_series: Dict[Tuple[str, str], Tuple] = {}
+_counters: Dict[Tuple[str, str, int], Counter] = {}
+_in_progress: Dict[str, Gauge] = {}
+
+
+def _route_series(method: str, route: str) -> Tuple:
+    series = _series.get((method, route))
+    if series is None:
+        series = (
+            LATENCY.labels(method, route),
+            REQUEST_SIZE.labels(method, route),
+            RESPONSE_SIZE.labels(method, route),
+        )
+        _series[(method, route)] = series
+    return series
+
+
+def _request_counter(method: str, route: str, status: int) -> Counter:
+    counter = _counters.get((method, route, status))
+    if counter is None:
+        counter = REQUESTS.labels(method, route, str(status))
+        _counters[(method, route, status)] = counter
+    return counter
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    # مسیرهایی مثل {carpet_id:int} بدون convertor گزارش می‌شوند
+    return getattr(route, "path_format", None) or route.path
+
+
+class MetricsMiddleware:
+    """middleware خام ASGI (بدون BaseHTTPMiddleware) برای کمترین سربار"""
+    
+    def __init__(self, app, skip_paths: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = skip_paths
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        in_progress = _in_progress.get(method)
+        if in_progress is None:
+            in_progress = _in_progress[method] = IN_PROGRESS.labels(method)
+        
+        request_size = 0
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                request_size = int(value)
+                break
+        
+        status_code = 500
+        response_size = 0
+        
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+        
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            route = _route_template(scope)
+            latency, request_histogram, response_histogram = _route_series(method, route)
+            latency.observe(elapsed)
+            request_histogram.observe(request_size)
+            response_histogram.observe(response_size)
+            _request_counter(method, route, status_code).inc()
+
+
+def metrics_payload() -> Tuple[bytes, str]:
+    """متن Prometheus؛ در حالت چند worker از فایل‌های همه workerها جمع می‌شود"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead() -> None:
+    """حذف gaugeهای live این worker هنگام خاموش شدن"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,101 @@
+"""
+تبدیل تاریخ میلادی به شمسی و ساخت ردیف‌های جدول بُعد تقویم
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+TEHRAN_TZ = ZoneInfo("Asia/Tehran")
+
+def gregorian_to_jalali(gy: int, gm: int, gd: int) -> Tuple[int, int, int]:
+    """تبدیل تاریخ میلادی به (سال، ماه، روز) شمسی"""
+    g_d_m = [0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334]
+    gy2 = gy + 1 if gm > 2 else gy
+    days = (
+        355666 + (365 * gy) + ((gy2 + 3) // 4) - ((gy2 + 99) // 100)
+        + ((gy2 + 399) // 400) + gd + g_d_m[gm - 1]
+    )
+    jy = -1595 + (33 * (days // 12053))
+    days %= 12053
+    jy += 4 * (days // 1461)
+    days %= 1461
+    if days > 365:
+        jy += (days - 1) // 365
+        days = (days - 1) % 365
+    if days < 186:
+        jm = 1 + days // 31
+        jd = 1 + days % 31
+    else:
+        jm = 7 + (days - 186) // 30
+        jd = 1 + (days - 186) % 30
+    return jy, jm, jd
+
+def tehran_today() -> date:
+    """تاریخ امروز به وقت تهران"""
+    return datetime.now(TEHRAN_TZ).date()
+
+def tehran_day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """شروع و پایان روز محلی تهران به UTC (بدون tzinfo، مثل ستون‌های دیتابیس)"""
+    start = datetime.combine(day, time.min, tzinfo=TEHRAN_TZ)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=TEHRAN_TZ)
+    return (
+        start.astimezone(timezone.utc).replace(tzinfo=None),
+        end.astimezone(timezone.utc).replace(tzinfo=None),
+    )
+
+def build_calendar_rows(start: date, end: date) -> List[Dict]:
+    """ساخت ردیف‌های جدول calendar_days برای بازه [start, end]"""
+    rows = []
+    year_offset = {}
+    day = start
+    while day <= end:
+        jy, jm, jd = gregorian_to_jalali(day.year, day.month, day.day)
+        day_of_year = (jm - 1) * 31 + jd if jm <= 6 else 186 + (jm - 7) * 30 + jd
+        # روز هفته با شروع از شنبه (شنبه = 0)
+        weekday = (day.weekday() + 2) % 7
+        if jy not in year_offset:
+            # روز هفته اول فروردین برای محاسبه شماره هفته
+            year_offset[jy] = (weekday - (day_of_year - 1)) % 7
+        day_start, day_end = tehran_day_bounds(day)
+        rows.append({
+            "date": day,
+            "jalali_year": jy,
+            "jalali_month": jm,
+            "jalali_day": jd,
+            "jalali_week": (day_of_year - 1 + year_offset[jy]) // 7 + 1,
+            "weekday": weekday,
+            "fiscal_quarter": (jm - 1) // 3 + 1,
+            "day_start_utc": day_start,
+            "day_end_utc": day_end,
+        })
+        day += timedelta(days=1)
+    return rows
+
+def jalali_to_gregorian(jy: int, jm: int, jd: int) -> Tuple[int, int, int]:
+    """تبدیل تاریخ شمسی به (سال، ماه، روز) میلادی"""
+    jy += 1595
+    days = (
+        -355668 + (365 * jy) + ((jy // 33) * 8) + (((jy % 33) + 3) // 4) + jd
+        + ((jm - 1) * 31 if jm < 7 else ((jm - 7) * 30) + 186)
+    )
+    gy = 400 * (days // 146097)
+    days %= 146097
+    if days > 36524:
+        days -= 1
+        gy += 100 * (days // 36524)
+        days %= 36524
+        if days >= 365:
+            days += 1
+    gy += 4 * (days // 1461)
+    days %= 1461
+    if days > 365:
+        gy += (days - 1) // 365
+        days = (days - 1) % 365
+    gd = days + 1
+    is_leap = (gy % 4 == 0 and gy % 100 != 0) or gy % 400 == 0
+    month_days = [31, 29 if is_leap else 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    gm = 0
+    while gm < 12 and gd > month_days[gm]:
+        gd -= month_days[gm]
+        gm += 1
+    return gy, gm + 1, gd
@@ -0,0 +1,27 @@
+"""
+بارگذاری تنبل ماژول‌های اختیاری و سنگین (reportlab، numpy)
+
+ماژول فقط در اولین استفاده import می‌شود تا شروع worker و جمع‌آوری تست‌ها کند نشود.
+"""
+import importlib
+import importlib.util
+from functools import lru_cache
+from types import ModuleType
+from typing import Optional
+
+
+def module_available(name: str) -> bool:
+    """بررسی نصب بودن ماژول بدون import آن"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+@lru_cache(maxsize=None)
+def optional_module(name: str) -> Optional[ModuleType]:
+    """import ماژول در اولین درخواست؛ اگر نصب نباشد None"""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
@@ -0,0 +1,135 @@
+"""
+آمار pool اتصال دیتابیس
+
+زمان انتظار برای گرفتن اتصال با زیرکلاس QueuePool اندازه‌گیری می‌شود (رویدادی
+قبل از checkout وجود ندارد) و بقیه شمارنده‌ها با رویدادهای pool جمع می‌شوند.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+class PoolMetrics:
+    def __init__(self, name: str, sample_size: int = 1024):
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.max_in_use = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        # نمونه‌های اخیر برای محاسبه صدک‌ها
+        self._waits = deque(maxlen=sample_size)
+        self._lock = threading.Lock()
+    
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self._waits.append(seconds)
+    
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+    
+    def record_checkout(self, in_use: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.max_in_use = max(self.max_in_use, in_use)
+    
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+    
+    def record_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+    
+    def snapshot(self, pool) -> Dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            count = len(waits)
+            return {
+                "pool": self.name,
+                "size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_in_use": self.max_in_use,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_p50_ms": round(waits[count // 2] * 1000, 3) if count else 0.0,
+                "wait_p99_ms": round(waits[min(count - 1, int(count * 0.99))] * 1000, 3) if count else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+class _TimedCheckoutMixin:
+    metrics: Optional[PoolMetrics] = None
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout()
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+    
+    def recreate(self):
+        # pool بعد از dispose/invalidate دوباره ساخته می‌شود
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+_engines: Dict[str, Engine] = {}
+
+
+def instrument_engine(name: str, engine: Engine) -> PoolMetrics:
+    """ثبت رویدادهای pool یک engine (برای engine async، sync_engine آن)"""
+    metrics = PoolMetrics(name)
+    engine.pool.metrics = metrics
+    
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.record_checkout(engine.pool.checkedout())
+    
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.record_connect()
+    
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.record_invalidation()
+    
+    _engines[name] = engine
+    return metrics
+
+
+def pool_snapshot() -> List[Dict]:
+    """وضعیت فعلی همه poolهای ثبت شده"""
+    return [
+        engine.pool.metrics.snapshot(engine.pool)
+        for engine in _engines.values()
+        if getattr(engine.pool, "metrics", None) is not None
+    ]
@@ -0,0 +1,99 @@
+"""
+شمارش کوئری‌ها و زمان دیتابیس هر درخواست با رویدادهای SQLAlchemy
+
+رویدادها روی کلاس Engine ثبت می‌شوند و همه engineها (primary، replica و async)
+را پوشش می‌دهند. آمار فقط داخل profile_queries جمع می‌شود؛ کوئری‌های کندتر
+از slow_query_ms با logger این ماژول ثبت می‌شوند. پارامترها (که ممکن است هش رمز
+یا توکن باشند) فقط در سطح DEBUG لاگ می‌شوند.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    def __init__(self, record_statements: bool = False):
+        self.count = 0
+        self.total_time = 0.0
+        self.record_statements = record_statements
+        self.statements: List[Tuple[str, float]] = []
+    
+    def add(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if self.record_statements:
+            self.statements.append((statement, elapsed))
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def profile_queries(record_statements: bool = False) -> Iterator[QueryStats]:
+    """جمع آمار کوئری‌های اجرا شده در این context (شامل threadpool درخواست)"""
+    stats = QueryStats(record_statements)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.add(statement, elapsed)
+    if settings.slow_query_ms and elapsed * 1000 >= settings.slow_query_ms:
+        logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, statement)
+        logger.debug("Slow query parameters: %r", parameters)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # کوئری ناموفق after_cursor_execute ندارد
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+class QueryProfilerMiddleware:
+    """افزودن X-DB-Queries و Server-Timing به پاسخ‌ها (فقط در حالت debug فعال می‌شود)"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        with profile_queries() as stats:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    total_ms = (time.perf_counter() - started) * 1000
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-queries", str(stats.count).encode()))
+                    headers.append((
+                        b"server-timing",
+                        f'db;dur={stats.total_time * 1000:.1f};desc="{stats.count} queries", '
+                        f'app;dur={total_ms:.1f}'.encode()
+                    ))
+                    message["headers"] = headers
+                await send(message)
+            
+            await self.app(scope, receive, send_wrapper)
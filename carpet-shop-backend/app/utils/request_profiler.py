@@ -0,0 +1,185 @@
+"""
+پروفایل درخواست به درخواست برای ادمین‌ها (هدر X-Profile: 1 یا ?profile=1)
+
+endpointهای sync در threadpool اجرا می‌شوند و cProfile فقط thread خودش را می‌بیند؛
+برای همین یک sampler پشته همه threadها را در طول همان درخواست نمونه‌برداری
+می‌کند و فقط پشته‌هایی که از کد app عبور می‌کنند نگه داشته می‌شوند (در بار
+همزمان ممکن است درخواست‌های دیگر همین worker هم دیده شوند). خروجی با فرمت
+collapsed stacks (قابل استفاده در speedscope و flamegraph.pl) ذخیره می‌شود.
+درخواست‌های بدون پرچم فقط یک بررسی هدر را می‌پردازند.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class StackSampler:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+    
+    def start(self) -> None:
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    code = frame.f_code
+                    in_app = in_app or code.co_filename.startswith(APP_DIR)
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if in_app:
+                    self.stacks[";".join(reversed(stack))] += 1
+
+
+class ProfileStore:
+    """ذخیره پروفایل‌ها روی دیسک (مشترک بین workerها) با سقف تعداد و عمر"""
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+    
+    def _path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.json")
+    
+    def save(self, profile: Dict) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(profile["id"]), "w", encoding="utf-8") as f:
+            json.dump(profile, f, ensure_ascii=False)
+        self.prune()
+    
+    def prune(self) -> None:
+        files = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True
+        )
+        expire_before = time.time() - settings.profile_retention_hours * 3600
+        for index, entry in enumerate(files):
+            if index >= settings.profile_max_count or entry.stat().st_mtime < expire_before:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+    
+    def get(self, profile_id: str) -> Optional[Dict]:
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def list(self) -> List[Dict]:
+        if not os.path.isdir(self.directory):
+            return []
+        self.prune()
+        profiles = []
+        for entry in os.scandir(self.directory):
+            profile = self.get(entry.name[:-len(".json")]) if entry.name.endswith(".json") else None
+            if profile:
+                profile.pop("stacks", None)
+                profiles.append(profile)
+        return sorted(profiles, key=lambda p: p["created_at"], reverse=True)
+
+
+profile_store = ProfileStore(settings.profile_dir)
+
+
+def _profiling_requested(scope) -> bool:
+    if b"profile=1" in scope.get("query_string", b"").split(b"&"):
+        return True
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return value in (b"1", b"true")
+    return False
+
+
+def _admin_username(scope) -> Optional[str]:
+    """نام ادمین از توکن Bearer؛ برای غیر ادمین None"""
+    from app.models.user import UserRole
+    from app.utils.auth import decode_token
+    
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return None
+            try:
+                token_data = decode_token(token)
+            except Exception:
+                return None
+            return token_data.username if token_data.role == UserRole.ADMIN else None
+    return None
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profiling_requested(scope):
+            await self.app(scope, receive, send)
+            return
+        
+        username = await run_in_threadpool(_admin_username, scope)
+        if username is None:
+            await self.app(scope, receive, send)
+            return
+        
+        profile_id = uuid.uuid4().hex
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]
+            await send(message)
+        
+        sampler = StackSampler(settings.profile_sample_interval)
+        created_at = datetime.utcnow()
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            profile = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "query_string": scope.get("query_string", b"").decode("latin-1"),
+                "username": username,
+                "created_at": created_at.isoformat(),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                "interval_ms": settings.profile_sample_interval * 1000,
+                "samples": sampler.samples,
+                "stacks": dict(sampler.stacks.most_common()),
+            }
+            await run_in_threadpool(profile_store.save, profile)
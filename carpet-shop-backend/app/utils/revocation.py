@@ -0,0 +1,204 @@
+"""
+لیست ابطال توکن‌ها: مجموعه دقیق در Redis و bloom filter در حافظه هر worker
+
+بیشتر درخواست‌ها فقط با bloom filter (بدون شبکه) رد می‌شوند؛ فقط وقتی
+bloom filter «شاید» بگوید، مجموعه دقیق Redis بررسی می‌شود. از bloom filter
+نمی‌شود عضو حذف کرد، پس هر revocation_rebuild_interval ثانیه از روی مجموعه
+زنده (بعد از حذف توکن‌های منقضی) از نو ساخته می‌شود تا نرخ خطای آن بالا نرود.
+"""
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict, Optional, Set
+import redis
+from app.config import settings
+
+REVOKED_JTI_KEY = "auth:revoked-jti"  # sorted set: jti -> زمان انقضای توکن
+MIN_VERSION_KEY = "auth:min-token-version"  # hash: username -> حداقل نسخه معتبر
+REVOCATION_CHANNEL = "auth:revocations"
+
+# فاصله تلاش دوباره برای بارگذاری وقتی Redis در دسترس نیست (دو برابر در هر شکست)
+LOAD_RETRY_MIN = 1.0  # ثانیه
+LOAD_RETRY_MAX = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    def __init__(self, size_bits: int = 1 << 20, hash_count: int = 5):
+        self.size_bits = size_bits
+        self.hash_count = hash_count
+        self._bits = bytearray(size_bits // 8)
+    
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=8 * self.hash_count).digest()
+        for index in range(self.hash_count):
+            yield int.from_bytes(digest[index * 8:(index + 1) * 8], "big") % self.size_bits
+    
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    def __init__(self):
+        self._bloom = BloomFilter()
+        self._min_versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._loaded_at = 0.0
+        self._load_lock = threading.Lock()
+        self._rebuild_thread: Optional[threading.Thread] = None
+        # ابطال‌هایی که وسط بارگذاری رسیدند و باید به bloom filter جدید هم اضافه شوند
+        self._added_during_load: Optional[Set[str]] = None
+        self._unsynced: Dict[str, float] = {}  # jti -> زمان انقضا
+        self._retry_delay = LOAD_RETRY_MIN
+        self._next_load_at = 0.0
+        self._client: Optional[redis.Redis] = None
+    
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.Redis.from_url(
+                settings.redis_url,
+                socket_timeout=settings.revocation_redis_timeout,
+                socket_connect_timeout=settings.revocation_redis_timeout
+            )
+        return self._client
+    
+    def load(self) -> None:
+        """بارگذاری کامل از Redis (در شروع، بعد از قطع اتصال pub/sub و بازسازی دوره‌ای)"""
+        with self._load_lock:
+            self._load()
+    
+    def _load(self) -> None:
+        bloom = BloomFilter()
+        with self._lock:
+            self._added_during_load = set()
+        try:
+            # ابطال‌هایی که زمان قطعی Redis فقط محلی ثبت شدند
+            with self._lock:
+                unsynced, self._unsynced = self._unsynced, {}
+            try:
+                if unsynced:
+                    self.client.zadd(REVOKED_JTI_KEY, unsynced)
+            except redis.RedisError:
+                with self._lock:
+                    self._unsynced = {**unsynced, **self._unsynced}
+                raise
+            self.client.zremrangebyscore(REVOKED_JTI_KEY, 0, time.time())
+            for jti in self.client.zrange(REVOKED_JTI_KEY, 0, -1):
+                bloom.add(jti.decode())
+            min_versions = {
+                username.decode(): int(version)
+                for username, version in self.client.hgetall(MIN_VERSION_KEY).items()
+            }
+        except redis.RedisError as e:
+            with self._lock:
+                self._added_during_load = None
+                delay = self._retry_delay
+                self._next_load_at = time.monotonic() + delay
+                self._retry_delay = min(delay * 2, LOAD_RETRY_MAX)
+            logger.warning("Revocation list load failed, retrying in %.0fs: %s", delay, e)
+            return
+        with self._lock:
+            for jti in self._added_during_load:
+                bloom.add(jti)
+            self._added_during_load = None
+            self._bloom = bloom
+            for username, version in min_versions.items():
+                self._min_versions[username] = max(version, self._min_versions.get(username, 0))
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+            self._retry_delay = LOAD_RETRY_MIN
+    
+    def ensure_loaded(self) -> None:
+        # بعد از شکست، تا زمان تلاش بعدی درخواست‌ها معطل Redis نمی‌شوند
+        now = time.monotonic()
+        if now < self._next_load_at:
+            return
+        if not self._loaded:
+            self.load()
+        elif now - self._loaded_at >= settings.revocation_rebuild_interval:
+            self._start_rebuild()
+    
+    def _start_rebuild(self) -> None:
+        """بازسازی bloom filter در پس‌زمینه تا درخواست فعلی معطل نشود"""
+        with self._lock:
+            if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+                return
+            self._rebuild_thread = threading.Thread(target=self.load, name="revocation-rebuild", daemon=True)
+            self._rebuild_thread.start()
+    
+    def _add_to_bloom(self, jti: str) -> None:
+        """افزودن به bloom filter؛ باید با self._lock صدا زده شود"""
+        self._bloom.add(jti)
+        if self._added_during_load is not None:
+            self._added_during_load.add(jti)
+    
+    def revoke_token(self, jti: str, expires_at: float) -> bool:
+        """
+        ابطال یک توکن تا زمان انقضای آن
+
+        ZADD NX اتمیک است؛ اگر توکن قبلاً باطل شده باشد False برمی‌گردد و تمدید
+        با همین نتیجه جلوی استفاده هم‌زمان از یک توکن تمدید را می‌گیرد. اگر Redis
+        در دسترس نباشد ابطال در bloom filter همین worker ثبت و بعداً نوشته می‌شود.
+        """
+        try:
+            added = self.client.zadd(REVOKED_JTI_KEY, {jti: expires_at}, nx=True)
+        except redis.RedisError as e:
+            logger.warning("Token revocation kept locally, Redis unavailable: %s", e)
+            with self._lock:
+                first = jti not in self._bloom and jti not in self._unsynced
+                self._add_to_bloom(jti)
+                self._unsynced[jti] = expires_at
+                self._loaded = False
+            return first
+        
+        with self._lock:
+            self._add_to_bloom(jti)
+        if added:
+            try:
+                self.client.publish(REVOCATION_CHANNEL, f"jti:{jti}")
+            except redis.RedisError as e:
+                logger.warning("Token revocation not published: %s", e)
+        return bool(added)
+    
+    def revoke_user_versions(self, username: str, min_version: int) -> None:
+        """ابطال همه توکن‌های کاربر با نسخه کمتر از min_version (در صورت خطای Redis هیچ اثری ندارد)"""
+        self.client.hset(MIN_VERSION_KEY, username, min_version)
+        with self._lock:
+            self._min_versions[username] = max(min_version, self._min_versions.get(username, 0))
+        self.client.publish(REVOCATION_CHANNEL, f"ver:{username}:{min_version}")
+    
+    def handle_message(self, data: str) -> None:
+        """اعمال پیام ابطال دریافتی از worker دیگر"""
+        kind, _, value = data.partition(":")
+        if kind == "jti":
+            with self._lock:
+                self._add_to_bloom(value)
+        elif kind == "ver":
+            username, _, version = value.rpartition(":")
+            with self._lock:
+                self._min_versions[username] = max(int(version), self._min_versions.get(username, 0))
+    
+    def is_version_revoked(self, username: str, version: int) -> bool:
+        return version < self._min_versions.get(username, 0)
+    
+    def is_token_revoked(self, jti: Optional[str]) -> bool:
+        """بررسی ابطال توکن؛ در صورت در دسترس نبودن Redis با احتیاط رد می‌شود"""
+        if not jti or jti not in self._bloom:
+            return False
+        if jti in self._unsynced:
+            return True
+        try:
+            return self.client.zscore(REVOKED_JTI_KEY, jti) is not None
+        except redis.RedisError:
+            return True
+
+
+revocation_list = RevocationList()
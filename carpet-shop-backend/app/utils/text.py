@@ -0,0 +1,25 @@
+"""
+یکسان‌سازی متن فارسی برای جستجو و جلوگیری از ثبت تکراری
+"""
+import re
+
+_CHAR_MAP = str.maketrans({
+    "ي": "ی",
+    "ى": "ی",
+    "ك": "ک",
+    "ة": "ه",
+    "ۀ": "ه",
+    "أ": "ا",
+    "إ": "ا",
+    "آ": "ا",
+    "‌": " ",  # نیم‌فاصله
+    "‏": "",
+    "‎": "",
+})
+_DIACRITICS = re.compile(r"[ً-ْٰ]")
+_SPACES = re.compile(r"\s+")
+
+def normalize_name(value: str) -> str:
+    """یکسان‌سازی نام (حروف عربی، اعراب، نیم‌فاصله و فاصله‌های تکراری)"""
+    value = _DIACRITICS.sub("", value.translate(_CHAR_MAP))
+    return _SPACES.sub(" ", value).strip().lower()
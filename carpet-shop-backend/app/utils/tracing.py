@@ -0,0 +1,334 @@
+"""
+ردیابی سبک (tracing) بدون APM خارجی
+
+هر درخواست HTTP یک span ریشه دارد، متدهای سرویس‌ها با traced_service و
+کوئری‌ها و عملیات فایل به صورت span فرزند ثبت می‌شوند. شناسه trace با هدر
+traceparent (W3C) از کلاینت یا درخواست قبلی ادامه پیدا می‌کند و در هدرهای
+پیام Celery به taskها منتقل می‌شود.
+
+spanهای تمام شده در یک ring buffer در حافظه نگه داشته می‌شوند و اگر
+trace_export_path تنظیم شده باشد به صورت JSON lines در فایل هم نوشته
+می‌شوند (برای دیدن spanهای workerهای Celery در همان endpoint ادمین).
+نوشتن فایل در پس‌زمینه است و حجم آن با trace_export_max_bytes محدود می‌شود.
+"""
+import atexit
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start", "duration_ms", "attributes", "error")
+    
+    def __init__(self, name: str, kind: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time()
+        self.duration_ms: Optional[float] = None
+        self.attributes: Dict = {}
+        self.error: Optional[str] = None
+    
+    def to_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class SpanExporter:
+    """
+    نگه‌داری spanها در ring buffer و نوشتن اختیاری آن‌ها در فایل JSON lines
+
+    نوشتن فایل در یک thread پس‌زمینه انجام می‌شود تا درخواست‌ها (و event loop)
+    معطل دیسک نشوند؛ اگر صف پر باشد span فقط در حافظه می‌ماند. فایل بعد از
+    max_bytes به path.1 منتقل می‌شود، پس حجم کل حداکثر دو برابر max_bytes است.
+    """
+    
+    def __init__(self, buffer_size: int, path: str = "", max_bytes: int = 0, queue_size: int = 10000):
+        self.spans = deque(maxlen=buffer_size)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.dropped = 0
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def export(self, span: Span) -> None:
+        data = span.to_dict()
+        self.spans.append(data)
+        if self.path:
+            self._ensure_thread()
+            try:
+                self._queue.put_nowait(json.dumps(data, ensure_ascii=False, default=str))
+            except queue.Full:
+                self.dropped += 1
+    
+    def flush(self) -> None:
+        """انتظار تا نوشته شدن همه spanهای صف (برای خاموش شدن و تست‌ها)"""
+        if self._thread is not None:
+            self._queue.join()
+    
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+    
+    def _run(self) -> None:
+        while True:
+            lines = [self._queue.get()]
+            # هر چه در صف جمع شده با یک بار باز کردن فایل نوشته می‌شود
+            while len(lines) < 1000:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(lines)
+            except OSError as e:
+                logger.warning("Span export to %s failed: %s", self.path, e)
+            finally:
+                for _ in lines:
+                    self._queue.task_done()
+    
+    def _write(self, lines: List[str]) -> None:
+        if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            os.replace(self.path, self.path + ".1")
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    
+    def recent_spans(self) -> List[Dict]:
+        """spanهای اخیر؛ با خروجی فایل، spanهای همه پروسه‌ها (انتهای فایل و فایل قبلی)"""
+        if not self.path:
+            return list(self.spans)
+        limit = self.spans.maxlen
+        lines = _tail_lines(self.path, limit)
+        if len(lines) < limit:
+            lines = _tail_lines(self.path + ".1", limit - len(lines)) + lines
+        spans = []
+        for line in lines:
+            try:
+                spans.append(json.loads(line))
+            except ValueError:
+                # خطی که پروسه دیگری هنوز کامل ننوشته است
+                continue
+        return spans
+
+
+def _tail_lines(path: str, limit: int, block_size: int = 64 * 1024) -> List[str]:
+    """آخرین limit خط فایل بدون خواندن کل فایل"""
+    if limit <= 0 or not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= limit:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = [line for line in data.decode("utf-8", errors="replace").splitlines() if line.strip()]
+    # اولین خط ممکن است ناقص باشد اگر از وسط فایل شروع کرده باشیم
+    if position > 0:
+        lines = lines[1:]
+    return lines[-limit:]
+
+
+exporter = SpanExporter(settings.trace_buffer_size, settings.trace_export_path, settings.trace_export_max_bytes)
+# نوشتن spanهای باقی‌مانده در صف هنگام خروج پروسه
+atexit.register(exporter.flush)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(
+    name: str,
+    kind: str = "internal",
+    trace_id: Optional[str] = None,
+    parent_id: Optional[str] = None,
+    **attributes
+) -> Iterator[Span]:
+    """span جدید، فرزند span فعلی (یا ادامه trace_id داده شده)"""
+    parent = _current_span.get()
+    if trace_id is None and parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    new_span = Span(name, kind, trace_id, parent_id)
+    new_span.attributes.update(attributes)
+    token = _current_span.set(new_span)
+    started = time.perf_counter()
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        new_span.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        _current_span.reset(token)
+        exporter.export(new_span)
+
+
+def traced(name: Optional[str] = None):
+    """decorator ثبت span برای یک تابع (sync یا async)"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+        
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, "service"):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, "service"):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced_service(cls):
+    """ثبت span برای همه متدهای عمومی یک کلاس سرویس"""
+    for attr, value in list(vars(cls).items()):
+        if not attr.startswith("_") and inspect.isfunction(value):
+            setattr(cls, attr, traced(f"{cls.__name__}.{attr}")(value))
+    return cls
+
+
+@contextmanager
+def file_span(operation: str, path: str) -> Iterator[Optional[Span]]:
+    """span فرزند برای عملیات فایل (فقط وقتی trace فعالی وجود دارد)"""
+    if _current_span.get() is None:
+        yield None
+        return
+    with span(f"file.{operation}", "file", path=path) as file_operation:
+        yield file_operation
+
+
+# spanهای SQL؛ فقط داخل یک trace فعال ساخته می‌شوند
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_sql_span(conn, cursor, statement, parameters, context, executemany):
+    parent = _current_span.get()
+    if parent is None:
+        return
+    sql_span = Span("sql", "sql", parent.trace_id, parent.span_id)
+    sql_span.attributes["statement"] = statement[:settings.trace_statement_max_length]
+    sql_span.attributes["db"] = conn.engine.url.database
+    conn.info.setdefault("trace_spans", []).append((sql_span, time.perf_counter()))
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _finish_sql_span(conn, cursor, statement, parameters, context, executemany):
+    if conn.info.get("trace_spans"):
+        sql_span, started = conn.info["trace_spans"].pop()
+        sql_span.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        exporter.export(sql_span)
+
+
+@event.listens_for(Engine, "handle_error")
+def _fail_sql_span(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("trace_spans"):
+        sql_span, started = connection.info["trace_spans"].pop()
+        sql_span.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        sql_span.error = str(exception_context.original_exception)
+        exporter.export(sql_span)
+
+
+def parse_traceparent(value: str) -> Optional[Dict]:
+    """هدر W3C traceparent: version-traceid-parentid-flags"""
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return {"trace_id": parts[1], "parent_id": parts[2]}
+
+
+class TracingMiddleware:
+    """span ریشه برای هر درخواست و بازگرداندن X-Trace-Id"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        parent = {}
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                parent = parse_traceparent(value.decode("latin-1")) or {}
+                break
+        
+        with span(f"{scope['method']} {scope['path']}", "http", **parent) as request_span:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    request_span.attributes["status"] = message["status"]
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-trace-id", request_span.trace_id.encode()),
+                        (b"traceparent", f"00-{request_span.trace_id}-{request_span.span_id}-01".encode()),
+                    ]
+                await send(message)
+            
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # نام span با قالب مسیر (مثلاً /api/invoices/{invoice_id})
+                route = scope.get("route")
+                if route is not None:
+                    request_span.name = f"{scope['method']} {getattr(route, 'path_format', route.path)}"
+
+
+def connect_celery_signals() -> None:
+    """انتقال trace به taskهای Celery و ثبت span برای اجرای task"""
+    from celery.signals import before_task_publish, task_prerun, task_postrun
+    
+    active_tasks: Dict[str, object] = {}
+    
+    @before_task_publish.connect(weak=False)
+    def inject_trace(headers=None, **kwargs):
+        parent = _current_span.get()
+        if parent is not None and headers is not None:
+            headers["trace_id"] = parent.trace_id
+            headers["parent_span_id"] = parent.span_id
+    
+    @task_prerun.connect(weak=False)
+    def start_task_span(task_id=None, task=None, **kwargs):
+        request = task.request
+        headers = getattr(request, "headers", None) or {}
+        trace_id = getattr(request, "trace_id", None) or headers.get("trace_id")
+        parent_id = getattr(request, "parent_span_id", None) or headers.get("parent_span_id")
+        context = span(f"celery {task.name}", "task", trace_id=trace_id, parent_id=parent_id, task_id=task_id)
+        context.__enter__()
+        active_tasks[task_id] = context
+    
+    @task_postrun.connect(weak=False)
+    def finish_task_span(task_id=None, state=None, **kwargs):
+        context = active_tasks.pop(task_id, None)
+        if context is not None:
+            current = _current_span.get()
+            if current is not None:
+                current.attributes["state"] = state
+            context.__exit__(None, None, None)
@@ -0,0 +1,100 @@
+"""
+بافر write-behind برای به‌روزرسانی‌های لمسی (last_login، last_edited_at)
+
+چند touch روی یک ردیف در حافظه یکی می‌شوند و هر چند ثانیه با یک
+executemany در دیتابیس نوشته می‌شوند. فیلدهای مهم تجاری نباید از این مسیر بروند.
+"""
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import update, bindparam, or_
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TouchBuffer:
+    def __init__(self, flush_interval: float, max_pending: int):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        # (model, column) -> {primary key -> زمان}
+        self._pending: Dict[Tuple[type, str], Dict[int, datetime]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def touch(self, model: type, pk: int, column: str, value: Optional[datetime] = None) -> None:
+        """ثبت زمان برای نوشتن بعدی؛ فقط آخرین مقدار هر ردیف نگه داشته می‌شود"""
+        value = value or datetime.utcnow()
+        with self._lock:
+            rows = self._pending.setdefault((model, column), {})
+            if rows.get(pk) is None or rows[pk] < value:
+                rows[pk] = value
+            pending = sum(len(rows) for rows in self._pending.values())
+        self._ensure_thread()
+        if pending >= self.max_pending:
+            self._wakeup.set()
+    
+    def flush(self) -> int:
+        """نوشتن همه مقادیر در صف؛ تعداد ردیف‌های نوشته شده برمی‌گردد"""
+        from app.database import engine
+        
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            
+            written = 0
+            try:
+                with engine.begin() as connection:
+                    for (model, column), rows in pending.items():
+                        table = model.__table__
+                        # touch دیرهنگام نباید مقدار جدیدتری را که مستقیم نوشته شده عقب ببرد
+                        statement = update(table).where(
+                            table.c.id == bindparam("_pk"),
+                            or_(table.c[column].is_(None), table.c[column] < bindparam("_value"))
+                        ).values({column: bindparam("_value")})
+                        connection.execute(statement, [
+                            {"_pk": pk, "_value": value} for pk, value in rows.items()
+                        ])
+                        written += len(rows)
+            except Exception:
+                # برگرداندن به صف برای تلاش بعدی (مقادیر جدیدتر حفظ می‌شوند)
+                with self._lock:
+                    for key, rows in pending.items():
+                        current = self._pending.setdefault(key, {})
+                        for pk, value in rows.items():
+                            if current.get(pk) is None or current[pk] < value:
+                                current[pk] = value
+                raise
+            return written
+    
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Write-behind flush failed")
+    
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-behind-flush", daemon=True)
+                self._thread.start()
+
+
+touch_buffer = TouchBuffer(
+    flush_interval=settings.write_behind_flush_interval,
+    max_pending=settings.write_behind_max_pending
+)
+
+# نوشتن باقی‌مانده صف هنگام خروج پروسه
+atexit.register(lambda: touch_buffer.flush())
@@ -0,0 +1,93 @@
+"""
+مقایسه مسیر sync و async دیتابیس زیر بار همزمان
+
+دو نمونه از سرور را با تنظیم متفاوت اجرا کنید:
+
+    ASYNC_ROUTERS= uvicorn app.main:app --port 8000
+    ASYNC_ROUTERS=carpets,invoices,checks,reports uvicorn app.main:app --port 8001
+
+و سپس:
+
+    python -m benchmarks.db_path_benchmark --sync-base http://localhost:8000 \\
+        --async-base http://localhost:8001 --concurrency 64 --total 2000
+
+برای هر مسیر تعداد درخواست در ثانیه و p50/p99 گزارش می‌شود.
+"""
+import argparse
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+DEFAULT_PATHS = [
+    "/api/carpets/?limit=50",
+    "/api/invoices/?limit=50",
+    "/api/checks/upcoming",
+    "/api/reports/inventory",
+]
+
+
+def run_load(base_url: str, paths: List[str], concurrency: int, total: int) -> Dict:
+    def one(index: int) -> float:
+        url = base_url.rstrip("/") + paths[index % len(paths)]
+        started = time.perf_counter()
+        with urllib.request.urlopen(url, timeout=60) as response:
+            response.read()
+        return time.perf_counter() - started
+    
+    latencies: List[float] = []
+    errors = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(one, i) for i in range(total)]:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    elapsed = time.perf_counter() - started
+    
+    latencies.sort()
+    count = len(latencies)
+    return {
+        "requests": count + errors,
+        "errors": errors,
+        "rps": count / elapsed,
+        "p50": statistics.median(latencies) if count else None,
+        "p99": latencies[min(count - 1, int(count * 0.99))] if count else None,
+    }
+
+
+def _report(name: str, result: Dict) -> None:
+    print(f"{name}")
+    print(f"  requests:     {result['requests']} ({result['errors']} errors)")
+    print(f"  throughput:   {result['rps']:.1f} req/s")
+    if result["p50"] is not None:
+        print(f"  latency p50:  {result['p50'] * 1000:.1f} ms")
+        print(f"  latency p99:  {result['p99'] * 1000:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sync vs async database path benchmark")
+    parser.add_argument("--sync-base", default="http://localhost:8000")
+    parser.add_argument("--async-base", default="http://localhost:8001")
+    parser.add_argument("--path", action="append", dest="paths", help="مسیر تست (قابل تکرار)")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--total", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=50)
+    args = parser.parse_args()
+    paths = args.paths or DEFAULT_PATHS
+    
+    results = {}
+    for name, base_url in (("sync", args.sync_base), ("async", args.async_base)):
+        run_load(base_url, paths, min(args.concurrency, args.warmup or 1), args.warmup)
+        results[name] = run_load(base_url, paths, args.concurrency, args.total)
+        _report(f"{name} {base_url} concurrency={args.concurrency}", results[name])
+    
+    if results["sync"]["rps"] and results["sync"]["p99"] and results["async"]["p99"]:
+        print(f"async/sync throughput: {results['async']['rps'] / results['sync']['rps']:.2f}x")
+        print(f"async/sync p99:        {results['async']['p99'] / results['sync']['p99']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+بنچمارک تعداد ورود در ثانیه با همزمانی مشخص
+
+    python -m benchmarks.login_benchmark --concurrency 32 --total 200
+    python -m benchmarks.login_benchmark --url http://localhost:8000/api/auth/login \\
+        --username admin --password admin123 --concurrency 16 --total 100
+
+بدون --url فقط مسیر هش (executor محدود) سنجیده می‌شود و به دیتابیس نیازی نیست.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+
+def _report(name: str, latencies: List[float], elapsed: float, errors: int) -> None:
+    latencies.sort()
+    count = len(latencies)
+    print(f"{name}")
+    print(f"  requests:     {count + errors} ({errors} errors)")
+    print(f"  throughput:   {count / elapsed:.1f} logins/s")
+    if count:
+        print(f"  latency p50:  {statistics.median(latencies) * 1000:.1f} ms")
+        print(f"  latency p99:  {latencies[min(count - 1, int(count * 0.99))] * 1000:.1f} ms")
+        print(f"  latency max:  {latencies[-1] * 1000:.1f} ms")
+
+
+async def bench_hashing(concurrency: int, total: int, password: str) -> None:
+    from app.config import settings
+    from app.utils.auth import pwd_context, verify_and_update_password_async
+    
+    hashed = pwd_context.hash(password)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+    
+    async def one() -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                valid, _ = await verify_and_update_password_async(password, hashed)
+                if not valid:
+                    errors += 1
+                    return
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    _report(
+        f"{settings.password_hash_scheme} rounds={settings.password_hash_rounds} "
+        f"workers={settings.password_hash_workers} concurrency={concurrency}",
+        latencies, elapsed, errors
+    )
+
+
+def bench_http(url: str, username: str, password: str, concurrency: int, total: int) -> None:
+    body = json.dumps({"username": username, "password": password}).encode("utf-8")
+    
+    def one() -> float:
+        request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+        started = time.perf_counter()
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+        return time.perf_counter() - started
+    
+    latencies: List[float] = []
+    errors = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(one) for _ in range(total)]:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    elapsed = time.perf_counter() - started
+    _report(f"POST {url} concurrency={concurrency}", latencies, elapsed, errors)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Login throughput benchmark")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--total", type=int, default=100)
+    parser.add_argument("--url", help="آدرس endpoint ورود برای تست کامل HTTP")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    args = parser.parse_args()
+    
+    if args.url:
+        bench_http(args.url, args.username, args.password, args.concurrency, args.total)
+    else:
+        asyncio.run(bench_hashing(args.concurrency, args.total, args.password))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+زمان import و شروع برنامه در مقایسه با بودجه
+
+    python -m benchmarks.startup_benchmark --runs 5 --budget-ms 1500
+    python -m benchmarks.startup_benchmark --module app.tasks.notification_tasks --top 15
+
+هر اجرا در یک پروسه جدید انجام می‌شود (شروع سرد). اگر میانه زمان از بودجه
+بیشتر شود کد خروج 1 است تا در CI قابل استفاده باشد. با --lifespan شروع و
+خاموش شدن lifespan هم اندازه‌گیری می‌شود.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import List, Tuple
+
+STARTUP_SNIPPET = """
+import asyncio, time
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+if {lifespan}:
+    from app.main import app
+    async def run():
+        async with app.router.lifespan_context(app):
+            pass
+    asyncio.run(run())
+finished = time.perf_counter()
+print(imported - started, finished - started)
+"""
+
+
+def measure(module: str, lifespan: bool) -> Tuple[float, float]:
+    output = subprocess.run(
+        [sys.executable, "-c", STARTUP_SNIPPET.format(module=module, lifespan=lifespan)],
+        check=True, capture_output=True, text=True
+    ).stdout.split()
+    return float(output[-2]), float(output[-1])
+
+
+def slowest_imports(module: str, top: int) -> List[Tuple[int, str]]:
+    """کندترین ماژول‌ها از خروجی python -X importtime (زمان تجمعی، میکروثانیه)"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True, capture_output=True, text=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import/startup time benchmark")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="بودجه میانه زمان import")
+    parser.add_argument("--lifespan", action="store_true", help="اجرای lifespan بعد از import")
+    parser.add_argument("--top", type=int, default=10, help="تعداد کندترین importها")
+    args = parser.parse_args()
+    
+    imports, totals = [], []
+    for _ in range(args.runs):
+        imported, total = measure(args.module, args.lifespan)
+        imports.append(imported)
+        totals.append(total)
+    
+    import_ms = statistics.median(imports) * 1000
+    print(f"import {args.module}  runs={args.runs}")
+    print(f"  import median:   {import_ms:.1f} ms (min {min(imports) * 1000:.1f}, max {max(imports) * 1000:.1f})")
+    if args.lifespan:
+        print(f"  startup median:  {statistics.median(totals) * 1000:.1f} ms")
+    
+    if args.top:
+        print("  slowest imports (cumulative):")
+        for cumulative, name in slowest_imports(args.module, args.top):
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+    
+    if import_ms > args.budget_ms:
+        print(f"FAIL: import median {import_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    print(f"OK: within budget {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@
 """
 from app.database import SessionLocal
 from app.models.user import User, UserRole
-from app.utils.auth import get_password_hash
+from app.utils.auth import get_password_hash, bump_token_version, revoke_user_tokens
 
 def create_admin():
     db = SessionLocal()
@@ -19,7 +19,9 @@ def create_admin():
             
             if choice == 'y':
                 admin.hashed_password = get_password_hash("admin123")
+                bump_token_version(admin)
                 db.commit()
+                revoke_user_tokens(admin)
                 print("✅ پسورد ادمین به admin123 تغییر کرد")
             else:
                 print("❌ عملیات لغو شد")
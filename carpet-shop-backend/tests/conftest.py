@@ -0,0 +1,147 @@
+"""
+تنظیمات مشترک تست‌ها
+
+تست‌ها روی یک فایل SQLite موقت اجرا می‌شوند؛ متغیرهای محیطی باید قبل از
+import شدن app تنظیم شوند چون Settings و engine هنگام import ساخته می‌شوند.
+"""
+import os
+import tempfile
+
+_tmp_dir = tempfile.mkdtemp(prefix="carpet-shop-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}"
+# پورتی که Redis روی آن نیست؛ تست‌ها مسیر «Redis در دسترس نیست» را می‌بینند
+os.environ["REDIS_URL"] = "redis://127.0.0.1:6399/15"
+os.environ["SECRET_KEY"] = "test-secret"
+os.environ["UPLOAD_DIR"] = os.path.join(_tmp_dir, "uploads")
+os.environ["PROFILE_DIR"] = os.path.join(_tmp_dir, "profiles")
+os.environ["TRACE_EXPORT_PATH"] = ""
+os.environ["PASSWORD_HASH_ROUNDS"] = "4"
+os.environ.pop("READ_DATABASE_URL", None)
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from app.database import Base, SessionLocal, engine
+from app.utils.write_behind import touch_buffer
+import app.models  # noqa: F401  ثبت همه جدول‌ها روی Base.metadata
+from app.utils.query_profiler import profile_queries
+
+
+
+def _sqlite_date_trunc(bucket, value):
+    """معادل date_trunc در PostgreSQL برای گزارش‌های سری زمانی روی SQLite"""
+    if value is None:
+        return None
+    moment = datetime.fromisoformat(value).replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "week":
+        moment -= timedelta(days=moment.weekday())
+    elif bucket == "month":
+        moment = moment.replace(day=1)
+    return moment.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+@event.listens_for(engine, "connect")
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    dbapi_connection.create_function("date_trunc", 2, _sqlite_date_trunc)
+
+
+@pytest.fixture
+def db():
+    """session روی دیتابیس خالی؛ جدول‌ها برای هر تست از نو ساخته می‌شوند"""
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        touch_buffer.flush()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def make_carpet(db):
+    """ساخت فرش با مقادیر پیش‌فرض؛ فیلدها قابل جایگزینی هستند"""
+    from app.models import Carpet, CarpetSize, PaymentMethod
+    
+    def factory(**fields):
+        values = dict(
+            pattern="افشان", brand="کاشان", purchase_price=1000.0, sale_price=1500.0,
+            material="پشم", size=CarpetSize.SHESH_METRI, quantity=1,
+            payment_method=PaymentMethod.CASH
+        )
+        values.update(fields)
+        carpet = Carpet(**values)
+        db.add(carpet)
+        db.commit()
+        return carpet
+    
+    return factory
+
+
+@pytest.fixture
+def client(db):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def admin(db):
+    """کاربر ادمین با رمز admin123"""
+    from app.models import User, UserRole
+    from app.utils.auth import get_password_hash
+    
+    user = User(
+        username="admin", email="admin@carpet-shop.com", full_name="مدیر",
+        hashed_password=get_password_hash("admin123"), role=UserRole.ADMIN
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def make_check(db):
+    """ساخت چک مستقیم در دیتابیس (بدون منطق CheckService)"""
+    from app.models import Check, CheckStatus, CheckType
+    
+    def factory(**fields):
+        values = dict(
+            check_number="123456", amount=5_000_000.0, payee="علی رضایی",
+            check_date=datetime.utcnow() + timedelta(days=1),
+            status=CheckStatus.REGISTERED, check_type=CheckType.INCOMING
+        )
+        values.update(fields)
+        check = Check(**values)
+        db.add(check)
+        db.commit()
+        return check
+    
+    return factory
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """اگر بیشتر از limit کوئری اجرا شود AssertionError با فهرست کوئری‌ها"""
+    with profile_queries(record_statements=True) as stats:
+        yield stats
+    if stats.count > limit:
+        listing = "\n".join(
+            f"  {index}. ({elapsed * 1000:.1f} ms) {statement}"
+            for index, (statement, elapsed) in enumerate(stats.statements, 1)
+        )
+        raise AssertionError(f"{stats.count} queries executed, budget is {limit}:\n{listing}")
+
+
+@pytest.fixture
+def query_budget():
+    """
+    محدود کردن تعداد کوئری یک بخش از تست:
+
+        with query_budget(3):
+            client.get("/api/invoices/1")
+    """
+    return assert_max_queries
@@ -0,0 +1,85 @@
+import importlib
+import pytest
+from fastapi.testclient import TestClient
+import app.main
+from app import database
+from app.api import async_routes
+from app.config import settings
+from app.services.async_services import AsyncCarpetService
+
+
+@pytest.fixture
+def async_app(db):
+    """برنامه با ASYNC_ROUTERS=carpets؛ بعد از تست برنامه اصلی دوباره ساخته می‌شود"""
+    original = settings.async_routers
+    settings.async_routers = "carpets"
+    try:
+        yield importlib.reload(app.main).app
+    finally:
+        settings.async_routers = original
+        importlib.reload(app.main)
+
+
+@pytest.fixture
+def async_client(async_app):
+    with TestClient(async_app) as test_client:
+        yield test_client
+
+
+def test_async_carpet_route_matches_sync(client, async_client, make_carpet, monkeypatch):
+    carpet = make_carpet(description="دستباف")
+    sync_payload = client.get(f"/api/carpets/{carpet.id}").json()
+    
+    calls = []
+    original_get = AsyncCarpetService.get_carpet
+    
+    async def spy(self, carpet_id):
+        calls.append(carpet_id)
+        return await original_get(self, carpet_id)
+    monkeypatch.setattr(AsyncCarpetService, "get_carpet", spy)
+    
+    response = async_client.get(f"/api/carpets/{carpet.id}")
+    
+    assert response.status_code == 200
+    assert calls == [carpet.id]
+    assert response.json() == sync_payload
+
+
+def test_async_route_is_registered_before_sync(async_client):
+    route = next(
+        route for route in async_client.app.routes
+        if getattr(route, "path", None) == "/api/carpets/{carpet_id:int}"
+    )
+    
+    assert route.endpoint is async_routes.get_carpet
+
+
+def test_lifespan_disposes_async_engine(async_app, make_carpet):
+    carpet = make_carpet()
+    
+    with TestClient(async_app) as test_client:
+        test_client.get(f"/api/carpets/{carpet.id}")
+        assert database.async_engine is not None
+    
+    assert database.async_engine is None
+
+
+def test_async_routes_take_the_same_query_parameters_as_sync(client):
+    from fastapi.dependencies.utils import get_flat_dependant
+    
+    def query_params(route):
+        return sorted(
+            (param.name, repr(param.field_info), repr(param.field_info.metadata))
+            for param in get_flat_dependant(route.dependant).query_params
+        )
+    
+    sync_routes = {
+        (route.path, method): route
+        for route in client.app.routes if hasattr(route, "methods")
+        for method in route.methods
+    }
+    for router in async_routes.ASYNC_ROUTERS.values():
+        for route in router.routes:
+            path = "/api" + route.path.replace(":int}", "}")
+            for method in route.methods:
+                assert query_params(route) == query_params(sync_routes[(path, method)]), path
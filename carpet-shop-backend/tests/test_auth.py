@@ -0,0 +1,133 @@
+import time
+from app.config import settings
+from app.utils.revocation import RevocationList
+
+
+def _login(client):
+    response = client.post("/api/auth/login", json={"username": "admin", "password": "admin123"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_refresh_token_is_single_use(client, admin):
+    tokens = _login(client)
+    
+    first = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    second = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    
+    assert first.status_code == 200
+    assert second.status_code == 401
+
+
+def test_logout_without_redis_revokes_access_token(client, admin):
+    tokens = _login(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    
+    response = client.post("/api/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers)
+    
+    assert response.status_code == 204
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+
+def test_revoke_without_redis_is_check_and_set():
+    revocations = RevocationList()
+    
+    assert revocations.revoke_token("abc", 0) is True
+    assert revocations.revoke_token("abc", 0) is False
+    assert revocations.is_token_revoked("abc")
+    assert not revocations.is_token_revoked("other")
+
+
+def test_failed_load_is_not_retried_immediately(monkeypatch):
+    revocations = RevocationList()
+    revocations.ensure_loaded()
+    
+    calls = []
+    monkeypatch.setattr(revocations, "load", lambda: calls.append(1))
+    revocations.ensure_loaded()
+    
+    assert calls == []
+
+
+class FakeRevocationRedis:
+    """فقط دستورهایی که RevocationList برای مجموعه ابطال لازم دارد"""
+    
+    def __init__(self):
+        self.revoked = {}
+        self.on_zrange = None
+    
+    def zadd(self, key, mapping, nx=False):
+        added = [jti for jti in mapping if jti not in self.revoked]
+        self.revoked.update({jti: score for jti, score in mapping.items() if not nx or jti in added})
+        return len(added)
+    
+    def zremrangebyscore(self, key, minimum, maximum):
+        for jti in [jti for jti, score in self.revoked.items() if minimum <= score <= maximum]:
+            del self.revoked[jti]
+    
+    def zrange(self, key, start, end):
+        if self.on_zrange:
+            self.on_zrange()
+        return [jti.encode() for jti in self.revoked]
+    
+    def zscore(self, key, jti):
+        return self.revoked.get(jti)
+    
+    def hgetall(self, key):
+        return {}
+    
+    def publish(self, channel, message):
+        return 0
+
+
+def _revocations_with(fake):
+    revocations = RevocationList()
+    revocations._client = fake
+    revocations.load()
+    return revocations
+
+
+def test_rebuild_drops_expired_tokens_from_bloom_filter(monkeypatch):
+    fake = FakeRevocationRedis()
+    revocations = _revocations_with(fake)
+    revocations.revoke_token("expired", time.time() + 60)
+    revocations.revoke_token("live", time.time() + 3600)
+    fake.revoked["expired"] = time.time() - 1
+    
+    monkeypatch.setattr(settings, "revocation_rebuild_interval", 0)
+    revocations.ensure_loaded()
+    revocations._rebuild_thread.join(timeout=5)
+    
+    assert "expired" not in revocations._bloom
+    assert "live" in revocations._bloom
+
+
+def test_revocation_during_rebuild_is_kept():
+    fake = FakeRevocationRedis()
+    revocations = _revocations_with(fake)
+    # پیام pub/sub بعد از خواندن مجموعه و قبل از جایگزینی bloom filter می‌رسد
+    fake.on_zrange = lambda: revocations.handle_message("jti:late")
+    
+    revocations.load()
+    
+    assert "late" in revocations._bloom
+
+
+def test_role_change_fails_when_tokens_cannot_be_revoked(client, admin, db):
+    from app.models import User, UserRole
+    from app.utils.auth import get_password_hash
+    
+    user = User(
+        username="seller", email="seller@carpet-shop.com", full_name="فروشنده",
+        hashed_password=get_password_hash("seller123"), role=UserRole.ADMIN
+    )
+    db.add(user)
+    db.commit()
+    headers = {"Authorization": f"Bearer {_login(client)['access_token']}"}
+    
+    # Redis تست در دسترس نیست
+    response = client.put(f"/api/users/{user.id}", json={"role": UserRole.USER.value}, headers=headers)
+    
+    assert response.status_code == 503
+    db.expire_all()
+    assert db.get(User, user.id).role == UserRole.ADMIN
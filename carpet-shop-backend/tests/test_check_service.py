@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+from app.models import CheckStatus, CheckType
+from app.schemas.check import CheckCreate, CheckTransition
+from app.services.check_service import CheckService
+
+
+def _check_data(**fields):
+    values = dict(
+        check_number="123456", amount=5_000_000, payee="علی رضایی",
+        check_date=datetime.now() + timedelta(days=10), check_type=CheckType.INCOMING
+    )
+    values.update(fields)
+    return CheckCreate(**values)
+
+
+def test_past_check_gets_no_reminder(db):
+    check = CheckService(db).create_check(_check_data(check_date=datetime.now() - timedelta(days=3)))
+    
+    assert check.remind_at is None
+
+
+def test_future_check_is_reminded_before_due_date(db):
+    check_date = datetime.now() + timedelta(days=10)
+    
+    check = CheckService(db).create_check(_check_data(check_date=check_date))
+    
+    assert check.remind_at == check_date - timedelta(days=2)
+
+
+def test_aware_past_check_date_is_compared_safely(db):
+    check_date = datetime.now(timezone.utc) - timedelta(days=3)
+    
+    check = CheckService(db).create_check(_check_data(check_date=check_date))
+    
+    assert check.remind_at is None
+
+
+def test_bulk_transition_reports_duplicate_ids(db, make_check):
+    check = make_check()
+    
+    results = CheckService(db).bulk_transition([
+        CheckTransition(check_id=check.id, to_status=CheckStatus.PASSED),
+        CheckTransition(check_id=check.id, to_status=CheckStatus.BOUNCED),
+    ])
+    
+    assert [(result["success"], result["error"]) for result in results] == [(True, None), (False, "شناسه تکراری")]
+    db.refresh(check)
+    assert check.status == CheckStatus.PASSED
+
+
+def test_update_check_rejects_disallowed_status_change(client, make_check):
+    check = make_check(status=CheckStatus.PASSED)
+    
+    response = client.put(f"/api/checks/{check.id}", json={"status": CheckStatus.REGISTERED.value})
+    
+    assert response.status_code == 400
+    assert "مجاز نیست" in response.json()["detail"]
+
+
+def test_update_check_allows_valid_status_change(client, make_check):
+    check = make_check(status=CheckStatus.REGISTERED)
+    
+    response = client.put(f"/api/checks/{check.id}", json={"status": CheckStatus.CONFIRMED.value})
+    
+    assert response.status_code == 200
+    assert response.json()["status"] == CheckStatus.CONFIRMED.value
+
+
+def test_admin_can_correct_a_terminal_status(client, admin, make_check):
+    check = make_check(status=CheckStatus.PASSED)
+    token = client.post("/api/auth/login", json={"username": "admin", "password": "admin123"}).json()["access_token"]
+    
+    response = client.put(
+        f"/api/checks/{check.id}?force=true", json={"status": CheckStatus.BOUNCED.value},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    
+    assert response.status_code == 200
+    assert response.json()["status"] == CheckStatus.BOUNCED.value
+
+
+def test_status_override_requires_login(client, make_check):
+    check = make_check(status=CheckStatus.PASSED)
+    
+    response = client.put(f"/api/checks/{check.id}?force=true", json={"status": CheckStatus.BOUNCED.value})
+    
+    assert response.status_code == 401
@@ -0,0 +1,73 @@
+from app.models import ConsignmentLedgerEntry, ConsignmentOwnerBalance, LedgerEntryType
+from app.schemas.invoice import InvoiceCreate, InvoiceItemCreate
+from app.services.consignment_service import ConsignmentService
+from app.services.invoice_service import InvoiceService
+
+
+def _invoice_for(db, carpets):
+    return InvoiceService(db).create_invoice(InvoiceCreate(
+        customer_name="علی رضایی",
+        payment_method="نقدی",
+        items=[
+            InvoiceItemCreate(
+                carpet_id=carpet.id, title=carpet.pattern, size="6", brand=carpet.brand,
+                quantity=1, unit_price=2000
+            )
+            for carpet in carpets
+        ]
+    ))
+
+
+def test_two_items_from_new_owner_share_one_balance(db, make_carpet):
+    carpets = [
+        make_carpet(is_consignment=True, consignment_owner="حسن", owner_declared_price=price)
+        for price in (700.0, 300.0)
+    ]
+    invoice = _invoice_for(db, carpets)
+    
+    InvoiceService(db).finalize_invoice(invoice.id)
+    
+    balances = db.query(ConsignmentOwnerBalance).all()
+    assert [(b.owner, b.total_owed, b.balance) for b in balances] == [("حسن", 1000.0, 1000.0)]
+    assert db.query(ConsignmentLedgerEntry).count() == 2
+
+
+def test_reversal_for_new_owner_creates_one_balance(db, make_carpet):
+    carpets = [
+        make_carpet(is_consignment=True, consignment_owner="حسن", owner_declared_price=price)
+        for price in (700.0, 300.0)
+    ]
+    invoice = _invoice_for(db, carpets)
+    InvoiceService(db).finalize_invoice(invoice.id)
+    # مانده حذف شده باشد تا برگشت هم مسیر ساخت ردیف جدید را طی کند
+    db.query(ConsignmentOwnerBalance).delete()
+    db.commit()
+    
+    assert InvoiceService(db).delete_invoice(invoice.id)
+    
+    balance = ConsignmentService(db).get_balance("حسن")
+    assert balance.total_owed == -1000.0
+    assert db.query(ConsignmentLedgerEntry).filter(
+        ConsignmentLedgerEntry.entry_type == LedgerEntryType.REVERSAL
+    ).count() == 2
+
+
+def test_concurrent_first_sale_reuses_the_other_balance_row(db):
+    # تراکنش دیگری بین SELECT و INSERT همین صاحب را ساخته است
+    db.add(ConsignmentOwnerBalance(owner="حسن", total_owed=100, total_paid=0, balance=100))
+    db.commit()
+    service = ConsignmentService(db)
+    real_locked_balance = service._locked_balance
+    lookups = []
+    
+    def racing_locked_balance(owner):
+        lookups.append(owner)
+        return None if len(lookups) == 1 else real_locked_balance(owner)
+    
+    service._locked_balance = racing_locked_balance
+    
+    balance = service._apply_to_balance("حسن", owed=50)
+    db.commit()
+    
+    assert balance.total_owed == 150
+    assert db.query(ConsignmentOwnerBalance).count() == 1
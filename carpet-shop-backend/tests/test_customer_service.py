@@ -0,0 +1,35 @@
+from app.models import Customer
+from app.services.customer_service import CustomerService
+
+
+def test_get_or_create_recovers_from_concurrent_insert(db, monkeypatch):
+    existing = CustomerService(db).create_customer("علی رضایی")
+    service = CustomerService(db)
+    # درخواست دیگر مشتری را بین جستجو و insert این درخواست ساخته است
+    lookups = iter([None])
+    original = service._find_by_normalized_name
+    monkeypatch.setattr(service, "_find_by_normalized_name", lambda normalized: next(lookups, None) or original(normalized))
+    
+    customer = service.get_or_create("علی  رضایی")
+    db.commit()
+    
+    assert customer.id == existing.id
+    assert db.query(Customer).count() == 1
+
+
+def test_check_with_unknown_customer_is_rejected(client):
+    response = client.post("/api/checks/", json={
+        "check_number": "1", "amount": 1000, "payee": "علی", "check_date": "2030-01-01T00:00:00",
+        "check_type": "ورودی", "customer_id": 999
+    })
+    
+    assert response.status_code == 400
+    assert response.json()["detail"] == "مشتری یافت نشد"
+
+
+def test_check_update_with_unknown_customer_is_rejected(client, make_check):
+    check = make_check()
+    
+    response = client.put(f"/api/checks/{check.id}", json={"customer_id": 999})
+    
+    assert response.status_code == 400
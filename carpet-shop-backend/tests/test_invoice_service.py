@@ -0,0 +1,38 @@
+from datetime import datetime
+from app.models import Invoice
+from app.schemas.invoice import InvoiceCreate, InvoiceItemCreate
+from app.services.invoice_service import InvoiceService
+from app.utils.write_behind import touch_buffer
+
+
+def test_finalize_returns_buffered_last_edited_at(db, make_carpet):
+    carpet = make_carpet(quantity=3)
+    service = InvoiceService(db)
+    invoice = service.create_invoice(InvoiceCreate(
+        customer_name="علی رضایی",
+        payment_method="نقدی",
+        items=[InvoiceItemCreate(carpet_id=carpet.id, title="افشان", size="6", brand="کاشان", quantity=1, unit_price=2000)]
+    ))
+    created_edit = invoice.last_edited_at
+    before = datetime.utcnow()
+    
+    finalized = service.finalize_invoice(invoice.id)
+    
+    assert finalized.last_edited_at >= before > created_edit
+    touch_buffer.flush()
+    db.expire_all()
+    assert db.get(Invoice, invoice.id).last_edited_at == finalized.last_edited_at
+
+
+def test_create_invoice_with_unknown_customer_returns_400(client, make_carpet):
+    carpet = make_carpet()
+    
+    response = client.post("/api/invoices/", json={
+        "customer_name": "علی رضایی",
+        "customer_id": 9999,
+        "payment_method": "نقدی",
+        "items": [{"carpet_id": carpet.id, "title": "افشان", "size": "6", "brand": "کاشان", "quantity": 1, "unit_price": 2000}]
+    })
+    
+    assert response.status_code == 400
+    assert response.json()["detail"] == "مشتری یافت نشد"
@@ -0,0 +1,98 @@
+import logging
+from datetime import datetime, timedelta
+import pytest
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Check, CheckNotification
+from app.services.check_service import CheckService
+from app.services.notification_service import LogChannel, NotificationDispatcher, NotificationService
+
+
+class CrashingDispatcher(NotificationDispatcher):
+    async def dispatch(self, messages):
+        raise RuntimeError("worker died")
+
+
+class EditingDispatcher(NotificationDispatcher):
+    """ویرایش چک از session دیگر در میانه ارسال (مثل PUT /checks/{id})"""
+    
+    async def dispatch(self, messages):
+        other = SessionLocal()
+        try:
+            for message in messages:
+                other.get(Check, message["check_id"]).description = "ویرایش در حین ارسال"
+            other.commit()
+        finally:
+            other.close()
+        return await super().dispatch(messages)
+
+
+def _due_check(make_check):
+    return make_check(remind_at=datetime.utcnow() - timedelta(hours=1))
+
+
+def test_reminder_is_sent_once(db, make_check):
+    check = _due_check(make_check)
+    service = NotificationService(db, NotificationDispatcher([LogChannel()], backoff=0))
+    
+    first = service.process_due_checks()
+    second = service.process_due_checks()
+    
+    assert first["notifications_sent"] == 1
+    assert second["claimed"] == 0
+    assert db.query(CheckNotification).filter(CheckNotification.check_id == check.id).count() == 1
+
+
+def test_crash_during_send_keeps_reminder_due(db, make_check):
+    check = _due_check(make_check)
+    
+    with pytest.raises(RuntimeError):
+        NotificationService(db, CrashingDispatcher([])).process_due_checks()
+    
+    other = SessionLocal()
+    try:
+        reloaded = other.get(Check, check.id)
+        assert reloaded.notification_sent is None
+        assert reloaded.notification_claimed_at is None
+    finally:
+        other.close()
+
+
+def test_log_channel_uses_logging(db, make_check, caplog):
+    _due_check(make_check)
+    service = NotificationService(db, NotificationDispatcher([LogChannel()], backoff=0))
+    
+    with caplog.at_level(logging.INFO, logger="app.services.notification_service"):
+        service.process_due_checks()
+    
+    assert "123456" in caplog.text
+
+
+def test_checks_are_not_locked_while_sending(db, make_check):
+    check = _due_check(make_check)
+    service = NotificationService(db, EditingDispatcher([LogChannel()], backoff=0))
+    
+    result = service.process_due_checks()
+    
+    assert result["notifications_sent"] == 1
+    db.expire_all()
+    reloaded = db.get(Check, check.id)
+    assert reloaded.description == "ویرایش در حین ارسال"
+    assert reloaded.notification_sent is not None
+    assert reloaded.notification_claimed_at is None
+
+
+def test_expired_claim_is_taken_again(db, make_check):
+    fresh = _due_check(make_check)
+    stale = make_check(
+        check_number="654321", remind_at=datetime.utcnow() - timedelta(hours=1),
+        notification_claimed_at=datetime.utcnow() - timedelta(seconds=settings.notification_claim_lease + 60)
+    )
+    make_check(
+        check_number="777777", remind_at=datetime.utcnow() - timedelta(hours=1),
+        notification_claimed_at=datetime.utcnow() - timedelta(seconds=10)
+    )
+    
+    claimed = CheckService(db).claim_checks_for_notification()
+    
+    assert sorted(check["id"] for check in claimed) == sorted([fresh.id, stale.id])
@@ -0,0 +1,44 @@
+from app.models import CarpetOperation
+from app.schemas.invoice import InvoiceCreate, InvoiceItemCreate
+from app.services.invoice_service import InvoiceService
+from app.services.report_service import ReportService
+
+
+def _invoice(db, make_carpet, item_count):
+    carpets = [
+        make_carpet(purchase_price=1000.0, is_consignment=index % 2 == 1,
+                    consignment_owner="حسن", owner_declared_price=800.0)
+        for index in range(item_count)
+    ]
+    for carpet in carpets:
+        db.add(CarpetOperation(carpet_id=carpet.id, operation_name="شستشو", price=100.0))
+    db.commit()
+    return InvoiceService(db).create_invoice(InvoiceCreate(
+        customer_name="علی رضایی",
+        payment_method="نقدی",
+        items=[
+            InvoiceItemCreate(carpet_id=carpet.id, title="افشان", size="6", brand="کاشان", quantity=1, unit_price=2000)
+            for carpet in carpets
+        ]
+    ))
+
+
+def test_financial_report_query_budget(db, make_carpet, query_budget):
+    _invoice(db, make_carpet, item_count=6)
+    db.expire_all()
+    
+    with query_budget(6):
+        report = ReportService(db).get_financial_report()
+    
+    # سه فرش با قیمت خرید 1000 و سه امانتی با قیمت اعلامی 800، هر کدام 100 هزینه عملیات
+    assert report["total_cost"] == 3 * 1100 + 3 * 900
+    assert report["total_sold_carpets"] == 6
+
+
+def test_finalize_invoice_query_budget(db, make_carpet, query_budget):
+    invoice_id = _invoice(db, make_carpet, item_count=6).id
+    db.expire_all()
+    
+    # دو دستور SAVEPOINT/RELEASE برای ساخت ردیف مانده صاحب امانت جدید
+    with query_budget(14):
+        InvoiceService(db).finalize_invoice(invoice_id)
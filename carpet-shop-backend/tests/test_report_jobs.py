@@ -0,0 +1,48 @@
+from app.tasks import report_tasks
+
+
+def test_jalali_monthly_job_requires_year(client):
+    response = client.post("/api/reports/jobs", json={"report_type": "jalali_monthly", "params": {}})
+    
+    assert response.status_code == 400
+    assert response.json()["detail"][0]["loc"] == ["jalali_year"]
+
+
+def test_timeseries_job_rejects_unknown_metric(client):
+    response = client.post(
+        "/api/reports/jobs", json={"report_type": "timeseries", "params": {"metric": "margin"}}
+    )
+    
+    assert response.status_code == 400
+
+
+def test_slot_is_released_when_enqueue_fails(client, monkeypatch):
+    released = []
+    monkeypatch.setattr(report_tasks, "acquire_slot", lambda report_type, job_id: True)
+    monkeypatch.setattr(report_tasks, "release_slot", lambda report_type, job_id: released.append(report_type))
+    
+    def broker_down(*args, **kwargs):
+        raise ConnectionError("broker down")
+    monkeypatch.setattr(report_tasks.run_report_job, "apply_async", broker_down)
+    
+    response = client.post("/api/reports/jobs", json={"report_type": "inventory"})
+    
+    assert response.status_code == 503
+    assert released == ["inventory"]
+
+
+def test_redis_outage_returns_503(client):
+    # REDIS_URL تست به پورتی اشاره می‌کند که Redis روی آن نیست
+    response = client.post("/api/reports/jobs", json={"report_type": "inventory"})
+    
+    assert response.status_code == 503
+
+
+def test_importing_the_app_does_not_load_celery():
+    import subprocess
+    import sys
+    
+    code = "import sys, app.main; print('celery' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    
+    assert output.strip().splitlines()[-1] == "False"
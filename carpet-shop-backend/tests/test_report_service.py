@@ -0,0 +1,22 @@
+from datetime import datetime
+from app.services.report_service import ReportService
+
+
+def test_timeseries_accepts_utc_iso_input(db):
+    start = datetime.fromisoformat("2024-01-01T00:00:00Z")
+    end = datetime.fromisoformat("2024-01-03T12:00:00+03:30")
+    
+    report = ReportService(db).get_timeseries("revenue", "day", start, end)
+    
+    assert report["start_date"] == datetime(2024, 1, 1)
+    assert report["end_date"] == datetime(2024, 1, 3, 8, 30)
+    assert [point["period"] for point in report["points"]] == [
+        datetime(2024, 1, 1), datetime(2024, 1, 2), datetime(2024, 1, 3)
+    ]
+
+
+def test_timeseries_defaults_to_last_thirty_days(db):
+    report = ReportService(db).get_timeseries("units", "week")
+    
+    assert report["start_date"].tzinfo is None
+    assert all(point["value"] == 0.0 for point in report["points"])
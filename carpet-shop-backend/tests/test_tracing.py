@@ -0,0 +1,50 @@
+import json
+from app.utils.tracing import Span, SpanExporter, _tail_lines
+
+
+def _export(exporter, count):
+    for index in range(count):
+        exporter.export(Span(f"span-{index}", "internal"))
+    exporter.flush()
+
+
+def test_file_export_keeps_most_recent_spans(tmp_path):
+    exporter = SpanExporter(buffer_size=10, path=str(tmp_path / "spans.jsonl"))
+    
+    _export(exporter, 25)
+    
+    names = [span["name"] for span in exporter.recent_spans()]
+    assert names == [f"span-{index}" for index in range(15, 25)]
+
+
+def test_file_export_rotates_at_max_bytes(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    line_size = len(json.dumps(Span("span-0", "internal").to_dict(), default=str)) + 1
+    exporter = SpanExporter(buffer_size=1000, path=str(path), max_bytes=line_size * 20)
+    
+    for _ in range(5):
+        _export(exporter, 20)
+    
+    assert path.stat().st_size < line_size * 25
+    assert (tmp_path / "spans.jsonl.1").stat().st_size < line_size * 25
+    # فایل فعلی و فایل قبلی با هم خوانده می‌شوند
+    assert len(exporter.recent_spans()) > 20
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    exporter = SpanExporter(buffer_size=10, path=str(tmp_path / "spans.jsonl"), queue_size=2)
+    exporter._ensure_thread = lambda: None  # writer متوقف؛ صف پر می‌ماند
+    
+    for index in range(5):
+        exporter.export(Span(f"span-{index}", "internal"))
+    
+    assert exporter.dropped == 3
+    assert len(exporter.spans) == 5
+
+
+def test_tail_lines_reads_backwards_across_blocks(tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_text("".join(f"line-{index}\n" for index in range(100)))
+    
+    assert _tail_lines(str(path), 3, block_size=8) == ["line-97", "line-98", "line-99"]
+    assert _tail_lines(str(path), 500, block_size=8) == [f"line-{index}" for index in range(100)]
@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+from app.models import Carpet
+from app.utils.write_behind import touch_buffer
+
+
+def test_stale_touch_does_not_overwrite_newer_value(db, make_carpet):
+    carpet = make_carpet()
+    newer = datetime.utcnow()
+    carpet.last_edited_at = newer
+    db.commit()
+    
+    touch_buffer.touch(Carpet, carpet.id, "last_edited_at", newer - timedelta(minutes=5))
+    touch_buffer.flush()
+    
+    db.expire_all()
+    assert db.get(Carpet, carpet.id).last_edited_at == newer
+
+
+def test_newer_touch_is_written(db, make_carpet):
+    carpet = make_carpet()
+    later = carpet.last_edited_at + timedelta(minutes=5)
+    
+    touch_buffer.touch(Carpet, carpet.id, "last_edited_at", later)
+    touch_buffer.flush()
+    
+    db.expire_all()
+    assert db.get(Carpet, carpet.id).last_edited_at == later
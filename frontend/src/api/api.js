@@ -15,4 +15,55 @@ if (existingToken) {
   api.defaults.headers.common["Authorization"] = `Bearer ${existingToken}`;
 }
 
-export default api;
\ No newline at end of file
+// توکن دسترسی کوتاه‌مدت است؛ با اولین 401 یک بار تمدید و درخواست تکرار می‌شود
+export const AUTH_TOKENS_EVENT = "auth:tokens";
+export const AUTH_LOGOUT_EVENT = "auth:logout";
+
+let refreshPromise = null;
+
+const refreshTokens = () => {
+  // درخواست‌های هم‌زمان منتظر یک تمدید می‌مانند؛ توکن تمدید فقط یک بار مصرف می‌شود
+  if (!refreshPromise) {
+    const refreshToken = localStorage.getItem("refresh_token");
+    refreshPromise = (refreshToken
+      ? api.post("auth/refresh", { refresh_token: refreshToken }, { _skipRefresh: true })
+      : Promise.reject(new Error("no refresh token"))
+    )
+      .then((response) => {
+        const { access_token, refresh_token, user } = response.data;
+        localStorage.setItem("token", access_token);
+        localStorage.setItem("refresh_token", refresh_token);
+        api.defaults.headers.common["Authorization"] = `Bearer ${access_token}`;
+        window.dispatchEvent(new CustomEvent(AUTH_TOKENS_EVENT, { detail: { access_token, refresh_token, user } }));
+        return access_token;
+      })
+      .catch((error) => {
+        window.dispatchEvent(new CustomEvent(AUTH_LOGOUT_EVENT));
+        throw error;
+      })
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
+api.interceptors.response.use(
+  (response) => response,
+  async (error) => {
+    const original = error.config;
+    if (error?.response?.status !== 401 || !original || original._skipRefresh || original._retried) {
+      throw error;
+    }
+    if (original.url?.startsWith("auth/login") || original.url?.startsWith("auth/logout")) {
+      throw error;
+    }
+
+    const accessToken = await refreshTokens();
+    original._retried = true;
+    original.headers = { ...original.headers, Authorization: `Bearer ${accessToken}` };
+    return api(original);
+  }
+);
+
+export default api;
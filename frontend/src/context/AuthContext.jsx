@@ -1,10 +1,11 @@
 import React, { createContext, useContext, useEffect, useMemo, useState } from "react";
-import api from "../api/api";
+import api, { AUTH_LOGOUT_EVENT, AUTH_TOKENS_EVENT } from "../api/api";
 
 const AuthContext = createContext(null);
 
 export const AuthProvider = ({ children }) => {
 	const [token, setToken] = useState(() => localStorage.getItem("token") || "");
+	const [refreshToken, setRefreshToken] = useState(() => localStorage.getItem("refresh_token") || "");
 	const [user, setUser] = useState(() => {
 		const raw = localStorage.getItem("user");
 		return raw ? JSON.parse(raw) : null;
@@ -21,6 +22,34 @@ export const AuthProvider = ({ children }) => {
 		}
 	}, [token]);
 
+	useEffect(() => {
+		if (refreshToken) {
+			localStorage.setItem("refresh_token", refreshToken);
+		} else {
+			localStorage.removeItem("refresh_token");
+		}
+	}, [refreshToken]);
+
+	// تمدید خودکار توکن در api.js انجام می‌شود؛ اینجا فقط state همگام می‌شود
+	useEffect(() => {
+		const onTokens = (event) => {
+			setToken(event.detail.access_token);
+			setRefreshToken(event.detail.refresh_token);
+			if (event.detail.user) setUser(event.detail.user);
+		};
+		const onLogout = () => {
+			setToken("");
+			setRefreshToken("");
+			setUser(null);
+		};
+		window.addEventListener(AUTH_TOKENS_EVENT, onTokens);
+		window.addEventListener(AUTH_LOGOUT_EVENT, onLogout);
+		return () => {
+			window.removeEventListener(AUTH_TOKENS_EVENT, onTokens);
+			window.removeEventListener(AUTH_LOGOUT_EVENT, onLogout);
+		};
+	}, []);
+
 	useEffect(() => {
 		if (user) {
 			localStorage.setItem("user", JSON.stringify(user));
@@ -33,8 +62,9 @@ export const AuthProvider = ({ children }) => {
 		setLoading(true);
 		try {
 			const response = await api.post("auth/login", { username, password });
-			const { access_token, user: userData } = response.data;
+			const { access_token, refresh_token, user: userData } = response.data;
 			setToken(access_token);
+			setRefreshToken(refresh_token || "");
 			setUser(userData);
 			return { success: true };
 		} catch (error) {
@@ -48,13 +78,16 @@ export const AuthProvider = ({ children }) => {
 	};
 
 	const logout = () => {
+		// ابطال توکن‌ها در سرور؛ خطا مانع خروج محلی نمی‌شود
+		api.post("auth/logout", refreshToken ? { refresh_token: refreshToken } : undefined).catch(() => {});
 		setToken("");
+		setRefreshToken("");
 		setUser(null);
 	};
 
 	const value = useMemo(
 		() => ({ token, user, loading, login, logout, isAuthenticated: Boolean(token) }),
-		[token, user, loading]
+		[token, refreshToken, user, loading]
 	);
 
 	return <AuthContext.Provider value={value}>{children}</AuthContext.Provider>;
@@ -11,9 +11,21 @@ import {
 } from "lucide-react";
 import { useNavigate } from "react-router-dom";
 import api from "../api/api";
+import { useAuth } from "../context/AuthContext";
+
+// همان ALLOWED_STATUS_TRANSITIONS در backend
+const allowedTransitions = {
+  "ثبت نشده": ["ثبت شده"],
+  "ثبت شده": ["تایید شده", "پاس شده", "برگشت خورده"],
+  "تایید شده": ["پاس شده", "برگشت خورده"],
+  "برگشت خورده": ["پاس شده"],
+  "پاس شده": [],
+};
 
 export default function Checks() {
   const navigate = useNavigate();
+  const { user } = useAuth();
+  const isAdmin = user?.role === "admin";
   const [checks, setChecks] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -82,9 +94,12 @@ export default function Checks() {
     }
   };
 
-  const handleStatusChange = async (checkId, newStatus) => {
+  const handleStatusChange = async (check, newStatus) => {
+    // وضعیت خارج از قواعد فقط با تایید مدیر به عنوان اصلاح اشتباه ثبت می‌شود
+    const force = !allowedTransitions[check.status]?.includes(newStatus);
+    if (force && !window.confirm("این تغییر خارج از روال عادی است و به عنوان اصلاح وضعیت ثبت می‌شود. ادامه می‌دهید؟")) return;
     try {
-      await api.put(`checks/${checkId}`, { status: newStatus });
+      await api.put(`checks/${check.id}${force ? "?force=true" : ""}`, { status: newStatus });
       fetchChecks();
     } catch (err) {
       alert(err.response?.data?.detail || "خطا در تغییر وضعیت");
@@ -311,15 +326,36 @@ export default function Checks() {
                       <select
                         value={check.status}
                         onChange={(e) =>
-                          handleStatusChange(check.id, e.target.value)
+                          handleStatusChange(check, e.target.value)
                         }
                         className="px-3 py-2 border border-gray-300 rounded-lg text-sm font-medium focus:ring-2 focus:ring-blue-500"
                       >
-                        {checkStatuses.map((status) => (
-                          <option key={status.value} value={status.value}>
-                            {status.label}
-                          </option>
-                        ))}
+                        {checkStatuses
+                          .filter(
+                            (status) =>
+                              status.value === check.status ||
+                              allowedTransitions[check.status]?.includes(status.value)
+                          )
+                          .map((status) => (
+                            <option key={status.value} value={status.value}>
+                              {status.label}
+                            </option>
+                          ))}
+                        {isAdmin && (
+                          <optgroup label="اصلاح وضعیت (مدیر)">
+                            {checkStatuses
+                              .filter(
+                                (status) =>
+                                  status.value !== check.status &&
+                                  !allowedTransitions[check.status]?.includes(status.value)
+                              )
+                              .map((status) => (
+                                <option key={status.value} value={status.value}>
+                                  {status.label}
+                                </option>
+                              ))}
+                          </optgroup>
+                        )}
                       </select>
                       <div className="flex gap-2">
                         <button